@@ -0,0 +1,156 @@
+"""
+Monte Carlo playoff bracket simulation
+
+Seeds the top eight teams of each conference by record, turns each team's
+strength into head-to-head game probabilities, and plays the whole
+16-team bracket many times at once. The game probabilities are first
+folded into the exact chance of winning a best-of-7 series for every
+pairing, so a simulated series is one uniform draw. Each series slot is
+then drawn for every simulated tournament in one NumPy call, with no
+Python loop over games or tournaments; 100,000 tournaments take a few
+tens of milliseconds.
+
+A team's strength is its expected margin against an average team: the
+mean of its point differential and its efficiency differential scaled to
+points per game. A single game is won with probability
+Phi((strength_a - strength_b +/- home court) / GAME_MARGIN_SD). The
+higher seed (the better record in the Finals) has home court in games 1,
+2, 5 and 7. The play-in tournament is not modelled; seeds 7 and 8 are
+simply the seventh and eighth best records.
+"""
+
+import math
+
+import numpy as np
+
+ROUNDS = ('conference_semifinals', 'conference_finals', 'finals', 'champion')
+CONFERENCES = ('East', 'West')
+TEAMS_PER_CONFERENCE = 8
+# Standard deviation of a single NBA game's final margin, in points
+GAME_MARGIN_SD = 12.0
+HOME_COURT_POINTS = 2.5
+# efficiency_diff is points per possession; this puts it on the point_diff scale
+POSSESSIONS_PER_GAME = 100.0
+# In the 2-2-1-1-1 format the higher seed hosts games 1, 2, 5 and 7
+HOME_GAMES = 4
+AWAY_GAMES = 3
+WINS_NEEDED = 4
+# First-round pairings by seed index (1v8, 4v5, 3v6, 2v7); neighbouring winners meet next
+FIRST_ROUND = ((0, 7), (3, 4), (2, 5), (1, 6))
+
+_normal_cdf = np.vectorize(lambda x: 0.5 * (1.0 + math.erf(x / math.sqrt(2.0))))
+
+
+def team_strength(record):
+    """Expected per-game margin against an average team"""
+    if record.efficiency_diff is None:
+        return record.point_diff
+    return (record.point_diff + record.efficiency_diff * POSSESSIONS_PER_GAME) / 2.0
+
+
+def seed_conferences(records, conferences):
+    """
+    The 16 playoff teams: East seeds 1-8 then West seeds 1-8, each
+    conference ordered by win percentage with point differential breaking
+    ties. Raises ValueError if a conference has fewer than eight teams.
+    """
+    seeded = []
+    for conference in CONFERENCES:
+        teams = [record for record in records if conferences.get(record.full_name) == conference]
+        if len(teams) < TEAMS_PER_CONFERENCE:
+            raise ValueError(f"Only {len(teams)} {conference} teams have predictions; a bracket needs "
+                             f"{TEAMS_PER_CONFERENCE}")
+        teams.sort(key=lambda record: (-record.win_pct, -record.point_diff))
+        seeded.extend(teams[:TEAMS_PER_CONFERENCE])
+    return seeded
+
+
+def game_probabilities(strength):
+    """(home, away): [i, j] is the chance team i beats team j at i's home / at j's home"""
+    margin = strength[:, None] - strength[None, :]
+    return (
+        _normal_cdf((margin + HOME_COURT_POINTS) / GAME_MARGIN_SD),
+        _normal_cdf((margin - HOME_COURT_POINTS) / GAME_MARGIN_SD)
+    )
+
+
+def _binomial_pmf(games, p):
+    """[k] is the chance of winning exactly k of `games` games, elementwise over p"""
+    return [math.comb(games, k) * p ** k * (1.0 - p) ** (games - k) for k in range(games + 1)]
+
+
+def series_probabilities(p_home, p_away):
+    """
+    [i, j] is the chance higher seed i beats j in a best-of-7. Playing all
+    seven games and taking whoever wins four has the same outcome
+    distribution as stopping at four, so it is the chance that home wins
+    plus away wins reach four.
+    """
+    home, away = _binomial_pmf(HOME_GAMES, p_home), _binomial_pmf(AWAY_GAMES, p_away)
+    return sum(
+        home[home_wins] * away[away_wins]
+        for home_wins in range(HOME_GAMES + 1)
+        for away_wins in range(AWAY_GAMES + 1)
+        if home_wins + away_wins >= WINS_NEEDED
+    )
+
+
+def play_series(high, low, series_p, rng):
+    """Winners of the series between team arrays high (home court) and low, one per simulation"""
+    return np.where(rng.random(len(high)) < series_p[high, low], high, low)
+
+
+def _higher_seed(a, b, rank):
+    a_first = rank[a] < rank[b]
+    return np.where(a_first, a, b), np.where(a_first, b, a)
+
+
+def simulate(records, conferences, simulations=100_000, seed=0):
+    """
+    Play the season's bracket `simulations` times. Returns the seeded
+    teams with their chance of reaching each round in ROUNDS.
+    """
+    seeded = seed_conferences(records, conferences)
+    strength = np.array([team_strength(record) for record in seeded], dtype=np.float64)
+    series_p = series_probabilities(*game_probabilities(strength))
+    rng = np.random.default_rng(seed)
+
+    # Within a conference the seed decides home court; in the Finals the better record does
+    conference_seed = np.tile(np.arange(TEAMS_PER_CONFERENCE), len(CONFERENCES))
+    by_record = sorted(range(len(seeded)), key=lambda team: (-seeded[team].win_pct, -seeded[team].point_diff))
+    record_rank = np.empty(len(seeded), dtype=np.intp)
+    record_rank[by_record] = np.arange(len(seeded))
+
+    reached = {name: np.zeros(len(seeded), dtype=np.int64) for name in ROUNDS}
+    champions = []
+    for offset in range(0, len(seeded), TEAMS_PER_CONFERENCE):
+        alive = [
+            play_series(np.full(simulations, offset + high), np.full(simulations, offset + low), series_p, rng)
+            for high, low in FIRST_ROUND
+        ]
+        for name in ROUNDS[:2]:
+            for winners in alive:
+                reached[name] += np.bincount(winners, minlength=len(seeded))
+            alive = [
+                play_series(*_higher_seed(alive[i], alive[i + 1], conference_seed), series_p, rng)
+                for i in range(0, len(alive), 2)
+            ]
+        champions.append(alive[0])
+
+    reached['finals'] = sum(np.bincount(winners, minlength=len(seeded)) for winners in champions)
+    champion = play_series(*_higher_seed(champions[0], champions[1], record_rank), series_p, rng)
+    reached['champion'] = np.bincount(champion, minlength=len(seeded))
+
+    teams = []
+    for team, record in enumerate(seeded):
+        teams.append({
+            'team_name': record.full_name,
+            'team_abbr': record.abbreviation,
+            'conference': CONFERENCES[team // TEAMS_PER_CONFERENCE],
+            'seed': int(conference_seed[team]) + 1,
+            'strength': float(strength[team]),
+            'model_probability': record.championship_probability,
+            'rounds': {name: float(reached[name][team] / simulations) for name in ROUNDS}
+        })
+    teams.sort(key=lambda entry: -entry['rounds']['champion'])
+    return teams
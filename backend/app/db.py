@@ -0,0 +1,202 @@
+"""
+Read-only SQLite access shared by the API and training
+
+Connections are opened through a file: URI with mode=ro (and immutable=1
+unless the database may change underneath a running process), so SQLite
+skips locking and change detection, and with mmap_size set so pages are
+read straight from the OS page cache. The API keeps a small pool of them
+for its worker threads instead of connecting on every request.
+
+Run as a module to build an indexed copy of the Kaggle database:
+    python -m backend.app.db [--out data/nba_indexed.sqlite] [--update-config]
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import quote
+import argparse
+import json
+import queue
+import shutil
+import sqlite3
+import time
+
+from backend.app.executor import PoolSaturated
+
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+
+# Index names are stable so creating them on an already-indexed copy is a no-op
+INDEXES = {
+    "idx_game_season_type_season_date": "game(season_type, season_id, game_date)",
+    "idx_other_stats_game_id": "other_stats(game_id)",
+}
+
+
+def readonly_uri(db_path, immutable=True):
+    path = quote(Path(db_path).resolve().as_posix())
+    uri = f"file:{path}?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    return uri
+
+
+def connect_readonly(db_path, immutable=True, mmap_size=DEFAULT_MMAP_SIZE, check_same_thread=True):
+    """
+    Open db_path read-only. immutable=True tells SQLite the file never
+    changes while open: no locks, no change checks. Only use it when the
+    database is replaced rather than written to in place.
+    """
+    if not Path(db_path).exists():
+        raise FileNotFoundError(f"Database not found: {db_path}")
+    conn = sqlite3.connect(readonly_uri(db_path, immutable), uri=True, check_same_thread=check_same_thread)
+    conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+    conn.execute("PRAGMA query_only = 1")
+    return conn
+
+
+class ConnectionPool:
+    """
+    Up to `size` read-only connections, opened on first use and handed to
+    one thread at a time. The most recently returned connection is reused
+    first so its page cache stays warm. Waiting longer than `timeout` for
+    one raises PoolSaturated (a 503 with Retry-After), and acquiring after
+    close() raises RuntimeError.
+    """
+
+    def __init__(self, db_path, size=4, timeout=5.0, retry_after=1, **connect_kwargs):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.connect_kwargs = connect_kwargs
+        self._idle = queue.LifoQueue()
+        self._slots = queue.Queue()
+        for _ in range(size):
+            self._slots.put(None)
+        self._closed = False
+
+    def _acquire(self):
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            # A free slot means we may open another connection
+            self._slots.get_nowait()
+        except queue.Empty:
+            # Every connection exists and is busy: wait for one to come back
+            try:
+                return self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise PoolSaturated(self.retry_after) from None
+        try:
+            return connect_readonly(self.db_path, check_same_thread=False, **self.connect_kwargs)
+        except Exception:
+            self._slots.put(None)
+            raise
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def _time_query(conn, sql, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def create_indexed_copy(db_path, out_path, queries=None):
+    """
+    Copy db_path to out_path, add INDEXES and ANALYZE statistics, and
+    return {query name: (seconds before, seconds after)} for `queries`.
+    The source database is never modified.
+    """
+    out_path = Path(out_path)
+    tmp_path = out_path.with_name(f".{out_path.name}.tmp")
+    queries = queries or {}
+
+    src = connect_readonly(db_path)
+    try:
+        before = {name: _time_query(src, sql) for name, sql in queries.items()}
+        dst = sqlite3.connect(tmp_path)
+        try:
+            src.backup(dst)
+            for name, definition in INDEXES.items():
+                dst.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+            dst.execute("ANALYZE")
+            dst.commit()
+        finally:
+            dst.close()
+    finally:
+        src.close()
+    shutil.move(tmp_path, out_path)
+
+    indexed = connect_readonly(out_path)
+    try:
+        after = {name: _time_query(indexed, sql) for name, sql in queries.items()}
+    finally:
+        indexed.close()
+    return {name: (before[name], after[name]) for name in queries}
+
+
+def main(argv=None):
+    project_root = Path(__file__).resolve().parents[2]
+    config_path = project_root / "data" / "config.json"
+
+    parser = argparse.ArgumentParser(description="Build an indexed, read-optimized copy of the NBA database")
+    parser.add_argument("--db", help="Source database (default: db_path from data/config.json)")
+    parser.add_argument("--out", help="Indexed copy to write (default: <source>_indexed.sqlite)")
+    parser.add_argument("--update-config", action="store_true", help="Point data/config.json at the indexed copy")
+    args = parser.parse_args(argv)
+
+    config = {}
+    if config_path.exists():
+        with open(config_path) as f:
+            config = json.load(f)
+    db_path = Path(args.db or config["db_path"])
+    out_path = Path(args.out) if args.out else db_path.with_name(f"{db_path.stem}_indexed{db_path.suffix}")
+
+    from backend.train_elite_model import GAMES_QUERY, NEW_GAMES_QUERY
+
+    # Bind the watermark query to a date past every game so it measures the index lookup alone
+    queries = {
+        "training games": GAMES_QUERY,
+        "refresh (new games)": NEW_GAMES_QUERY.replace("?", "'9999'"),
+        "teams": "SELECT id, full_name, abbreviation FROM team ORDER BY full_name",
+    }
+    timings = create_indexed_copy(db_path, out_path, queries)
+
+    print(f"Indexed copy written to {out_path}")
+    for name, (before, after) in timings.items():
+        print(f"  {name:<22} {before * 1000:9.1f}ms -> {after * 1000:9.1f}ms")
+
+    if args.update_config:
+        config["db_path"] = str(out_path)
+        with open(config_path, "w") as f:
+            json.dump(config, f, indent=2)
+        print(f"Updated {config_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Vectorized scoring for the elite ensemble
+
+Wraps the scaler and the three boosters so a whole matrix of team stat
+rows is scaled once and passed through each model in a single call.
+"""
+
+from dataclasses import dataclass
+import numpy as np
+
+# Stats accepted by /predict, in training feature order. The model was
+# trained on 42 features; the trailing paint/transition features are not
+# part of the request and are zero-filled.
+STAT_FIELDS = [
+    'wins', 'win_pct', 'ppg', 'opp_ppg', 'point_diff',
+    'fg_pct', 'ft_pct', 'fg3_pct', 'fg3m', 'opp_fg3_pct', 'fg3_diff',
+    'apg', 'rpg', 'spg', 'bpg',
+    'oreb', 'dreb', 'reb_diff', 'oreb_rate', 'dreb_rate',
+    'tov', 'tov_diff', 'ast_tov_ratio',
+    'defensive_pressure', 'pressure_diff',
+    'off_efficiency', 'def_efficiency', 'efficiency_diff',
+    'ft_rate', 'discipline',
+    'recent_win_pct', 'recent_point_diff', 'momentum'
+]
+NUM_MODEL_FEATURES = 42
+
+
+@dataclass(frozen=True)
+class EnsemblePrediction:
+    xgboost: np.ndarray
+    lightgbm: np.ndarray
+    catboost: np.ndarray
+    ensemble: np.ndarray
+
+
+def stats_matrix(stats_rows) -> np.ndarray:
+    """Build the zero-padded (n, 42) feature matrix for TeamStats-like rows"""
+    matrix = np.zeros((len(stats_rows), NUM_MODEL_FEATURES), dtype=np.float64)
+    if len(stats_rows):
+        matrix[:, :len(STAT_FIELDS)] = [
+            [getattr(stats, name) for name in STAT_FIELDS] for stats in stats_rows
+        ]
+    return matrix
+
+
+class Ensemble:
+    def __init__(self, xgb_model, lgbm_model, catboost_model, scaler):
+        self.xgb_model = xgb_model
+        self.lgbm_model = lgbm_model
+        self.catboost_model = catboost_model
+        self.scaler = scaler
+
+    def predict(self, features, timer=None) -> EnsemblePrediction:
+        """
+        Score an (n, 42) matrix with each booster once and average the
+        probabilities. A metrics.StageTimer, if given, is marked after each stage.
+        """
+        features_scaled = self.scaler.transform(np.asarray(features, dtype=np.float64))
+        if timer is not None:
+            timer.mark('scaler')
+
+        pred_xgb = self.xgb_model.predict_proba(features_scaled)[:, 1]
+        if timer is not None:
+            timer.mark('xgboost')
+        pred_lgbm = self.lgbm_model.predict_proba(features_scaled)[:, 1]
+        if timer is not None:
+            timer.mark('lightgbm')
+        pred_catboost = self.catboost_model.predict_proba(features_scaled)[:, 1]
+        if timer is not None:
+            timer.mark('catboost')
+
+        prediction = EnsemblePrediction(
+            xgboost=pred_xgb,
+            lightgbm=pred_lgbm,
+            catboost=pred_catboost,
+            ensemble=(pred_xgb + pred_lgbm + pred_catboost) / 3
+        )
+        if timer is not None:
+            timer.mark('ensemble')
+        return prediction
+
+    def feature_importances(self) -> np.ndarray:
+        """Per-model importances normalised to sum to 1, then averaged"""
+        importances = [
+            np.asarray(model.feature_importances_, dtype=np.float64)
+            for model in (self.xgb_model, self.lgbm_model, self.catboost_model)
+        ]
+        return sum(importance / importance.sum() for importance in importances) / 3
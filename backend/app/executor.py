@@ -0,0 +1,78 @@
+"""
+Bounded worker pool for blocking work
+
+Model inference, file parsing and SQLite queries run in a fixed-size
+thread pool instead of on the asyncio event loop. The boosters and pandas
+release the GIL for their heavy lifting, so threads give real parallelism
+without duplicating the models into other processes.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
+
+from fastapi import HTTPException
+
+
+class PoolSaturated(HTTPException):
+    """Raised instead of queueing when the pool is full; rendered as 503 with Retry-After"""
+
+    def __init__(self, retry_after):
+        super().__init__(
+            status_code=503,
+            detail="Server busy, retry shortly",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class BoundedExecutor:
+    """
+    Thread pool that admits at most `max_workers + queue_depth` jobs.
+
+    Admission is counted on the event loop thread, so no lock is needed;
+    callers past the limit get PoolSaturated immediately rather than
+    waiting behind an unbounded queue. A slot is held by the thread job,
+    not by the awaiting coroutine: a caller cancelled by a client
+    disconnect releases it only once its job has finished (or was
+    cancelled before it started).
+    """
+
+    def __init__(self, max_workers, queue_depth, retry_after=1, name="api-worker"):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._in_flight = 0
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    @property
+    def capacity(self):
+        return self.max_workers + self.queue_depth
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) in the pool, or raise PoolSaturated if it is full"""
+        if self._in_flight >= self.capacity:
+            raise PoolSaturated(self.retry_after)
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(partial(fn, *args, **kwargs))
+        self._in_flight += 1
+        future.add_done_callback(lambda _: self._release_from(loop))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _release_from(self, loop):
+        # Runs on the worker thread; the count is only touched on the event loop
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # The loop already closed at shutdown
+            pass
+
+    def _release(self):
+        self._in_flight -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,226 @@
+"""
+Per-team feature contributions to the ensemble probability
+
+/features reports global importance. An explanation instead breaks one
+team's championship probability down by feature, using the tree-path
+contributions each booster computes natively: XGBoost's pred_contribs,
+LightGBM's pred_contrib and CatBoost's ShapValues. Each gives, per row,
+one log-odds contribution per feature plus the model's base value, and
+they sum to that model's margin.
+
+The ensemble averages probabilities rather than margins, so each model's
+contributions are rescaled by (p - p_base) / (margin - base_margin),
+which keeps their proportions and makes them sum to p - p_base, and the
+three models are then averaged. The ensemble contributions therefore sum
+exactly to the team's probability minus the base probability.
+
+Contributions cost far more than scoring, so a whole season is explained
+in one call per model and kept in ExplanationCache under
+(model version, season). The per-season feature matrix is written by
+the training script, since the prediction files only carry a handful of
+the 42 features.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+import json
+import os
+import threading
+
+import numpy as np
+
+MODELS = ('xgboost', 'lightgbm', 'catboost')
+FORMAT_VERSION = 1
+# Below this margin change the rescaling factor is replaced by the sigmoid's slope
+_MIN_MARGIN_CHANGE = 1e-12
+
+
+def save_season_features(path, seasons, abbreviations, full_names, features, feature_names):
+    """Write the per-team-season feature matrix next to the destination and rename into place"""
+    path = Path(path)
+    meta = {'format_version': FORMAT_VERSION, 'feature_names': list(feature_names)}
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f, meta=np.array(json.dumps(meta)),
+            seasons=np.asarray(seasons, dtype=np.int32),
+            abbreviations=np.asarray(abbreviations, dtype=str),
+            full_names=np.asarray(full_names, dtype=str),
+            features=np.asarray(features, dtype=np.float64)
+        )
+    os.replace(tmp_path, path)
+
+
+@dataclass(frozen=True)
+class SeasonFeatures:
+    """Every team-season's raw (unscaled) feature row, as the models were trained on"""
+    seasons: np.ndarray
+    abbreviations: np.ndarray
+    full_names: np.ndarray
+    features: np.ndarray
+    feature_names: List[str]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['format_version'] != FORMAT_VERSION:
+                raise ValueError(f"Unsupported season features format {meta['format_version']} in {path}")
+            return cls(
+                seasons=data['seasons'],
+                abbreviations=data['abbreviations'],
+                full_names=data['full_names'],
+                features=data['features'],
+                feature_names=meta['feature_names']
+            )
+
+    def rows(self, season) -> np.ndarray:
+        return np.flatnonzero(self.seasons == season)
+
+
+@dataclass(frozen=True)
+class SeasonExplanation:
+    """
+    One season explained: per team, each model's log-odds contributions
+    and the ensemble's probability contributions, both (teams, features)
+    """
+    season: int
+    abbreviations: List[str]
+    full_names: List[str]
+    values: np.ndarray
+    probability: np.ndarray
+    base_probability: np.ndarray
+    contributions: np.ndarray
+    model_probabilities: Dict[str, np.ndarray]
+    model_contributions: Dict[str, np.ndarray]
+
+    def team(self, abbreviation) -> Optional[int]:
+        """Row of the team with this abbreviation, or None"""
+        try:
+            return self.abbreviations.index(abbreviation)
+        except ValueError:
+            return None
+
+
+def _sigmoid(margin):
+    return 1.0 / (1.0 + np.exp(-margin))
+
+
+def model_contributions(xgb_model, lgbm_model, catboost_model, features_scaled) -> Dict[str, np.ndarray]:
+    """
+    Each model's (n, features + 1) log-odds contributions for scaled rows;
+    the last column is the base value
+    """
+    # The boosters' own imports are only needed here, and the models are already unpickled
+    import xgboost
+    import catboost
+
+    return {
+        'xgboost': xgb_model.get_booster().predict(xgboost.DMatrix(features_scaled), pred_contribs=True),
+        'lightgbm': lgbm_model.predict(features_scaled, pred_contrib=True),
+        'catboost': catboost_model.get_feature_importance(catboost.Pool(features_scaled), type='ShapValues'),
+    }
+
+
+def to_probability(contributions):
+    """
+    (probability, base probability, probability-space contributions) for
+    one model's log-odds contributions, so that the contributions sum to
+    probability - base probability
+    """
+    contributions = np.asarray(contributions, dtype=np.float64)
+    base_margin = contributions[:, -1]
+    margin = contributions.sum(axis=1)
+    probability, base_probability = _sigmoid(margin), _sigmoid(base_margin)
+
+    change = margin - base_margin
+    flat = np.abs(change) < _MIN_MARGIN_CHANGE
+    scale = np.where(
+        flat,
+        base_probability * (1.0 - base_probability),
+        (probability - base_probability) / np.where(flat, 1.0, change)
+    )
+    return probability, base_probability, contributions[:, :-1] * scale[:, None]
+
+
+class Explainer:
+    """The native boosters and season features of one trained model version"""
+
+    def __init__(self, xgb_model, lgbm_model, catboost_model, scaler, season_features, version):
+        self.xgb_model = xgb_model
+        self.lgbm_model = lgbm_model
+        self.catboost_model = catboost_model
+        self.scaler = scaler
+        self.season_features = season_features
+        self.version = version
+
+    @property
+    def feature_names(self) -> List[str]:
+        return self.season_features.feature_names
+
+    def explain_season(self, season) -> Optional[SeasonExplanation]:
+        """Explain every team of a season in one call per model; None if the season has no features"""
+        rows = self.season_features.rows(season)
+        if not len(rows):
+            return None
+
+        values = self.season_features.features[rows]
+        raw = model_contributions(
+            self.xgb_model, self.lgbm_model, self.catboost_model, self.scaler.transform(values)
+        )
+
+        probabilities, base_probabilities, scaled = {}, [], []
+        for name in MODELS:
+            probability, base_probability, contributions = to_probability(raw[name])
+            probabilities[name] = probability
+            base_probabilities.append(base_probability)
+            scaled.append(contributions)
+
+        return SeasonExplanation(
+            season=season,
+            abbreviations=self.season_features.abbreviations[rows].tolist(),
+            full_names=self.season_features.full_names[rows].tolist(),
+            values=values,
+            probability=sum(probabilities.values()) / len(MODELS),
+            base_probability=sum(base_probabilities) / len(MODELS),
+            contributions=sum(scaled) / len(MODELS),
+            model_probabilities=probabilities,
+            model_contributions={name: raw[name][:, :-1] for name in MODELS}
+        )
+
+
+class ExplanationCache:
+    """
+    Season explanations keyed by (model version, season), least recently
+    used first out. Entries of a replaced model version are never hit
+    again and age out.
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version, season) -> Optional[SeasonExplanation]:
+        with self._lock:
+            explanation = self._entries.get((version, season))
+            if explanation is not None:
+                self._entries.move_to_end((version, season))
+            return explanation
+
+    def get_or_compute(self, explainer, season) -> Optional[SeasonExplanation]:
+        """Cached explanation, or explainer.explain_season(season) stored for next time; computed outside the lock"""
+        key = (explainer.version, season)
+        explanation = self.get(*key)
+        if explanation is not None:
+            return explanation
+
+        explanation = explainer.explain_season(season)
+        if explanation is not None:
+            with self._lock:
+                self._entries[key] = explanation
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return explanation
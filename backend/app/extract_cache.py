@@ -0,0 +1,156 @@
+"""
+Columnar cache for frames extracted from nba.sqlite
+
+The game query and the per-team-game table derived from it are written
+once as one .npy file per column plus a JSON manifest. Numeric columns are
+memory-mapped on load, so reopening a cached frame costs milliseconds and
+no copy; string columns are stored as fixed-width unicode arrays.
+
+Entries are keyed by a hash of the query (plus an optional version for
+derived frames) and the database file's size and mtime, so editing or
+replacing the database invalidates them automatically. Directory names
+also carry a tag of the database path, so storing a new entry evicts the
+older copies for that database only and leaves other databases' entries
+(e.g. a synthetic --db next to the Kaggle one) in place.
+"""
+
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+INDEX_COLUMN = "__index__"
+
+
+def cache_key(db_path, query, version=""):
+    stat = os.stat(db_path)
+    digest = hashlib.sha256()
+    for part in (FORMAT_VERSION, query, version, Path(db_path).resolve(), stat.st_size, stat.st_mtime_ns):
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def db_tag(db_path):
+    """Short, stable tag of a database's resolved path"""
+    return hashlib.sha256(str(Path(db_path).resolve()).encode("utf-8")).hexdigest()[:8]
+
+
+def _is_string_column(values):
+    return all(value is None or isinstance(value, str) for value in values)
+
+
+def save_frame(df, directory):
+    """Write df column by column into a new directory, renamed into place once complete"""
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{directory.name}.", dir=directory.parent))
+
+    columns = []
+    try:
+        frame = df.copy(deep=False)
+        frame[INDEX_COLUMN] = df.index.to_numpy()
+        for position, name in enumerate(frame.columns):
+            series = frame[name]
+            filename = f"{position}.npy"
+            entry = {"name": name, "file": filename}
+
+            if series.dtype.kind in "biuf":
+                np.save(tmp_dir / filename, series.to_numpy())
+                entry["kind"] = "numeric"
+            else:
+                values = series.to_numpy(dtype=object)
+                nulls = pd.isna(series).to_numpy()
+                if not _is_string_column(values[~nulls]):
+                    raise TypeError(f"Column {name!r} mixes strings with other types and cannot be cached")
+                np.save(tmp_dir / filename, np.where(nulls, "", values).astype(str))
+                entry["kind"] = "string"
+                if nulls.any():
+                    entry["nulls"] = f"{position}.nulls.npy"
+                    np.save(tmp_dir / entry["nulls"], nulls)
+            columns.append(entry)
+
+        with open(tmp_dir / MANIFEST, "w") as f:
+            json.dump({"format_version": FORMAT_VERSION, "rows": len(df), "columns": columns}, f)
+
+        os.replace(tmp_dir, directory)
+    except OSError:
+        # Another process finished the same entry first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not (directory / MANIFEST).exists():
+            raise
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def load_frame(directory, mmap=True):
+    """Rebuild a frame written by save_frame; numeric columns stay read-only memory maps"""
+    directory = Path(directory)
+    with open(directory / MANIFEST, "r") as f:
+        manifest = json.load(f)
+
+    data = {}
+    for entry in manifest["columns"]:
+        if entry["kind"] == "numeric":
+            # asarray drops the memmap subclass but keeps the mapping (no copy)
+            data[entry["name"]] = np.asarray(np.load(directory / entry["file"], mmap_mode="r" if mmap else None))
+        else:
+            values = np.load(directory / entry["file"]).astype(object)
+            if "nulls" in entry:
+                values[np.load(directory / entry["nulls"])] = None
+            data[entry["name"]] = values
+
+    index = data.pop(INDEX_COLUMN)
+    return pd.DataFrame(data, index=pd.Index(index), copy=False)
+
+
+class ExtractCache:
+    """Cached frames for one database file under cache_dir/<name>-<db tag>-<key>/"""
+
+    def __init__(self, cache_dir, db_path):
+        self.cache_dir = Path(cache_dir)
+        self.db_path = db_path
+        self.db_tag = db_tag(db_path)
+
+    def path(self, name, query, version=""):
+        return self.cache_dir / f"{name}-{self.db_tag}-{cache_key(self.db_path, query, version)}"
+
+    def _stale(self, name, path):
+        """Other entries for this database, plus untagged ones written before entries carried a db tag"""
+        for entry in self.cache_dir.glob(f"{name}-*"):
+            if entry == path or not entry.is_dir():
+                continue
+            suffix = entry.name[len(name) + 1:]
+            if suffix.startswith(f"{self.db_tag}-") or "-" not in suffix:
+                yield entry
+
+    def load(self, name, query, version=""):
+        path = self.path(name, query, version)
+        if not (path / MANIFEST).exists():
+            return None
+        return load_frame(path)
+
+    def store(self, name, query, df, version=""):
+        path = self.path(name, query, version)
+        save_frame(df, path)
+        # Entries for older copies of this database can never be hit again
+        for stale in list(self._stale(name, path)):
+            shutil.rmtree(stale, ignore_errors=True)
+        return path
+
+    def get_or_build(self, name, query, build, version=""):
+        """Return (frame, hit): the cached frame, or build() stored for next time"""
+        df = self.load(name, query, version)
+        if df is not None:
+            return df, True
+        df = build()
+        self.store(name, query, df, version)
+        return df, False
@@ -5,16 +5,44 @@ Provides RESTful API endpoints for championship predictions,
 team statistics, and historical analysis.
 """
 
-from fastapi import FastAPI, HTTPException
+import time
+
+# Taken before the framework imports so startup timings include them
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
-import joblib
-import pandas as pd
-import sqlite3
+from contextlib import asynccontextmanager
+import asyncio
+import os
 import json
+import secrets
 from pathlib import Path
 
+import numpy as np
+
+from backend.app.prediction_store import PredictionStore
+from backend.app.precomputed import SnapshotCache, SnapshotResponses, serialize, serve
+from backend.app.ensemble import NUM_MODEL_FEATURES, Ensemble, stats_matrix
+from backend.app.compiled_ensemble import CompiledEnsemble
+from backend.app.executor import BoundedExecutor, PoolSaturated
+from backend.app.microbatch import MicroBatcher
+from backend.app.metrics import (
+    LATENCY_BUCKETS, STAGE_BUCKETS, Counter, CounterView, Gauge, HistogramFamily, HistogramView, Registry,
+    RequestMetrics, StageTimer
+)
+from backend.app.prediction_cache import PredictionCache
+from backend.app.profiling import StackSampler, collapsed
+from backend.app.startup import LazyResource, StartupTimings
+from backend.app.db import ConnectionPool, DEFAULT_MMAP_SIZE
+from backend.app.shared_artifacts import build_bundle, load_bundle
+from backend.app.bracket import simulate
+from backend.app.explain import MODELS, Explainer, ExplanationCache, SeasonFeatures
+from backend.app.model_registry import UNVERSIONED, ModelRegistry
+
 TEAM_CONFERENCES = {
     'Atlanta Hawks': 'East', 'Boston Celtics': 'East', 'Brooklyn Nets': 'East',
     'Charlotte Hornets': 'East', 'Chicago Bulls': 'East', 'Cleveland Cavaliers': 'East',
@@ -28,10 +56,26 @@ TEAM_CONFERENCES = {
     'Sacramento Kings': 'West', 'San Antonio Spurs': 'West', 'Utah Jazz': 'West'
 }
 
+
+@asynccontextmanager
+async def lifespan(app):
+    watchers = [asyncio.create_task(watch_prediction_files()), asyncio.create_task(watch_model_registry())]
+    warm_up_task = asyncio.create_task(warm_up()) if STARTUP_MODE == "background" else None
+    yield
+    for watcher in watchers:
+        watcher.cancel()
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+    worker_pool.shutdown()
+    if db_pool is not None:
+        db_pool.close()
+
+
 app = FastAPI(
     title="NBA Championship Predictor API",
     description="Predict NBA championship winners using machine learning",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -42,60 +86,115 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Served on /metrics in the Prometheus text format; the rest of the registry is filled in below
+metrics = Registry()
+http_requests = metrics.register(Counter(
+    "http_requests_total", "HTTP requests by method, route and status code", ("method", "endpoint", "status")
+))
+http_errors = metrics.register(Counter(
+    "http_request_errors_total", "HTTP requests answered with a 5xx status, by reason (error, saturated, not_ready)",
+    ("method", "endpoint", "reason")
+))
+http_latency = metrics.register(HistogramFamily(
+    "http_request_duration_seconds", "Time from receiving a request to sending the last byte of its response",
+    LATENCY_BUCKETS, ("method", "endpoint")
+))
+predict_stages = metrics.register(HistogramFamily(
+    "predict_stage_seconds", "Time per stage of one ensemble scoring call", STAGE_BUCKETS, ("endpoint", "stage")
+))
+# Added last, so it is the outermost middleware and times everything else
+app.add_middleware(
+    RequestMetrics, requests=http_requests, errors=http_errors, latency=http_latency, probes=("/health/ready",)
+)
+
 PROJECT_ROOT = Path(__file__).parent.parent.parent
-XGB_MODEL_PATH = PROJECT_ROOT / "models" / "xgboost_elite.joblib"
-LGBM_MODEL_PATH = PROJECT_ROOT / "models" / "lightgbm_elite.joblib"
-CATBOOST_MODEL_PATH = PROJECT_ROOT / "models" / "catboost_elite.joblib"
-SCALER_PATH = PROJECT_ROOT / "models" / "scaler_elite.joblib"
-METADATA_PATH = PROJECT_ROOT / "models" / "model_metadata_elite.json"
 CONFIG_PATH = PROJECT_ROOT / "data" / "config.json"
-PREDICTIONS_PATH = PROJECT_ROOT / "backend" / "models" / "latest_predictions_elite.csv"
-HISTORICAL_PATH = PROJECT_ROOT / "backend" / "models" / "all_seasons_predictions_with_playoffs.csv"
-SEASON_PREDICTIONS_DIR = PROJECT_ROOT / "backend" / "models" / "season_predictions"
-
-xgb_model = None
-lgbm_model = None
-catboost_model = None
-scaler = None
-feature_names = []
+# Published model versions and the pointer to the current one; without a pointer the
+# models and prediction files at the training output paths are served
+MODEL_REGISTRY_DIR = Path(os.environ.get("API_MODEL_REGISTRY_DIR", PROJECT_ROOT / "models" / "registry"))
+MODEL_POLL_INTERVAL = float(os.environ.get("API_MODEL_POLL_INTERVAL", 2.0))
+SHARED_ARTIFACTS_DIR = Path(os.environ.get("API_SHARED_ARTIFACTS_DIR", PROJECT_ROOT / "models" / "shared"))
+MAX_BATCH_ROWS = 10000
+
+# Blocking work (inference, file parsing, SQLite) runs in a bounded thread pool
+WORKER_POOL_SIZE = int(os.environ.get("API_WORKER_POOL_SIZE", min(8, os.cpu_count() or 1)))
+WORKER_QUEUE_DEPTH = int(os.environ.get("API_WORKER_QUEUE_DEPTH", 64))
+RETRY_AFTER_SECONDS = int(os.environ.get("API_RETRY_AFTER_SECONDS", 1))
+PREDICTIONS_RELOAD_INTERVAL = float(os.environ.get("API_PREDICTIONS_RELOAD_INTERVAL", 2.0))
+
+# Read-only SQLite connections shared by the worker threads. Set API_DB_IMMUTABLE=0
+# if the database file is written in place while the API is running.
+DB_POOL_SIZE = int(os.environ.get("API_DB_POOL_SIZE", WORKER_POOL_SIZE))
+DB_IMMUTABLE = os.environ.get("API_DB_IMMUTABLE", "1") != "0"
+DB_MMAP_SIZE = int(os.environ.get("API_DB_MMAP_SIZE", DEFAULT_MMAP_SIZE))
+
+# "compiled" serves the NumPy tree export when it exists; "native" always loads the three boosters
+PREDICTOR = os.environ.get("API_PREDICTOR", "compiled")
+# /predict/batch requests with more rows are scored by the native boosters, which overtake
+# the compiled walk at about 256 rows; 0 keeps every batch on the compiled ensemble
+NATIVE_BATCH_ROWS = int(os.environ.get("API_NATIVE_BATCH_ROWS", 256))
+
+# eager: load everything at import; lazy: load on first request;
+# background: start serving immediately and warm resources in the worker pool
+STARTUP_MODE = os.environ.get("API_STARTUP_MODE", "background")
+
+# /simulate/{season}: tournaments per request by default and at most, and how many
+# (season, simulations, seed) results are cached per prediction snapshot
+SIMULATIONS = int(os.environ.get("API_SIMULATIONS", 100_000))
+MAX_SIMULATIONS = int(os.environ.get("API_MAX_SIMULATIONS", 1_000_000))
+SIMULATION_CACHE_SIZE = int(os.environ.get("API_SIMULATION_CACHE_SIZE", 64))
+# Seasons of per-team explanations kept in memory, across model versions
+EXPLANATION_CACHE_SIZE = int(os.environ.get("API_EXPLANATION_CACHE_SIZE", 16))
+
+# Uvicorn worker processes when started with `python -m backend.app.main`. With more than
+# one, the parent builds the shared artifact bundle and every worker memory-maps it.
+API_WORKERS = int(os.environ.get("API_WORKERS", 1))
+# Set to 0 to ignore an existing bundle and always load from the source files
+USE_SHARED_ARTIFACTS = os.environ.get("API_SHARED_ARTIFACTS", "1") != "0"
+
+# Concurrent /predict calls are scored together; a window of 0 disables batching
+PREDICT_BATCH_WINDOW_MS = float(os.environ.get("API_PREDICT_BATCH_WINDOW_MS", 2.0))
+PREDICT_MAX_BATCH_SIZE = int(os.environ.get("API_PREDICT_MAX_BATCH_SIZE", 64))
+# /predict results kept per model version (0 disables the cache), their lifetime in seconds
+# (0: until evicted or the version changes) and the significant digits features are
+# rounded to before lookup (0: exact match)
+PREDICT_CACHE_SIZE = int(os.environ.get("API_PREDICT_CACHE_SIZE", 4096))
+PREDICT_CACHE_TTL = float(os.environ.get("API_PREDICT_CACHE_TTL", 0))
+PREDICT_CACHE_DIGITS = int(os.environ.get("API_PREDICT_CACHE_DIGITS", 0))
+
+# Bearer token for the /debug endpoints; unset, they answer 404 as if they did not exist
+ADMIN_TOKEN = os.environ.get("API_ADMIN_TOKEN") or None
+PROFILE_MAX_SECONDS = float(os.environ.get("API_PROFILE_MAX_SECONDS", 60))
+
 db_path = None
+db_pool = None
+startup_timings = StartupTimings()
+model_registry = ModelRegistry(MODEL_REGISTRY_DIR)
 
 
-def load_resources():
-    """Load ensemble models, scaler, and configuration"""
-    global xgb_model, lgbm_model, catboost_model, scaler, feature_names, db_path
+def load_config():
+    """Read the optional database location"""
+    global db_path, db_pool
+
+    # Database is optional - only needed for /teams endpoint
+    if CONFIG_PATH.exists():
+        with open(CONFIG_PATH, 'r') as f:
+            config = json.load(f)
+            db_path = config.get('db_path')
+    else:
+        db_path = None
+        print("Warning: config.json not found - /teams endpoint will not work")
+
+    # Connections are opened on first use, so this does no I/O
+    if db_path is not None:
+        db_pool = ConnectionPool(
+            db_path, size=DB_POOL_SIZE, retry_after=RETRY_AFTER_SECONDS,
+            immutable=DB_IMMUTABLE, mmap_size=DB_MMAP_SIZE
+        )
 
-    try:
-        xgb_model = joblib.load(XGB_MODEL_PATH)
-        lgbm_model = joblib.load(LGBM_MODEL_PATH)
-        catboost_model = joblib.load(CATBOOST_MODEL_PATH)
-        scaler = joblib.load(SCALER_PATH)
-
-        with open(METADATA_PATH, 'r') as f:
-            metadata = json.load(f)
-            feature_names = metadata['feature_names']
-
-        # Database is optional - only needed for /teams endpoint
-        if CONFIG_PATH.exists():
-            with open(CONFIG_PATH, 'r') as f:
-                config = json.load(f)
-                db_path = config.get('db_path')
-        else:
-            db_path = None
-            print("Warning: config.json not found - /teams endpoint will not work")
-
-        print(f"Elite ensemble models loaded successfully")
-        print(f"ROC-AUC Scores:")
-        print(f"  XGBoost:  {metadata['roc_auc_xgb']:.4f}")
-        print(f"  LightGBM: {metadata['roc_auc_lgbm']:.4f}")
-        print(f"  CatBoost: {metadata['roc_auc_catboost']:.4f}")
-        print(f"  Ensemble: {metadata['roc_auc_ensemble']:.4f}")
-    except Exception as e:
-        print(f"Error loading resources: {e}")
-        raise
 
+load_config()
 
-load_resources()
 
 
 class TeamStats(BaseModel):
@@ -164,26 +263,465 @@ class HistoricalPrediction(BaseModel):
     actual_champion_probability: float
 
 
+class TeamSeasonEntry(BaseModel):
+    season: int
+    team_name: str
+    rank: int
+    championship_probability: float
+    wins: float
+    win_pct: float
+    ppg: float
+    point_diff: float
+
+
+class TeamHistory(BaseModel):
+    team_abbr: str
+    team_name: str
+    seasons: List[TeamSeasonEntry]
+
+
+class RankingEntry(BaseModel):
+    rank: int
+    team_name: str
+    team_abbr: str
+    championship_probability: float
+    wins: float
+    win_pct: float
+    ppg: float
+    point_diff: float
+
+
+class Rankings(BaseModel):
+    season: int
+    teams: List[RankingEntry]
+
+
+class RoundOdds(BaseModel):
+    conference_semifinals: float
+    conference_finals: float
+    finals: float
+    champion: float
+
+
+class SimulatedTeam(BaseModel):
+    team_name: str
+    team_abbr: str
+    conference: str
+    seed: int
+    strength: float
+    model_probability: float
+    rounds: RoundOdds
+
+
+class SimulationResponse(BaseModel):
+    season: int
+    simulations: int
+    seed: int
+    teams: List[SimulatedTeam]
+
+
 class FeatureImportance(BaseModel):
     feature: str
     importance: float
 
 
+class FeatureContribution(BaseModel):
+    feature: str
+    value: float
+    contribution: float
+    xgboost: float
+    lightgbm: float
+    catboost: float
+
+
+class Explanation(BaseModel):
+    season: int
+    team_name: str
+    team_abbr: str
+    model_version: str
+    championship_probability: float
+    base_probability: float
+    xgboost_probability: float
+    lightgbm_probability: float
+    catboost_probability: float
+    contributions: List[FeatureContribution]
+
+
+class BatchPredictRequest(BaseModel):
+    teams: List[TeamStats] = Field(..., min_length=1, max_length=MAX_BATCH_ROWS)
+
+
+class BatchPrediction(BaseModel):
+    championship_probability: float
+    xgboost_probability: float
+    lightgbm_probability: float
+    catboost_probability: float
+    prediction: str
+    confidence: str
+
+
+class BatchPredictResponse(BaseModel):
+    predictions: List[BatchPrediction]
+    model: str
+
+
+def _prediction_label(probability):
+    return "Elite Contender" if probability > 0.3 else "Unlikely Champion"
+
+
+def _confidence_label(probability):
+    return "High" if probability > 0.5 or probability < 0.1 else "Moderate"
+
+
+def _latest_response(latest):
+    return [
+        PredictionResponse(
+            team_name=record.full_name,
+            team_abbr=record.abbreviation,
+            wins=record.wins,
+            win_pct=record.win_pct,
+            ppg=record.ppg,
+            point_diff=record.point_diff,
+            championship_probability=record.championship_probability,
+            xgboost_probability=record.xgboost_probability,
+            lightgbm_probability=record.lightgbm_probability,
+            catboost_probability=record.catboost_probability,
+            conference=TEAM_CONFERENCES.get(record.full_name)
+        )
+        for record in latest
+    ]
+
+
+def _season_response(team_seasons):
+    return [
+        PredictionResponse(
+            team_name=team_season.full_name,
+            team_abbr=team_season.abbreviation,
+            wins=team_season.wins,
+            win_pct=team_season.win_pct,
+            ppg=team_season.ppg,
+            point_diff=team_season.point_diff,
+            championship_probability=team_season.championship_probability
+        )
+        for team_season in team_seasons
+    ]
+
+
+def _historical_response(historical_records):
+    return [
+        HistoricalPrediction(
+            season=record.season,
+            actual_champion=record.actual_champion,
+            predicted_champion=record.predicted_champion,
+            predicted_probability=record.predicted_probability,
+            correct=record.correct,
+            actual_champion_rank=record.actual_champion_rank,
+            actual_champion_probability=record.actual_champion_probability
+        )
+        for record in historical_records
+    ]
+
+
+def build_snapshot_responses(snapshot):
+    """Serialize every read-only response for a prediction snapshot"""
+    responses = {}
+    if snapshot.latest is not None:
+        responses["predictions"] = serialize(_latest_response(snapshot.latest))
+    if snapshot.historical is not None:
+        responses["historical"] = serialize(_historical_response(snapshot.historical))
+    seasons = sorted(snapshot.seasons, reverse=True)
+    responses["seasons"] = serialize({
+        "seasons": seasons,
+        "latest": seasons[0] if seasons else None
+    })
+    for season in snapshot.team_seasons.seasons():
+        responses[f"predictions/{season}"] = serialize(_season_response(snapshot.team_seasons.top(season)))
+    return responses
+
+
+class Deployment:
+    """
+    Everything served for one model version: the models, the prediction
+    snapshot and the responses derived from them. Handlers read the
+    module-level `deployment` once per request, so a new version goes live
+    with a single reference assignment while in-flight requests finish on
+    the one they started with.
+    """
+
+    def __init__(self, version, timings=None):
+        self.version = version
+        self.xgb_model = None
+        self.lgbm_model = None
+        self.catboost_model = None
+        self.scaler = None
+        self.ensemble = None
+        self.feature_names = []
+        self.features_response = None
+        self._bundle = None
+        self._bundle_checked = False
+
+        # Reload checks happen in watch_prediction_files so request handlers never touch the disk
+        self.prediction_store = PredictionStore(
+            version.predictions_path, version.historical_path, version.season_dir, check_interval=None
+        )
+        self.snapshot_responses = SnapshotResponses(self.prediction_store, build_snapshot_responses)
+        self.simulation_cache = SnapshotCache(self.prediction_store, max_entries=SIMULATION_CACHE_SIZE)
+
+        self.model_resource = LazyResource("models", self.load_resources, timings)
+        self.prediction_resource = LazyResource("predictions", self.load_predictions, timings)
+        # Not warmed up: unpickling the boosters is only worth it once a large batch or an explanation needs them
+        self.native_resource = LazyResource("native models", self.load_native, timings)
+        self.explainer_resource = LazyResource("explainer", self.load_explainer, timings)
+
+    @property
+    def ready(self):
+        return self.model_resource.loaded and self.prediction_resource.loaded
+
+    def shared_bundle(self):
+        """The shared artifact bundle, read once per deployment; None if disabled, missing or stale"""
+        if not self._bundle_checked and USE_SHARED_ARTIFACTS:
+            self._bundle_checked = True
+            try:
+                self._bundle = load_bundle(
+                    SHARED_ARTIFACTS_DIR, self.prediction_store.current_mtimes(), self.version.compiled_path
+                )
+            except Exception as e:
+                print(f"Warning: ignoring shared artifacts in {SHARED_ARTIFACTS_DIR}: {e}")
+        return self._bundle
+
+    def _native_models(self):
+        # Unpickling imports xgboost, lightgbm and catboost, so joblib is only pulled in here
+        import joblib
+
+        return tuple(joblib.load(self.version.model_path(kind)) for kind in ("xgb", "lgbm", "catboost", "scaler"))
+
+    def _compiled_ensemble(self):
+        """The compiled export, or None when it is missing or in an older format"""
+        if not self.version.compiled_path.exists():
+            return None
+        try:
+            return CompiledEnsemble.load(self.version.compiled_path)
+        except ValueError as e:
+            print(f"Warning: {e} in {self.version.compiled_path}; using the native models "
+                  f"(re-export with python -m backend.app.compiled_ensemble)")
+            return None
+
+    def load_resources(self):
+        """Load ensemble models, scaler, and metadata"""
+        try:
+            bundle = self.shared_bundle()
+            ensemble = None
+            if PREDICTOR == "compiled" and bundle is not None and bundle.ensemble is not None:
+                # Memory-mapped from the shared bundle: every worker reads the same pages
+                ensemble = bundle.ensemble
+            elif PREDICTOR == "compiled":
+                # Array-based export: no xgboost/lightgbm/catboost import needed
+                ensemble = self._compiled_ensemble()
+            if ensemble is None:
+                self.xgb_model, self.lgbm_model, self.catboost_model, self.scaler = self._native_models()
+                ensemble = Ensemble(self.xgb_model, self.lgbm_model, self.catboost_model, self.scaler)
+
+            with open(self.version.metadata_path, 'r') as f:
+                metadata = json.load(f)
+                self.feature_names = metadata['feature_names']
+            self.ensemble = ensemble
+
+            print(f"Elite ensemble models loaded successfully ({type(ensemble).__name__}, "
+                  f"version {self.version.name})")
+            print(f"ROC-AUC Scores:")
+            print(f"  XGBoost:  {metadata['roc_auc_xgb']:.4f}")
+            print(f"  LightGBM: {metadata['roc_auc_lgbm']:.4f}")
+            print(f"  CatBoost: {metadata['roc_auc_catboost']:.4f}")
+            print(f"  Ensemble: {metadata['roc_auc_ensemble']:.4f}")
+        except Exception as e:
+            print(f"Error loading resources: {e}")
+            raise
+
+        return ensemble
+
+    def load_predictions(self):
+        bundle = self.shared_bundle()
+        if bundle is not None and bundle.snapshot is not None:
+            # Parsed and serialized by the parent process; later file changes reload from the CSVs
+            self.prediction_store.install(bundle.snapshot)
+            self.snapshot_responses.install(bundle.snapshot, bundle.responses)
+        else:
+            self.prediction_store.load()
+            self.snapshot_responses.refresh()
+        return self.prediction_store
+
+    def load_native(self):
+        """The native boosters as an Ensemble, reusing the ones load_resources unpickled"""
+        if self.xgb_model is None:
+            self.xgb_model, self.lgbm_model, self.catboost_model, self.scaler = self._native_models()
+        return Ensemble(self.xgb_model, self.lgbm_model, self.catboost_model, self.scaler)
+
+    def batch_ensemble(self, rows):
+        """The ensemble that scores a batch of `rows` fastest"""
+        if NATIVE_BATCH_ROWS and rows > NATIVE_BATCH_ROWS and not isinstance(self.ensemble, Ensemble):
+            return self.native_resource.get()
+        return self.ensemble
+
+    def load_explainer(self):
+        """Native boosters and season features for /explain; the compiled ensemble has no contributions"""
+        features_path = self.version.season_features_path
+        if not features_path.exists():
+            raise FileNotFoundError(
+                f"{features_path.name} not found; it is generated, not committed. "
+                f"Run `python backend/train_elite_model.py` to export it"
+            )
+
+        native = self.native_resource.get()
+        with open(self.version.metadata_path, 'r') as f:
+            version = json.load(f)['training_date']
+        return Explainer(
+            native.xgb_model, native.lgbm_model, native.catboost_model, native.scaler,
+            SeasonFeatures.load(features_path), version
+        )
+
+    def warm(self):
+        """Load models, predictions and their serialized responses ahead of serving"""
+        self.prediction_resource.get()
+        self.model_resource.get()
+        return self
+
+
+def _registry_version():
+    """The version the registry points at, or the training output paths if nothing is published"""
+    return model_registry.current() or UNVERSIONED
+
+
+def _initial_version():
+    try:
+        return _registry_version()
+    except Exception as e:
+        print(f"Warning: model registry unusable, serving {UNVERSIONED.model_dir}: {e}")
+        return UNVERSIONED
+
+
+worker_pool = BoundedExecutor(WORKER_POOL_SIZE, WORKER_QUEUE_DEPTH, retry_after=RETRY_AFTER_SECONDS)
+explanation_cache = ExplanationCache(max_entries=EXPLANATION_CACHE_SIZE)
+
+deployment = Deployment(_initial_version(), startup_timings)
+# The deployment replaced by the last swap, kept warm so a rollback to it is instant
+previous_deployment = None
+_failed_version = None
+
+
+def build_shared_artifacts():
+    """Load predictions from the source files and write the bundle workers will map"""
+    active = deployment
+    active.prediction_store.load()
+    active.snapshot_responses.refresh()
+    compiled_path = active.version.compiled_path if PREDICTOR == "compiled" else None
+    return build_bundle(
+        SHARED_ARTIFACTS_DIR, active.prediction_store.get(), active.snapshot_responses.responses(), compiled_path
+    )
+
+
+async def require(resource):
+    """Wait for a lazily loaded resource, loading it in the worker pool if needed"""
+    if not resource.loaded:
+        await worker_pool.run(resource.get)
+
+
+async def warm_up():
+    """Background startup mode: load everything once the server is accepting connections"""
+    for resource in (deployment.prediction_resource, deployment.model_resource):
+        try:
+            await worker_pool.run(resource.get)
+        except Exception as e:
+            print(f"Warning: warming {resource.name} failed, it will load on first use: {e}")
+    startup_timings.record("ready", time.perf_counter() - _import_started)
+    print(f"Startup complete: {startup_timings.summary()}")
+
+
+async def watch_prediction_files():
+    """Poll the prediction CSVs and rebuild the serialized responses off the event loop"""
+    while True:
+        await asyncio.sleep(PREDICTIONS_RELOAD_INTERVAL)
+        active = deployment
+        if not active.prediction_resource.loaded:
+            continue
+        try:
+            if await worker_pool.run(active.prediction_store.reload_if_changed):
+                await worker_pool.run(active.snapshot_responses.refresh)
+        except PoolSaturated:
+            continue
+        except Exception as e:
+            print(f"Warning: prediction reload check failed: {e}")
+
+
+async def switch_to(version):
+    """Pre-warm a model version off the event loop, then make it the one every new request sees"""
+    global deployment, previous_deployment
+
+    if previous_deployment is not None and previous_deployment.version == version:
+        # Rolling back: the replaced deployment is still in memory
+        candidate = previous_deployment
+    else:
+        candidate = Deployment(version)
+    await worker_pool.run(candidate.warm)
+
+    previous_deployment = deployment
+    deployment = candidate
+    print(f"Serving model version {version.name} (was {previous_deployment.version.name})")
+
+
+async def watch_model_registry():
+    """Follow the registry's current pointer; a version that fails to load is skipped until the pointer moves"""
+    global _failed_version
+
+    while True:
+        await asyncio.sleep(MODEL_POLL_INTERVAL)
+        try:
+            version = await worker_pool.run(_registry_version)
+        except PoolSaturated:
+            continue
+        except Exception as e:
+            print(f"Warning: model registry check failed: {e}")
+            continue
+        if version == deployment.version or version == _failed_version:
+            continue
+
+        try:
+            await switch_to(version)
+            _failed_version = None
+        except PoolSaturated:
+            continue
+        except Exception as e:
+            _failed_version = version
+            print(f"Warning: keeping model version {deployment.version.name}, {version.name} failed to load: {e}")
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
     return {
         "message": "NBA Championship Predictor API",
         "version": "1.0.0",
-        "model": "XGBoost with 33 features",
+        "model": f"Ensemble averaging XGBoost, LightGBM and CatBoost over {NUM_MODEL_FEATURES} features",
         "endpoints": {
             "/predictions": "Get latest season championship predictions",
             "/predictions/{season}": "Get predictions for a specific season",
             "/seasons": "Get list of available seasons",
             "/historical": "Get historical prediction accuracy",
+            "/actual-champion/{season}": "The actual champion of a season and whether the model picked it",
             "/features": "Get feature importance rankings",
             "/teams": "List all NBA teams",
-            "/health": "Health check"
+            "/teams/{abbr}/history": "One team's probability and rank in every season",
+            "/rankings": "Teams ranked by championship probability (?season=&top=)",
+            "/simulate/{season}": "Monte Carlo playoff bracket: per-round advancement odds",
+            "/explain/{season}/{team}": "Per-feature contributions to one team's championship probability",
+            "/predict": "Score custom team statistics (POST)",
+            "/predict/batch": "Score many custom team stat rows at once (POST)",
+            "/stats/batching": "Micro-batching histograms for /predict",
+            "/stats/cache": "Hit and miss counts of the /predict result cache",
+            "/metrics": "Request, error, latency and /predict stage metrics (Prometheus text format)",
+            "/debug/profile": "Sample this worker's stacks in the collapsed flamegraph format (admin token required)",
+            "/health": "Health check with readiness and startup timings",
+            "/health/live": "Liveness probe (always 200 once the process serves requests)",
+            "/health/ready": "Readiness probe (503 until models and predictions are loaded)"
         }
     }
 
@@ -191,200 +729,271 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    active = deployment
     return {
         "status": "healthy",
+        "live": True,
+        "ready": active.ready,
+        "startup_mode": STARTUP_MODE,
+        "models_loaded": active.model_resource.loaded,
+        "predictions_loaded": active.prediction_resource.loaded,
+        "startup": startup_timings.as_dict(),
         "model_type": "Elite Ensemble (XGBoost + LightGBM + CatBoost)",
-        "xgb_loaded": xgb_model is not None,
-        "lgbm_loaded": lgbm_model is not None,
-        "catboost_loaded": catboost_model is not None,
+        "model_version": active.version.name,
+        "previous_model_version": previous_deployment.version.name if previous_deployment is not None else None,
+        "xgb_loaded": active.xgb_model is not None,
+        "lgbm_loaded": active.lgbm_model is not None,
+        "catboost_loaded": active.catboost_model is not None,
+        "predictor": type(active.ensemble).__name__ if active.ensemble is not None else None,
         "database_connected": db_path is not None,
-        "num_features": len(feature_names)
+        "num_features": len(active.feature_names)
     }
 
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and the event loop is responsive"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 200 only once models and predictions are in memory"""
+    active = deployment
+    body = {
+        "ready": active.ready,
+        "models_loaded": active.model_resource.loaded,
+        "predictions_loaded": active.prediction_resource.loaded
+    }
+    return JSONResponse(content=body, status_code=200 if body["ready"] else 503)
+
+
 @app.get("/predictions", response_model=List[PredictionResponse])
-async def get_predictions():
+async def get_predictions(request: Request):
     """Get championship predictions for the current season"""
     try:
-        if not PREDICTIONS_PATH.exists():
+        active = deployment
+        await require(active.prediction_resource)
+        precomputed = active.snapshot_responses.get("predictions")
+        if precomputed is None:
             raise HTTPException(
                 status_code=404,
                 detail="Predictions not found. Run training first."
             )
 
-        df = pd.read_csv(PREDICTIONS_PATH)
-
-        predictions = []
-        for _, row in df.iterrows():
-            predictions.append(PredictionResponse(
-                team_name=row['full_name'],
-                team_abbr=row['abbreviation'],
-                wins=row['wins'],
-                win_pct=row['win_pct'],
-                ppg=row['ppg'],
-                point_diff=row['point_diff'],
-                championship_probability=row['championship_probability'],
-                xgboost_probability=row.get('xgboost_probability'),
-                lightgbm_probability=row.get('lightgbm_probability'),
-                catboost_probability=row.get('catboost_probability'),
-                conference=TEAM_CONFERENCES.get(row['full_name'])
-            ))
-
-        return predictions
+        return serve(request, precomputed)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/historical", response_model=List[HistoricalPrediction])
-async def get_historical():
+async def get_historical(request: Request):
     """Get historical prediction accuracy across all seasons"""
     try:
-        if not HISTORICAL_PATH.exists():
+        active = deployment
+        await require(active.prediction_resource)
+        precomputed = active.snapshot_responses.get("historical")
+        if precomputed is None:
             raise HTTPException(
                 status_code=404,
                 detail="Historical data not found"
             )
 
-        df = pd.read_csv(HISTORICAL_PATH)
-
-        historical = []
-        for _, row in df.iterrows():
-            historical.append(HistoricalPrediction(
-                season=int(row['season']),
-                actual_champion=row['actual_champion'],
-                predicted_champion=row['predicted_champion'],
-                predicted_probability=row['predicted_probability'],
-                correct=bool(row['correct']),
-                actual_champion_rank=int(row['actual_champion_rank']),
-                actual_champion_probability=row['actual_champion_probability']
-            ))
-
-        return historical
+        return serve(request, precomputed)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/features", response_model=List[FeatureImportance])
-async def get_feature_importance():
-    """Get averaged feature importance rankings from ensemble"""
-    try:
-        xgb_importance = xgb_model.feature_importances_
-        lgbm_importance = lgbm_model.feature_importances_
-        catboost_importance = catboost_model.feature_importances_
+def _build_features_response(active):
+    avg_importance = active.ensemble.feature_importances()
 
-        xgb_norm = xgb_importance / xgb_importance.sum()
-        lgbm_norm = lgbm_importance / lgbm_importance.sum()
-        catboost_norm = catboost_importance / catboost_importance.sum()
+    importance = []
+    for feat, imp in zip(active.feature_names, avg_importance):
+        importance.append(FeatureImportance(
+            feature=feat,
+            importance=float(imp)
+        ))
 
-        avg_importance = (xgb_norm + lgbm_norm + catboost_norm) / 3
+    importance.sort(key=lambda x: x.importance, reverse=True)
+    return serialize(importance)
 
-        importance = []
-        for feat, imp in zip(feature_names, avg_importance):
-            importance.append(FeatureImportance(
-                feature=feat,
-                importance=float(imp)
-            ))
 
-        importance.sort(key=lambda x: x.importance, reverse=True)
-        return importance
+@app.get("/features", response_model=List[FeatureImportance])
+async def get_feature_importance(request: Request):
+    """Get averaged feature importance rankings from ensemble"""
+    try:
+        active = deployment
+        if active.features_response is None:
+            await require(active.model_resource)
+            active.features_response = await worker_pool.run(_build_features_response, active)
+
+        return serve(request, active.features_response)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _query_teams():
+    query = "SELECT id, full_name, abbreviation FROM team ORDER BY full_name"
+    with db_pool.connection() as conn:
+        return conn.execute(query).fetchall()
+
+
 @app.get("/teams", response_model=List[TeamInfo])
 async def get_teams():
     """Get list of all NBA teams"""
     try:
         # If database not available, get teams from predictions CSV
         if db_path is None:
-            df = pd.read_csv(PREDICTIONS_PATH)
+            active = deployment
+            await require(active.prediction_resource)
             teams = []
-            for idx, (name, abbr) in enumerate(zip(df['full_name'], df['abbreviation'])):
+            for idx, record in enumerate(active.prediction_store.get().latest or []):
                 teams.append(TeamInfo(
                     id=idx + 1,
-                    full_name=name,
-                    abbreviation=abbr
+                    full_name=record.full_name,
+                    abbreviation=record.abbreviation
                 ))
             return teams
 
         # Use database if available
-        conn = sqlite3.connect(db_path)
-        query = "SELECT id, full_name, abbreviation FROM team ORDER BY full_name"
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        rows = await worker_pool.run(_query_teams)
 
         teams = []
-        for _, row in df.iterrows():
+        for team_id, full_name, abbreviation in rows:
             teams.append(TeamInfo(
-                id=int(row['id']),
-                full_name=row['full_name'],
-                abbreviation=row['abbreviation']
+                id=int(team_id),
+                full_name=full_name,
+                abbreviation=abbreviation
             ))
 
         return teams
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/teams/{abbr}/history", response_model=TeamHistory)
+async def get_team_history(abbr: str):
+    """Get one team's predicted probability and rank across every season"""
+    try:
+        active = deployment
+        await require(active.prediction_resource)
+        team_seasons = active.prediction_store.get().team_seasons.history(abbr.upper())
+        if not team_seasons:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No season predictions found for team {abbr}"
+            )
+
+        return TeamHistory(
+            team_abbr=team_seasons[-1].abbreviation,
+            team_name=team_seasons[-1].full_name,
+            seasons=[
+                TeamSeasonEntry(
+                    season=team_season.season,
+                    team_name=team_season.full_name,
+                    rank=team_season.rank,
+                    championship_probability=team_season.championship_probability,
+                    wins=team_season.wins,
+                    win_pct=team_season.win_pct,
+                    ppg=team_season.ppg,
+                    point_diff=team_season.point_diff
+                )
+                for team_season in team_seasons
+            ]
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/seasons")
-async def get_seasons():
-    """Get list of available seasons"""
+@app.get("/rankings", response_model=Rankings)
+async def get_rankings(
+    season: Optional[int] = Query(None, description="Season to rank (default: the latest)"),
+    top: Optional[int] = Query(None, ge=1, description="Only the first N teams")
+):
+    """Get teams ranked by championship probability for one season"""
     try:
-        if not SEASON_PREDICTIONS_DIR.exists():
+        active = deployment
+        await require(active.prediction_resource)
+        index = active.prediction_store.get().team_seasons
+        if season is None:
+            season = index.latest_season()
+        if season is None or not index.has_season(season):
             raise HTTPException(
                 status_code=404,
-                detail="Season predictions not found"
+                detail=f"Predictions for season {season} not found"
             )
 
-        season_files = list(SEASON_PREDICTIONS_DIR.glob("predictions_*.csv"))
-        seasons = []
-        for f in season_files:
-            season = int(f.stem.split('_')[1])
-            seasons.append(season)
+        return Rankings(
+            season=season,
+            teams=[
+                RankingEntry(
+                    rank=team_season.rank,
+                    team_name=team_season.full_name,
+                    team_abbr=team_season.abbreviation,
+                    championship_probability=team_season.championship_probability,
+                    wins=team_season.wins,
+                    win_pct=team_season.win_pct,
+                    ppg=team_season.ppg,
+                    point_diff=team_season.point_diff
+                )
+                for team_season in index.top(season, top)
+            ]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        seasons = sorted(seasons, reverse=True)
 
-        return {
-            "seasons": seasons,
-            "latest": seasons[0] if seasons else None
-        }
+@app.get("/seasons")
+async def get_seasons(request: Request):
+    """Get list of available seasons"""
+    try:
+        active = deployment
+        await require(active.prediction_resource)
+        # Always built: with no season files the list is empty
+        return serve(request, active.snapshot_responses.get("seasons"))
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/predictions/{season}", response_model=List[PredictionResponse])
-async def get_predictions_by_season(season: int):
+async def get_predictions_by_season(season: int, request: Request):
     """Get championship predictions for a specific season"""
     try:
-        season_file = SEASON_PREDICTIONS_DIR / f"predictions_{season}.csv"
+        active = deployment
+        await require(active.prediction_resource)
+        precomputed = active.snapshot_responses.get(f"predictions/{season}")
 
-        if not season_file.exists():
+        if precomputed is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Predictions for season {season} not found"
             )
 
-        df = pd.read_csv(season_file)
-
-        predictions = []
-        for _, row in df.iterrows():
-            predictions.append(PredictionResponse(
-                team_name=row['full_name'],
-                team_abbr=row['abbreviation'],
-                wins=row['won'],
-                win_pct=row['win_pct'],
-                ppg=row['pts'],
-                point_diff=row['point_diff'],
-                championship_probability=row['championship_probability']
-            ))
-
-        return predictions
+        return serve(request, precomputed)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -413,8 +1022,11 @@ async def get_actual_champion(season: int):
                 "actual_rank": None
             }
 
-        season_file = SEASON_PREDICTIONS_DIR / f"predictions_{season}.csv"
-        if not season_file.exists():
+        active = deployment
+        await require(active.prediction_resource)
+        team_seasons = active.prediction_store.get().team_seasons
+        leader = team_seasons.leader(season)
+        if leader is None:
             return {
                 "season": season,
                 "actual_champion": actual_champion,
@@ -423,11 +1035,10 @@ async def get_actual_champion(season: int):
                 "actual_rank": None
             }
 
-        df = pd.read_csv(season_file)
-        predicted_champion = df.iloc[0]['full_name']
+        predicted_champion = leader.full_name
 
-        actual_row = df[df['full_name'] == actual_champion]
-        if len(actual_row) == 0:
+        actual = team_seasons.find(season, actual_champion)
+        if actual is None:
             return {
                 "season": season,
                 "actual_champion": actual_champion,
@@ -437,8 +1048,6 @@ async def get_actual_champion(season: int):
                 "actual_probability": 0.0
             }
 
-        actual_rank = int(df[df['full_name'] == actual_champion].index[0] + 1)
-        actual_probability = float(actual_row.iloc[0]['championship_probability'])
         correct = bool(predicted_champion == actual_champion)
 
         return {
@@ -446,14 +1055,183 @@ async def get_actual_champion(season: int):
             "actual_champion": str(actual_champion),
             "predicted_champion": str(predicted_champion),
             "correct": correct,
-            "actual_rank": actual_rank,
-            "actual_probability": actual_probability
+            "actual_rank": actual.rank,
+            "actual_probability": actual.championship_probability
         }
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _simulation_builder(season, simulations, seed):
+    def build(snapshot):
+        teams = simulate(snapshot.seasons[season], TEAM_CONFERENCES, simulations=simulations, seed=seed)
+        return serialize(SimulationResponse(
+            season=season,
+            simulations=simulations,
+            seed=seed,
+            teams=[SimulatedTeam(**team) for team in teams]
+        ))
+    return build
+
+
+@app.get("/simulate/{season}", response_model=SimulationResponse)
+async def simulate_season(
+    season: int,
+    request: Request,
+    simulations: int = Query(SIMULATIONS, ge=1000, le=MAX_SIMULATIONS, description="Tournaments to simulate"),
+    seed: int = Query(0, ge=0, description="Random seed; the same seed gives the same odds")
+):
+    """Simulate the season's playoff bracket and return each team's odds of reaching every round"""
+    try:
+        active = deployment
+        await require(active.prediction_resource)
+        if not active.prediction_store.get().seasons.get(season):
+            raise HTTPException(
+                status_code=404,
+                detail=f"Predictions for season {season} not found"
+            )
+
+        key = (season, simulations, seed)
+        precomputed = active.simulation_cache.get(key)
+        if precomputed is None:
+            precomputed = await worker_pool.run(
+                active.simulation_cache.get_or_build, key, _simulation_builder(season, simulations, seed)
+            )
+
+        return serve(request, precomputed)
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _explanation_response(explainer, explanation, row):
+    contributions = [
+        FeatureContribution(
+            feature=feature,
+            value=float(explanation.values[row, column]),
+            contribution=float(explanation.contributions[row, column]),
+            **{name: float(explanation.model_contributions[name][row, column]) for name in MODELS}
+        )
+        for column, feature in enumerate(explainer.feature_names)
+    ]
+    contributions.sort(key=lambda entry: abs(entry.contribution), reverse=True)
+
+    return Explanation(
+        season=explanation.season,
+        team_name=explanation.full_names[row],
+        team_abbr=explanation.abbreviations[row],
+        model_version=explainer.version,
+        championship_probability=float(explanation.probability[row]),
+        base_probability=float(explanation.base_probability[row]),
+        **{f"{name}_probability": float(explanation.model_probabilities[name][row]) for name in MODELS},
+        contributions=contributions
+    )
+
+
+@app.get("/explain/{season}/{team}", response_model=Explanation)
+async def explain_team(season: int, team: str):
+    """
+    Break one team's championship probability down by feature
+    Contributions are in probability and sum to championship_probability - base_probability;
+    the per-model columns are each booster's raw log-odds contributions
+    """
+    try:
+        active = deployment
+        await require(active.explainer_resource)
+        explainer = active.explainer_resource.get()
+
+        explanation = explanation_cache.get(explainer.version, season)
+        if explanation is None:
+            explanation = await worker_pool.run(explanation_cache.get_or_compute, explainer, season)
+        if explanation is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Features for season {season} not found"
+            )
+
+        row = explanation.team(team.upper())
+        if row is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Team {team} not found in season {season}"
+            )
+
+        return _explanation_response(explainer, explanation, row)
+
+    except HTTPException:
+        raise
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _score_stats(stats_rows, endpoint):
+    timer = StageTimer(predict_stages, endpoint)
+    features = stats_matrix(stats_rows)
+    timer.mark("features")
+    # A batch queued across a version swap is scored by the new version
+    return deployment.batch_ensemble(len(stats_rows)).predict(features, timer=timer)
+
+
+prediction_cache = PredictionCache(PREDICT_CACHE_SIZE, ttl=PREDICT_CACHE_TTL, digits=PREDICT_CACHE_DIGITS)
+
+
+def _score_ensemble_probabilities(items):
+    """Score (cache key, feature row) items from the micro-batcher and cache the results"""
+    # Read once, so results are cached under the version that computed them
+    active = deployment
+    timer = StageTimer(predict_stages, "/predict")
+    features = np.vstack([row for _, row in items])
+    timer.mark("features")
+    probabilities = active.ensemble.predict(features, timer=timer).ensemble.tolist()
+    if prediction_cache.enabled:
+        prediction_cache.put_many(active.version, [key for key, _ in items], probabilities)
+    return probabilities
+
+
+predict_batcher = MicroBatcher(
+    _score_ensemble_probabilities,
+    worker_pool.run,
+    max_batch_size=PREDICT_MAX_BATCH_SIZE,
+    max_wait_ms=PREDICT_BATCH_WINDOW_MS
+)
+
+metrics.register(HistogramView(
+    "predict_batch_size", "Rows per /predict micro-batch", predict_batcher.batch_sizes
+))
+metrics.register(HistogramView(
+    "predict_queue_wait_seconds", "Time a /predict row waits for its micro-batch to be dispatched",
+    predict_batcher.queue_wait
+))
+metrics.register(Gauge(
+    "predict_batch_pending", "/predict rows waiting for the next micro-batch", lambda: predict_batcher.pending
+))
+metrics.register(CounterView(
+    "predict_cache_hits_total", "/predict requests answered from the result cache", lambda: prediction_cache.hits
+))
+metrics.register(CounterView(
+    "predict_cache_misses_total", "/predict requests scored by the ensemble", lambda: prediction_cache.misses
+))
+metrics.register(CounterView(
+    "predict_cache_evictions_total", "/predict results evicted to stay within API_PREDICT_CACHE_SIZE",
+    lambda: prediction_cache.evictions
+))
+metrics.register(Gauge(
+    "worker_pool_in_flight", "Jobs running or queued in the worker pool", lambda: worker_pool.in_flight
+))
+metrics.register(Gauge(
+    "worker_pool_capacity", "Jobs the worker pool admits before answering 503", lambda: worker_pool.capacity
+))
+
+
 @app.post("/predict")
 async def predict_custom(stats: TeamStats):
     """
@@ -461,38 +1239,131 @@ async def predict_custom(stats: TeamStats):
     Note: Elite model uses 42 features but this endpoint only accepts 33
     """
     try:
-        features = [[
-            stats.wins, stats.win_pct, stats.ppg, stats.opp_ppg,
-            stats.point_diff, stats.fg_pct, stats.ft_pct, stats.fg3_pct,
-            stats.fg3m, stats.opp_fg3_pct, stats.fg3_diff, stats.apg,
-            stats.rpg, stats.spg, stats.bpg, stats.oreb, stats.dreb,
-            stats.reb_diff, stats.oreb_rate, stats.dreb_rate, stats.tov,
-            stats.tov_diff, stats.ast_tov_ratio, stats.defensive_pressure,
-            stats.pressure_diff, stats.off_efficiency, stats.def_efficiency,
-            stats.efficiency_diff, stats.ft_rate, stats.discipline,
-            stats.recent_win_pct, stats.recent_point_diff, stats.momentum,
-            0, 0, 0, 0, 0, 0, 0, 0, 0
-        ]]
-
-        features_scaled = scaler.transform(features)
-
-        pred_xgb = xgb_model.predict_proba(features_scaled)[0][1]
-        pred_lgbm = lgbm_model.predict_proba(features_scaled)[0][1]
-        pred_catboost = catboost_model.predict_proba(features_scaled)[0][1]
-
-        probability = (pred_xgb + pred_lgbm + pred_catboost) / 3
+        await require(deployment.model_resource)
+        active = deployment
+        row = stats_matrix([stats])[0]
+        key = prediction_cache.key(row) if prediction_cache.enabled else None
+        # Hits are answered here, without waiting for a micro-batch
+        probability = prediction_cache.get(active.version, key)
+        if probability is None:
+            probability = float(await predict_batcher.submit((key, row)))
 
         return {
-            "championship_probability": float(probability),
-            "prediction": "Elite Contender" if probability > 0.3 else "Unlikely Champion",
-            "confidence": "High" if probability > 0.5 or probability < 0.1 else "Moderate",
+            "championship_probability": probability,
+            "prediction": _prediction_label(probability),
+            "confidence": _confidence_label(probability),
             "model": "Elite Ensemble"
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/predict/batch", response_model=BatchPredictResponse)
+async def predict_batch(request: BatchPredictRequest):
+    """
+    Score many custom team stat rows in one pass through each model
+    Rows are returned in request order with per-model probabilities
+    """
+    try:
+        await require(deployment.model_resource)
+        result = await worker_pool.run(_score_stats, request.teams, "/predict/batch")
+
+        predictions = []
+        for xgb_prob, lgbm_prob, catboost_prob, probability in zip(
+            result.xgboost.tolist(), result.lightgbm.tolist(),
+            result.catboost.tolist(), result.ensemble.tolist()
+        ):
+            predictions.append(BatchPrediction(
+                championship_probability=probability,
+                xgboost_probability=xgb_prob,
+                lightgbm_probability=lgbm_prob,
+                catboost_probability=catboost_prob,
+                prediction=_prediction_label(probability),
+                confidence=_confidence_label(probability)
+            ))
+
+        return BatchPredictResponse(predictions=predictions, model="Elite Ensemble")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/stats/batching")
+async def get_batching_stats():
+    """Batch-size and queue-wait histograms for the /predict micro-batcher"""
+    return predict_batcher.stats()
+
+
+@app.get("/stats/cache")
+async def get_cache_stats():
+    """Size, settings and hit/miss counts of the /predict result cache"""
+    return prediction_cache.stats()
+
+
+def require_admin(request: Request):
+    """404 when no admin token is configured, 403 unless the request carries it as a bearer token"""
+    if ADMIN_TOKEN is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+# At most one profile at a time: overlapping samplers would each see the other's stack walks
+profile_sampler = None
+
+
+@app.get("/debug/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    request: Request,
+    seconds: float = Query(10.0, gt=0, le=PROFILE_MAX_SECONDS, description="How long to sample"),
+    interval_ms: float = Query(10.0, ge=1, le=1000, description="Time between samples"),
+    idle: bool = Query(False, description="Include threads that are blocked waiting")
+):
+    """
+    Sample every thread of this worker process for `seconds` and return
+    the stacks in the collapsed format (flamegraph.pl, speedscope)
+    """
+    global profile_sampler
+    require_admin(request)
+    if profile_sampler is not None:
+        raise HTTPException(status_code=409, detail="A profile is already running in this worker")
+
+    sampler = StackSampler(interval_ms / 1000, include_idle=idle)
+    profile_sampler = sampler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        # stop() wakes the sampler at once and waits for at most one stack walk
+        sampler.stop()
+        profile_sampler = None
+    return PlainTextResponse(collapsed(sampler.samples))
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Request counts, latencies, errors and /predict stage timings in the Prometheus text format"""
+    return PlainTextResponse(metrics.expose(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+if STARTUP_MODE == "eager":
+    deployment.warm()
+
+startup_timings.record("import", time.perf_counter() - _import_started)
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    if API_WORKERS > 1:
+        # Preload: parse, serialize and unpack once here instead of once per worker
+        print(f"Shared artifacts written to {build_shared_artifacts()}")
+        os.environ["API_SHARED_ARTIFACTS_DIR"] = str(SHARED_ARTIFACTS_DIR)
+        uvicorn.run("backend.app.main:app", host="0.0.0.0", port=8000, workers=API_WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
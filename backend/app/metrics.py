@@ -0,0 +1,260 @@
+"""
+Lightweight in-process metrics
+
+Fixed-bucket histograms and counters cheap enough to update on every
+request, rendered in the Prometheus text exposition format for /metrics.
+Each update is a bisect and a few additions under a per-series lock, so
+instrumentation stays on in production.
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+import threading
+import time
+
+# Request latencies, from a cached response to a cold season simulation
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Scoring stages of one ensemble call, from a single row to a 10,000-row batch
+STAGE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+# Requests whose path matches no route share one label, so scanners cannot grow the series
+UNMATCHED_ENDPOINT = "unmatched"
+# Why a 5xx was sent: only "error" means something broke, the others are the API shedding or gating load
+ERROR_REASON = "error"
+SATURATED_REASON = "saturated"
+NOT_READY_REASON = "not_ready"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style (each bucket counts values <= its bound)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        """Bucket upper bounds mapped to cumulative counts, plus sum and count"""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        cumulative = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            running += bucket_count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = count
+
+        return {"buckets": cumulative, "sum": total, "count": count}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _header(name, documentation, kind):
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+
+
+def _histogram_lines(name, label_names, label_values, snapshot):
+    lines = []
+    for bound, count in snapshot["buckets"].items():
+        le = f'le="{bound}"'
+        lines.append(f"{name}_bucket{_labels(label_names, label_values, le)} {count}")
+    lines.append(f"{name}_sum{_labels(label_names, label_values)} {snapshot['sum']}")
+    lines.append(f"{name}_count{_labels(label_names, label_values)} {snapshot['count']}")
+    return lines
+
+
+class Counter:
+    """Monotonic counts, one per combination of label values"""
+
+    def __init__(self, name, documentation, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = _header(self.name, self.documentation, "counter")
+        lines += [f"{self.name}{_labels(self.label_names, labels)} {value}" for labels, value in values]
+        return lines
+
+
+class HistogramFamily:
+    """One Histogram per combination of label values, created on first use"""
+
+    def __init__(self, name, documentation, buckets: Sequence[float], label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self._histograms: Dict[Tuple, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *label_values) -> Histogram:
+        # Lock-free once the series exists; dict reads are atomic
+        histogram = self._histograms.get(label_values)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(label_values, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, value, *label_values):
+        self.labels(*label_values).observe(value)
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        lines = _header(self.name, self.documentation, "histogram")
+        for labels, histogram in histograms:
+            lines += _histogram_lines(self.name, self.label_names, labels, histogram.snapshot())
+        return lines
+
+
+class HistogramView:
+    """Exposes a Histogram owned elsewhere (e.g. the micro-batcher's) under a metric name"""
+
+    def __init__(self, name, documentation, histogram: Histogram):
+        self.name = name
+        self.documentation = documentation
+        self.histogram = histogram
+
+    def expose(self) -> List[str]:
+        return _header(self.name, self.documentation, "histogram") + _histogram_lines(
+            self.name, (), (), self.histogram.snapshot()
+        )
+
+
+class Gauge:
+    """A value read from a callback at scrape time, so updating it costs nothing"""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, read: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+
+    def expose(self) -> List[str]:
+        return _header(self.name, self.documentation, self.kind) + [f"{self.name} {self.read()}"]
+
+
+class CounterView(Gauge):
+    """A count kept elsewhere (e.g. a cache's hits), read at scrape time"""
+    kind = "counter"
+
+
+class Registry:
+    """The metrics rendered by /metrics, in registration order"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.expose()
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """
+    Times consecutive stages of one call: each mark(stage) records the time
+    since the previous mark (or since the timer was created) in `stages`,
+    labelled with `label_values` followed by the stage name
+    """
+
+    def __init__(self, stages: HistogramFamily, *label_values):
+        self.stages = stages
+        self.label_values = label_values
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.observe(now - self._last, *self.label_values, stage)
+        self._last = now
+
+
+class RequestMetrics:
+    """
+    ASGI middleware counting HTTP requests, their latency and their errors
+    per (method, route template). Latency runs until the last body chunk
+    is sent; an exception escaping the app counts as a 500.
+
+    Errors also carry a reason label. A 503 with Retry-After is
+    "saturated" (a full pool shedding load), a 503 from one of the
+    `probes` routes is "not_ready", and anything else is "error".
+    """
+
+    def __init__(self, app, requests: Counter, errors: Counter, latency: HistogramFamily,
+                 probes: Sequence[str] = ()):
+        self.app = app
+        self.requests = requests
+        self.errors = errors
+        self.latency = latency
+        self.probes = frozenset(probes)
+
+    def _reason(self, status, endpoint, retry_after):
+        if status == 503 and retry_after:
+            return SATURATED_REASON
+        if status == 503 and endpoint in self.probes:
+            return NOT_READY_REASON
+        return ERROR_REASON
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        retry_after = False
+
+        async def send_wrapper(message):
+            nonlocal status, retry_after
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                retry_after = any(name.lower() == b"retry-after" for name, _ in message.get("headers", ()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router records the matched route in the scope; its template keeps the label set bounded
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or UNMATCHED_ENDPOINT
+            method = scope["method"]
+            self.latency.observe(time.perf_counter() - started, method, endpoint)
+            self.requests.inc(method, endpoint, str(status))
+            if status >= 500:
+                self.errors.inc(method, endpoint, self._reason(status, endpoint, retry_after))
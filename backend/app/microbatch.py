@@ -0,0 +1,96 @@
+"""
+Micro-batching for single-row inference
+
+Concurrent /predict calls are collected for a short window (or until the
+batch is full) and scored as one matrix, then each caller gets its own row
+back. This trades a few milliseconds of latency for running each booster
+once per batch instead of once per request.
+"""
+
+from typing import Awaitable, Callable, List, Sequence
+import asyncio
+import time
+
+from backend.app.metrics import Histogram
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+QUEUE_WAIT_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from the event loop into batches.
+
+    `score_batch(items)` is a blocking function returning one result per
+    item; it is executed through `run` (the worker pool). A batch is
+    dispatched when `max_batch_size` items are waiting or `max_wait_ms`
+    has passed since the first item arrived. If scoring raises, every
+    caller in that batch receives the exception.
+    """
+
+    def __init__(self, score_batch: Callable[[List], Sequence],
+                 run: Callable[..., Awaitable], max_batch_size=64, max_wait_ms=2.0):
+        self.score_batch = score_batch
+        self.run = run
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait = Histogram(QUEUE_WAIT_BUCKETS)
+        self._pending = []
+        self._timer = None
+
+    @property
+    def pending(self):
+        """Items waiting for the next batch"""
+        return len(self._pending)
+
+    async def submit(self, item):
+        """Queue one item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size or self.max_wait == 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            asyncio.ensure_future(self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        now = time.perf_counter()
+        self.batch_sizes.observe(len(batch))
+        for _, _, enqueued in batch:
+            self.queue_wait.observe(now - enqueued)
+
+        try:
+            results = await self.run(self.score_batch, [item for item, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            # Callers that disconnected have cancelled futures
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "pending": self.pending,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_seconds": self.queue_wait.snapshot()
+        }
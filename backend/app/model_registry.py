@@ -0,0 +1,238 @@
+"""
+Versioned model registry
+
+Training writes its artifacts to fixed paths (models/*_elite.*, and the
+prediction CSVs under backend/models/). Publishing copies one complete
+set into a version directory of its own, which is never modified again:
+
+    models/registry/
+        CURRENT                               {"version": ..., "previous": ...}
+        <version>/
+            xgboost_elite.joblib, lightgbm_elite.joblib, catboost_elite.joblib,
+            scaler_elite.joblib, model_metadata_elite.json,
+            ensemble_compiled_elite.npz, season_features_elite.npz
+            predictions/
+                latest_predictions_elite.csv
+                all_seasons_predictions_with_playoffs.csv
+                season_predictions/predictions_<year>.csv
+
+CURRENT is replaced with a rename, so a reader sees the old pointer or
+the new one, never a partial write. The API polls it, pre-warms the
+version it names and swaps it in without a restart. Activating the
+previous version again is a rollback.
+
+    python -m backend.app.model_registry publish [--name NAME] [--activate]
+    python -m backend.app.model_registry activate NAME
+    python -m backend.app.model_registry rollback
+    python -m backend.app.model_registry list
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_REGISTRY_DIR = PROJECT_ROOT / "models" / "registry"
+POINTER = "CURRENT"
+
+MODEL_FILES = {
+    "xgb": "xgboost_elite.joblib",
+    "lgbm": "lightgbm_elite.joblib",
+    "catboost": "catboost_elite.joblib",
+    "scaler": "scaler_elite.joblib",
+    "metadata": "model_metadata_elite.json",
+    "compiled": "ensemble_compiled_elite.npz",
+    "season_features": "season_features_elite.npz",
+}
+# A version is unusable without these; the rest only enable optional features
+REQUIRED_MODEL_FILES = ("xgb", "lgbm", "catboost", "scaler", "metadata")
+PREDICTIONS_FILE = "latest_predictions_elite.csv"
+HISTORICAL_FILE = "all_seasons_predictions_with_playoffs.csv"
+SEASON_DIR = "season_predictions"
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    """Where one version's models and prediction files live"""
+    name: str
+    model_dir: Path
+    predictions_dir: Path
+
+    def model_path(self, kind) -> Path:
+        return self.model_dir / MODEL_FILES[kind]
+
+    @property
+    def metadata_path(self) -> Path:
+        return self.model_path("metadata")
+
+    @property
+    def compiled_path(self) -> Path:
+        return self.model_path("compiled")
+
+    @property
+    def season_features_path(self) -> Path:
+        return self.model_path("season_features")
+
+    @property
+    def predictions_path(self) -> Path:
+        return self.predictions_dir / PREDICTIONS_FILE
+
+    @property
+    def historical_path(self) -> Path:
+        return self.predictions_dir / HISTORICAL_FILE
+
+    @property
+    def season_dir(self) -> Path:
+        return self.predictions_dir / SEASON_DIR
+
+
+# The fixed paths training writes to, served when nothing has been published
+UNVERSIONED = ModelVersion("unversioned", PROJECT_ROOT / "models", PROJECT_ROOT / "backend" / "models")
+
+
+def _write_json_atomic(path, content):
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(content, f)
+    os.replace(tmp_path, path)
+
+
+class ModelRegistry:
+    def __init__(self, root=DEFAULT_REGISTRY_DIR):
+        self.root = Path(root)
+
+    def version(self, name) -> ModelVersion:
+        directory = self.root / name
+        return ModelVersion(name, directory, directory / "predictions")
+
+    def versions(self) -> List[str]:
+        """Published versions, oldest first"""
+        if not self.root.exists():
+            return []
+        return sorted(
+            path.name for path in self.root.iterdir()
+            if not path.name.startswith(".") and (path / MODEL_FILES["metadata"]).exists()
+        )
+
+    def pointer(self) -> Optional[dict]:
+        """{"version", "previous"}, or None before anything is activated; ValueError if it is unreadable"""
+        try:
+            with open(self.root / POINTER, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{POINTER} in {self.root} is not valid JSON ({e}); activate a version to replace it")
+
+    def current(self) -> Optional[ModelVersion]:
+        """The active version; raises FileNotFoundError if the pointer names a missing version"""
+        pointer = self.pointer()
+        if pointer is None:
+            return None
+        version = self.version(pointer["version"])
+        if not version.metadata_path.exists():
+            raise FileNotFoundError(f"{POINTER} names version {pointer['version']}, which is not in {self.root}")
+        return version
+
+    def publish(self, source=UNVERSIONED, name=None, activate=False) -> ModelVersion:
+        """
+        Copy a complete set of artifacts from source into a new version
+        directory, which appears under its final name only once complete
+        """
+        missing = [MODEL_FILES[kind] for kind in REQUIRED_MODEL_FILES if not source.model_path(kind).exists()]
+        if missing:
+            raise FileNotFoundError(f"Cannot publish, missing from {source.model_dir}: {', '.join(missing)}")
+
+        if name is None:
+            name = datetime.now().strftime("%Y%m%d-%H%M%S")
+        if (self.root / name).exists():
+            raise FileExistsError(f"Version {name} already exists in {self.root}")
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{name}.", dir=self.root))
+        try:
+            staged = ModelVersion(name, tmp_dir, tmp_dir / "predictions")
+            for kind in MODEL_FILES:
+                if source.model_path(kind).exists():
+                    shutil.copy2(source.model_path(kind), staged.model_path(kind))
+
+            staged.predictions_dir.mkdir()
+            for path in (source.predictions_path, source.historical_path):
+                if path.exists():
+                    shutil.copy2(path, staged.predictions_dir / path.name)
+            if source.season_dir.exists():
+                staged.season_dir.mkdir()
+                for path in sorted(source.season_dir.glob("predictions_*.csv")):
+                    shutil.copy2(path, staged.season_dir / path.name)
+
+            os.replace(tmp_dir, self.root / name)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(name)
+        return self.version(name)
+
+    def activate(self, name) -> ModelVersion:
+        """Point CURRENT at a published version, remembering the one it replaces for rollback()"""
+        version = self.version(name)
+        if not version.metadata_path.exists():
+            raise FileNotFoundError(f"Version {name} is not in {self.root}")
+
+        try:
+            pointer = self.pointer()
+        except ValueError:
+            # A damaged pointer is simply replaced; the version it named is unknown
+            pointer = None
+        previous = pointer["version"] if pointer is not None else None
+        if previous == name:
+            return version
+        _write_json_atomic(self.root / POINTER, {"version": name, "previous": previous})
+        return version
+
+    def rollback(self) -> ModelVersion:
+        """Re-activate the version that was current before the last activation"""
+        pointer = self.pointer()
+        if pointer is None or pointer.get("previous") is None:
+            raise ValueError("No previous version to roll back to")
+        return self.activate(pointer["previous"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish, activate and roll back model versions")
+    parser.add_argument("--registry", default=str(DEFAULT_REGISTRY_DIR), help="Registry directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    publish = commands.add_parser("publish", help="Copy the artifacts at the training output paths into a new version")
+    publish.add_argument("--name", help="Version name (default: the current time, YYYYMMDD-HHMMSS)")
+    publish.add_argument("--activate", action="store_true", help="Make it the current version")
+    activate = commands.add_parser("activate", help="Make a published version the current one")
+    activate.add_argument("name")
+    commands.add_parser("rollback", help="Re-activate the previous version")
+    commands.add_parser("list", help="List published versions")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.registry)
+    if args.command == "publish":
+        version = registry.publish(name=args.name, activate=args.activate)
+        print(f"Published {version.name} to {version.model_dir}" + (" (current)" if args.activate else ""))
+    elif args.command == "activate":
+        print(f"Current version: {registry.activate(args.name).name}")
+    elif args.command == "rollback":
+        print(f"Rolled back to {registry.rollback().name}")
+    else:
+        pointer = registry.pointer() or {}
+        for name in registry.versions():
+            marker = " (current)" if name == pointer.get("version") else ""
+            print(f"{name}{marker}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Pre-serialized responses for the read-only endpoints
+
+Prediction data only changes when the model is retrained, so the JSON body
+and its compressed variants are built once and served straight from memory
+with a strong ETag.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional, Tuple, Union
+import gzip
+import hashlib
+import json
+import threading
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+@dataclass(frozen=True)
+class PrecomputedResponse:
+    # bytes, or memoryview slices of a shared artifact bundle's mapped responses.bin
+    body: Union[bytes, memoryview]
+    etag: str
+    gzip_body: Optional[Union[bytes, memoryview]] = None
+    brotli_body: Optional[Union[bytes, memoryview]] = None
+
+    def encoded(self, accepted) -> Tuple[Union[bytes, memoryview], Optional[str], str]:
+        """(body, content-coding, ETag) of the representation chosen for a set of accepted codings"""
+        if self.brotli_body is not None and 'br' in accepted:
+            return self.brotli_body, 'br', _encoded_etag(self.etag, 'br')
+        if self.gzip_body is not None and 'gzip' in accepted:
+            return self.gzip_body, 'gzip', _encoded_etag(self.etag, 'gzip')
+        return self.body, None, self.etag
+
+
+def _matches(if_none_match: Optional[str], etag) -> bool:
+    """True if an If-None-Match header names etag (weak comparison) or is '*'"""
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(',')}
+    if '*' in tags:
+        return True
+    return etag in {tag[2:] if tag.startswith('W/') else tag for tag in tags}
+
+
+def _encoded_etag(etag, encoding):
+    # Each content-coding is a different byte sequence, so it gets its own strong tag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def serialize(content) -> PrecomputedResponse:
+    """Encode content exactly like FastAPI's JSONResponse and build compressed variants"""
+    body = json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(gzip_body) >= len(body):
+        gzip_body = None
+
+    brotli_body = None
+    if brotli is not None:
+        brotli_body = brotli.compress(body, quality=11)
+        if len(brotli_body) >= len(body):
+            brotli_body = None
+
+    return PrecomputedResponse(body=body, etag=etag, gzip_body=gzip_body, brotli_body=brotli_body)
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def serve(request: Request, precomputed: PrecomputedResponse) -> Response:
+    """
+    Answer from memory, honouring If-None-Match and Accept-Encoding. The
+    encoding is negotiated first, so a 304 carries the ETag of the
+    representation a 200 would have sent, and only that tag validates.
+    """
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    body, encoding, etag = precomputed.encoded(accepted)
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": "no-cache", "ETag": etag}
+
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class SnapshotResponses:
+    """
+    Serialized responses derived from a PredictionStore snapshot, rebuilt
+    only when the store swaps in a new snapshot.
+    """
+
+    def __init__(self, store, build: Callable[[object], Dict[str, PrecomputedResponse]]):
+        self.store = store
+        self.build = build
+        # (snapshot, responses) replaced together so readers never mix versions
+        self._current = (None, {})
+        self._lock = threading.Lock()
+
+    def _responses_for(self, snapshot):
+        current = self._current
+        if current[0] is not snapshot:
+            with self._lock:
+                current = self._current
+                if current[0] is not snapshot:
+                    current = (snapshot, self.build(snapshot))
+                    self._current = current
+        return current[1]
+
+    def install(self, snapshot, responses):
+        """Use responses serialized elsewhere (e.g. by a parent process) for snapshot"""
+        with self._lock:
+            self._current = (snapshot, responses)
+
+    def responses(self) -> Dict[str, PrecomputedResponse]:
+        return self._responses_for(self.store.get())
+
+    def refresh(self):
+        """Build responses for the store's current snapshot ahead of the next request"""
+        self._responses_for(self.store.get())
+
+    def get(self, key) -> Optional[PrecomputedResponse]:
+        return self._responses_for(self.store.get()).get(key)
+
+
+class SnapshotCache:
+    """
+    Responses computed on demand from a PredictionStore snapshot (e.g. one
+    per request parameter set), kept until the store swaps in a new
+    snapshot. At most `max_entries` are kept, least recently used first out.
+    """
+
+    def __init__(self, store, max_entries=64):
+        self.store = store
+        self.max_entries = max_entries
+        self._snapshot = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _current(self):
+        snapshot = self.store.get()
+        if self._snapshot is not snapshot:
+            self._snapshot = snapshot
+            self._entries.clear()
+        return snapshot
+
+    def get(self, key: Hashable) -> Optional[PrecomputedResponse]:
+        with self._lock:
+            self._current()
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+
+    def get_or_build(self, key: Hashable, build: Callable[[object], PrecomputedResponse]) -> PrecomputedResponse:
+        """Cached response for key, or build(snapshot) stored for next time; build runs outside the lock"""
+        with self._lock:
+            snapshot = self._current()
+            response = self._entries.get(key)
+        if response is not None:
+            return response
+
+        response = build(snapshot)
+        with self._lock:
+            # Drop it if the snapshot changed while building
+            if self._current() is snapshot:
+                self._entries[key] = response
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return response
+
@@ -0,0 +1,116 @@
+"""
+Result cache for /predict
+
+Dashboards and what-if tools send the same TeamStats again and again.
+The ensemble is deterministic for a model version, so its probability for
+a feature vector can be reused. The key is the zero-padded 42-column row
+the ensemble scores, as bytes. Negative zero is folded into zero, so rows
+that score identically share a key.
+
+With `digits` set, every feature is first rounded to that many
+significant digits, so near-duplicate payloads (30.0 vs 30.000001 points
+per game) hit the same entry. A hit then returns the probability of the
+first row seen in that bucket, not of the row sent. Significant digits
+rather than a fixed step, because the features range from percentages
+to point totals.
+
+Entries are tied to the model version that computed them. The first
+lookup under a different version clears the cache, and results stored
+for any version but the one last looked up are dropped, so a batch
+scored across a version swap cannot repopulate the old entries. At most
+`max_entries` are kept, least recently used first out, and with a TTL
+entries also expire.
+"""
+
+from collections import OrderedDict
+from typing import Optional
+import threading
+import time
+
+import numpy as np
+
+
+def round_significant(row, digits) -> np.ndarray:
+    """Each finite, non-zero value rounded to `digits` significant digits"""
+    row = np.asarray(row, dtype=np.float64)
+    finite = np.isfinite(row) & (row != 0)
+    magnitude = np.floor(np.log10(np.abs(row, where=finite, out=np.ones_like(row))))
+    scale = 10.0 ** (digits - 1 - magnitude)
+    return np.where(finite, np.round(row * scale) / scale, row)
+
+
+class PredictionCache:
+    """Ensemble probabilities keyed by (model version, feature row); thread-safe"""
+
+    def __init__(self, max_entries=4096, ttl=None, digits=None):
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = ttl if ttl else None
+        self.digits = digits if digits else None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def key(self, row) -> bytes:
+        """Canonical bytes of one (42,) feature row"""
+        row = np.asarray(row, dtype=np.float64)
+        if self.digits is not None:
+            row = round_significant(row, self.digits)
+        # Adding 0.0 turns -0.0 into 0.0
+        return (row + 0.0).tobytes()
+
+    def _check_version(self, version):
+        if version != self._version:
+            self._version = version
+            self._entries.clear()
+
+    def get(self, version, key) -> Optional[float]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put_many(self, version, keys, probabilities):
+        """Store the probabilities `version` computed for keys"""
+        if not self.enabled:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if version != self._version:
+                return
+            for key, probability in zip(keys, probabilities):
+                self._entries[key] = (probability, expires)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "digits": self.digits,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else None
+            }
@@ -0,0 +1,232 @@
+"""
+In-memory prediction store
+
+Loads the prediction CSVs written by train_elite_model.py once, keeps them
+as typed records keyed by season, and reloads them when the files change
+on disk.
+"""
+
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Optional, Sequence
+from pathlib import Path
+import math
+import threading
+import time
+
+from backend.app.team_seasons import TeamSeasonIndex
+
+
+@dataclass(frozen=True)
+class TeamPrediction:
+    full_name: str
+    abbreviation: str
+    wins: float
+    win_pct: float
+    ppg: float
+    point_diff: float
+    championship_probability: float
+    xgboost_probability: Optional[float] = None
+    lightgbm_probability: Optional[float] = None
+    catboost_probability: Optional[float] = None
+    # Only in the season files; used by the bracket simulation
+    efficiency_diff: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class HistoricalRecord:
+    season: int
+    actual_champion: str
+    predicted_champion: str
+    predicted_probability: float
+    correct: bool
+    actual_champion_rank: int
+    actual_champion_probability: float
+
+
+@dataclass(frozen=True)
+class PredictionSnapshot:
+    """Immutable view of every prediction file, swapped in as a whole"""
+    # Lists when parsed from the CSVs, shared_artifacts.MappedTable when read from a bundle
+    latest: Optional[Sequence[TeamPrediction]]
+    historical: Optional[Sequence[HistoricalRecord]]
+    seasons: Dict[int, Sequence[TeamPrediction]]
+    mtimes: Dict[Path, float] = field(default_factory=dict)
+    loaded_at: float = 0.0
+
+    @cached_property
+    def team_seasons(self) -> TeamSeasonIndex:
+        """Lookup index over `seasons`, built on first use and kept with this snapshot"""
+        return TeamSeasonIndex(self.seasons)
+
+
+def _optional_float(row, column):
+    value = row.get(column)
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return float(value)
+
+
+def _csv_records(path):
+    # pandas is only imported once a file is actually read, keeping it off the server's import path
+    import pandas as pd
+
+    return pd.read_csv(path).to_dict('records')
+
+
+def _read_latest(path):
+    return [
+        TeamPrediction(
+            full_name=row['full_name'],
+            abbreviation=row['abbreviation'],
+            wins=float(row['wins']),
+            win_pct=float(row['win_pct']),
+            ppg=float(row['ppg']),
+            point_diff=float(row['point_diff']),
+            championship_probability=float(row['championship_probability']),
+            xgboost_probability=_optional_float(row, 'xgboost_probability'),
+            lightgbm_probability=_optional_float(row, 'lightgbm_probability'),
+            catboost_probability=_optional_float(row, 'catboost_probability')
+        )
+        for row in _csv_records(path)
+    ]
+
+
+def _read_season(path):
+    return season_records(_csv_records(path))
+
+
+def season_records(rows):
+    """TeamPredictions from season-file rows, which use the raw aggregate column names (won, pts)"""
+    return [
+        TeamPrediction(
+            full_name=row['full_name'],
+            abbreviation=row['abbreviation'],
+            wins=float(row['won']),
+            win_pct=float(row['win_pct']),
+            ppg=float(row['pts']),
+            point_diff=float(row['point_diff']),
+            championship_probability=float(row['championship_probability']),
+            efficiency_diff=_optional_float(row, 'efficiency_diff')
+        )
+        for row in rows
+    ]
+
+
+def _read_historical(path):
+    return [
+        HistoricalRecord(
+            season=int(row['season']),
+            actual_champion=row['actual_champion'],
+            predicted_champion=row['predicted_champion'],
+            predicted_probability=float(row['predicted_probability']),
+            correct=bool(row['correct']),
+            actual_champion_rank=int(row['actual_champion_rank']),
+            actual_champion_probability=float(row['actual_champion_probability'])
+        )
+        for row in _csv_records(path)
+    ]
+
+
+class PredictionStore:
+    """
+    Holds the current PredictionSnapshot and reloads it when any source
+    file's mtime changes. With `check_interval=None`, get() never touches
+    the filesystem and reloads are left to an external watcher calling
+    reload_if_changed().
+
+    Readers always get a complete snapshot: a reload parses every file into
+    a new snapshot and replaces the reference in a single assignment. Files
+    that were modified within `settle_seconds` are treated as still being
+    written and the reload is retried on a later check; if parsing fails
+    the previous snapshot keeps being served.
+    """
+
+    def __init__(self, predictions_path, historical_path, season_dir,
+                 check_interval=2.0, settle_seconds=1.0):
+        self.predictions_path = Path(predictions_path)
+        self.historical_path = Path(historical_path)
+        self.season_dir = Path(season_dir)
+        self.check_interval = check_interval
+        self.settle_seconds = settle_seconds
+        self._snapshot = PredictionSnapshot(latest=None, historical=None, seasons={})
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _source_files(self) -> List[Path]:
+        files = [self.predictions_path, self.historical_path]
+        if self.season_dir.exists():
+            files.extend(sorted(self.season_dir.glob("predictions_*.csv")))
+        return files
+
+    def current_mtimes(self) -> Dict[Path, float]:
+        mtimes = {}
+        for path in self._source_files():
+            try:
+                mtimes[path] = path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+        return mtimes
+
+    def _build(self, mtimes) -> PredictionSnapshot:
+        latest = _read_latest(self.predictions_path) if self.predictions_path in mtimes else None
+        historical = _read_historical(self.historical_path) if self.historical_path in mtimes else None
+
+        seasons = {}
+        for path in mtimes:
+            if path.parent == self.season_dir and path.stem.startswith("predictions_"):
+                seasons[int(path.stem.split('_')[1])] = _read_season(path)
+
+        return PredictionSnapshot(
+            latest=latest,
+            historical=historical,
+            seasons=seasons,
+            mtimes=mtimes,
+            loaded_at=time.time()
+        )
+
+    def load(self):
+        """Load every prediction file, replacing the current snapshot"""
+        with self._lock:
+            self._snapshot = self._build(self.current_mtimes())
+            self._last_check = time.monotonic()
+        return self._snapshot
+
+    def install(self, snapshot):
+        """Serve a snapshot built elsewhere; its mtimes decide when the files next count as changed"""
+        with self._lock:
+            self._snapshot = snapshot
+            self._last_check = time.monotonic()
+        return snapshot
+
+    def reload_if_changed(self) -> bool:
+        """Rebuild the snapshot if the files on disk changed since the last load"""
+        if not self._lock.acquire(blocking=False):
+            # Another request is already reloading; keep serving the old snapshot
+            return False
+        try:
+            self._last_check = time.monotonic()
+            mtimes = self.current_mtimes()
+            if mtimes == self._snapshot.mtimes:
+                return False
+
+            newest = max(mtimes.values(), default=0.0)
+            if time.time() - newest < self.settle_seconds:
+                return False
+
+            try:
+                snapshot = self._build(mtimes)
+            except Exception as e:
+                print(f"Warning: prediction reload failed, serving previous data: {e}")
+                return False
+
+            self._snapshot = snapshot
+            return True
+        finally:
+            self._lock.release()
+
+    def get(self) -> PredictionSnapshot:
+        """Current snapshot, checking the files for changes at most every `check_interval` seconds"""
+        if self.check_interval is not None and time.monotonic() - self._last_check >= self.check_interval:
+            self.reload_if_changed()
+        return self._snapshot
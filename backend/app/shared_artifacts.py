@@ -0,0 +1,260 @@
+"""
+Read-only artifacts shared by every API worker
+
+With several uvicorn workers, each process parsed the prediction CSVs,
+serialized and compressed every read-only response, and loaded its own
+copy of the compiled ensemble. build_bundle() does that work once, in the
+parent process, and writes the result to a directory:
+
+    manifest.json                     source mtimes, tables, response offsets
+    ensemble/<array>.npy              compiled ensemble arrays
+    predictions/<table>/<field>.npy   prediction snapshot, one array per field
+    responses.bin                     every pre-serialized response body
+
+Workers memory-map all of it, so the model arrays, the prediction columns
+and every response body are held once in the OS page cache however many
+workers run. Response bodies are served as memoryview slices of the
+mapped responses.bin. Prediction tables stay as mapped column arrays
+(MappedTable), and a record is built only when a request reads it. Per
+worker, only what a worker derives itself is private: the team-season
+index built on first use and, after a reload from the CSVs, the rebuilt
+snapshot. A worker that finds a bundle matching the files on disk is
+ready without importing pandas or compressing anything. A missing or
+stale bundle is ignored, and the worker loads the sources itself as
+before.
+
+Build a bundle without starting the server:
+    python -m backend.app.shared_artifacts
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Dict, Optional
+import json
+import math
+import mmap
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from backend.app.compiled_ensemble import CompiledEnsemble, save_unpacked
+from backend.app.precomputed import PrecomputedResponse
+from backend.app.prediction_store import HistoricalRecord, PredictionSnapshot, TeamPrediction
+
+FORMAT_VERSION = 2
+MANIFEST = "manifest.json"
+RESPONSES = "responses.bin"
+
+
+@dataclass
+class SharedBundle:
+    """What a worker could use from a bundle; stale parts are None"""
+    snapshot: Optional[PredictionSnapshot] = None
+    responses: Dict[str, PrecomputedResponse] = field(default_factory=dict)
+    ensemble: Optional[CompiledEnsemble] = None
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _write_table(directory, records):
+    """One array per dataclass field; None becomes NaN and is listed under 'optional'"""
+    directory.mkdir(parents=True)
+    optional = []
+    for record_field in fields(records[0]):
+        values = [getattr(record, record_field.name) for record in records]
+        if any(value is None for value in values):
+            values = [np.nan if value is None else value for value in values]
+            optional.append(record_field.name)
+        np.save(directory / f"{record_field.name}.npy", np.asarray(values))
+    return {"rows": len(records), "optional": optional}
+
+
+class MappedTable(Sequence):
+    """
+    A bundle table as a read-only sequence of records. The columns stay
+    memory-mapped; each access builds the record it returns, so no worker
+    holds a Python copy of the table.
+    """
+
+    def __init__(self, record_type, columns, optional=()):
+        self.record_type = record_type
+        self._columns = [(columns[record_field.name], record_field.name in optional)
+                         for record_field in fields(record_type)]
+        self._rows = len(self._columns[0][0]) if self._columns else 0
+
+    def __len__(self):
+        return self._rows
+
+    def _record(self, index):
+        values = []
+        for column, optional in self._columns:
+            value = column[index].item()
+            values.append(None if optional and math.isnan(value) else value)
+        return self.record_type(*values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(row) for row in range(*index.indices(self._rows))]
+        if index < 0:
+            index += self._rows
+        if not 0 <= index < self._rows:
+            raise IndexError("table index out of range")
+        return self._record(index)
+
+    def __repr__(self):
+        return f"MappedTable({self.record_type.__name__}, {self._rows} rows)"
+
+
+def _read_table(directory, info, record_type) -> MappedTable:
+    columns = {
+        record_field.name: np.load(directory / f"{record_field.name}.npy", mmap_mode="r", allow_pickle=False)
+        for record_field in fields(record_type)
+    }
+    return MappedTable(record_type, columns, info["optional"])
+
+
+def _map_file(path):
+    """A read-only mapping of the whole file, as a memoryview (empty files cannot be mapped)"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(b"")
+        # The mapping outlives the file object, and the bundle directory may later be replaced
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def build_bundle(directory, snapshot, responses, compiled_path=None):
+    """
+    Write a bundle for a loaded prediction snapshot, its serialized
+    responses and (optionally) the compiled ensemble. The directory is
+    replaced as a whole; workers that already mapped the previous files
+    keep reading them until they reload.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{directory.name}.", dir=directory.parent))
+
+    try:
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "created_at": time.time(),
+            "sources": {str(path): mtime for path, mtime in snapshot.mtimes.items()},
+            "loaded_at": snapshot.loaded_at,
+            "tables": {},
+            "responses": {},
+            "ensemble": None
+        }
+
+        tables = {"latest": snapshot.latest, "historical": snapshot.historical}
+        tables.update({f"season_{season}": records for season, records in snapshot.seasons.items()})
+        for name, records in tables.items():
+            if records:
+                manifest["tables"][name] = _write_table(tmp_dir / "predictions" / name, records)
+            elif records is not None:
+                manifest["tables"][name] = {"rows": 0, "optional": []}
+
+        offset = 0
+        with open(tmp_dir / RESPONSES, "wb") as f:
+            for key, response in responses.items():
+                entry = {"etag": response.etag}
+                for name in ("body", "gzip_body", "brotli_body"):
+                    content = getattr(response, name)
+                    if content is None:
+                        entry[name] = None
+                        continue
+                    f.write(content)
+                    entry[name] = [offset, len(content)]
+                    offset += len(content)
+                manifest["responses"][key] = entry
+
+        if compiled_path is not None and Path(compiled_path).exists():
+            with np.load(compiled_path, allow_pickle=False) as data:
+                save_unpacked({key: data[key] for key in data.files}, tmp_dir / "ensemble")
+            manifest["ensemble"] = {"source": str(compiled_path), "signature": _file_signature(compiled_path)}
+
+        with open(tmp_dir / MANIFEST, "w") as f:
+            json.dump(manifest, f)
+
+        # A non-empty directory cannot be renamed over, so move the old one aside first
+        old_dir = None
+        if directory.exists():
+            old_dir = Path(tempfile.mkdtemp(prefix=f".{directory.name}.old.", dir=directory.parent))
+            os.replace(directory, old_dir / directory.name)
+        os.replace(tmp_dir, directory)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return directory
+
+
+def load_bundle(directory, current_mtimes, compiled_path=None) -> Optional[SharedBundle]:
+    """
+    Read the parts of a bundle that still match their sources: the
+    predictions when current_mtimes (PredictionStore.current_mtimes())
+    equals the recorded mtimes, the ensemble when compiled_path is
+    unchanged. Returns None when there is no usable bundle.
+    """
+    directory = Path(directory)
+    try:
+        with open(directory / MANIFEST, "r") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest["format_version"] != FORMAT_VERSION:
+        return None
+
+    bundle = SharedBundle()
+
+    sources = {Path(path): mtime for path, mtime in manifest["sources"].items()}
+    if sources == current_mtimes:
+        tables = {}
+        for name, info in manifest["tables"].items():
+            record_type = HistoricalRecord if name == "historical" else TeamPrediction
+            tables[name] = _read_table(directory / "predictions" / name, info, record_type) if info["rows"] else []
+
+        bundle.snapshot = PredictionSnapshot(
+            latest=tables.pop("latest", None),
+            historical=tables.pop("historical", None),
+            seasons={int(name.split('_')[1]): records for name, records in tables.items()},
+            mtimes=sources,
+            loaded_at=manifest["loaded_at"]
+        )
+
+        # Bodies are slices of one mapping, so every worker serves the same pages
+        data = _map_file(directory / RESPONSES)
+        for key, entry in manifest["responses"].items():
+            bodies = {
+                name: None if entry[name] is None else data[entry[name][0]:entry[name][0] + entry[name][1]]
+                for name in ("body", "gzip_body", "brotli_body")
+            }
+            bundle.responses[key] = PrecomputedResponse(etag=entry["etag"], **bodies)
+
+    ensemble_info = manifest["ensemble"]
+    if (compiled_path is not None and ensemble_info is not None
+            and Path(ensemble_info["source"]) == Path(compiled_path)
+            and Path(compiled_path).exists()
+            and _file_signature(compiled_path) == ensemble_info["signature"]):
+        bundle.ensemble = CompiledEnsemble.load(directory / "ensemble")
+
+    if bundle.snapshot is None and bundle.ensemble is None:
+        return None
+    return bundle
+
+
+def main():
+    from backend.app import main as api
+
+    directory = api.build_shared_artifacts()
+    print(f"Shared artifacts written to {directory}")
+
+
+if __name__ == "__main__":
+    main()
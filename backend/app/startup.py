@@ -0,0 +1,75 @@
+"""
+Deferred loading and startup instrumentation
+
+Heavy resources (models, prediction files) are wrapped in LazyResource so
+they load on first use or in a background warm-up after the server is
+already accepting connections. StartupTimings records how long each phase
+took so slow cold starts can be traced.
+"""
+
+from contextlib import contextmanager
+import threading
+import time
+
+
+class StartupTimings:
+    """Wall-clock seconds per named startup phase, in the order they finished"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._phases = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases[name] = time.perf_counter() - start
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._phases[name] = seconds
+
+    def as_dict(self):
+        with self._lock:
+            return {name: round(seconds, 4) for name, seconds in self._phases.items()}
+
+    def summary(self):
+        return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.as_dict().items())
+
+
+class LazyResource:
+    """
+    Runs `loader` once, the first time get() is called from any thread.
+
+    Concurrent callers block on the same load instead of repeating it; if
+    the loader raises, the error is re-raised and the next get() retries.
+    """
+
+    def __init__(self, name, loader, timings=None):
+        self.name = name
+        self.loader = loader
+        self.timings = timings
+        self._loaded = False
+        self._value = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                if self.timings is not None:
+                    with self.timings.phase(self.name):
+                        self._value = self.loader()
+                else:
+                    self._value = self.loader()
+                self._loaded = True
+        return self._value
@@ -0,0 +1,147 @@
+"""
+Array-backed index of every team-season prediction
+
+Built once per prediction snapshot from the season files. Every
+team-season is one row of a NumPy structured array, ordered by season and
+rank, with team names and abbreviations stored as codes into small
+vocabularies. A dense (season, team) table of row numbers answers
+lookups by abbreviation or name in O(1), and each season's rows are
+contiguous, so its top N is a slice; each team's rows across seasons are
+listed up front, so its history costs one step per season returned.
+Lookups return small __slots__ records instead of DataFrames or copies
+of whole seasons.
+"""
+
+from array import array
+from typing import List, Optional
+
+import numpy as np
+
+ROW_DTYPE = np.dtype([
+    ('season', np.int32),
+    ('rank', np.int32),
+    ('full_name', np.int32),
+    ('abbreviation', np.int32),
+    ('wins', np.float64),
+    ('win_pct', np.float64),
+    ('ppg', np.float64),
+    ('point_diff', np.float64),
+    ('championship_probability', np.float64),
+])
+
+
+class TeamSeason:
+    """One team's prediction for one season; rank 1 is the predicted champion"""
+
+    __slots__ = ROW_DTYPE.names
+
+    def __init__(self, season, rank, full_name, abbreviation, wins, win_pct, ppg, point_diff,
+                 championship_probability):
+        self.season = season
+        self.rank = rank
+        self.full_name = full_name
+        self.abbreviation = abbreviation
+        self.wins = wins
+        self.win_pct = win_pct
+        self.ppg = ppg
+        self.point_diff = point_diff
+        self.championship_probability = championship_probability
+
+    def __repr__(self):
+        return f"TeamSeason({self.season}, #{self.rank} {self.abbreviation}, {self.championship_probability:.4f})"
+
+
+def _codes(values):
+    vocabulary = sorted(set(values))
+    return vocabulary, {value: code for code, value in enumerate(vocabulary)}
+
+
+class TeamSeasonIndex:
+    def __init__(self, seasons):
+        """seasons: {season: [TeamPrediction, ...]} as held by PredictionSnapshot"""
+        self._seasons = sorted(seasons)
+        self._season_slot = {season: slot for slot, season in enumerate(self._seasons)}
+        records = [record for season in self._seasons for record in seasons[season]]
+        self._names, self._name_codes = _codes(record.full_name for record in records)
+        self._abbreviations, self._abbreviation_codes = _codes(record.abbreviation for record in records)
+
+        self.rows = np.empty(len(records), dtype=ROW_DTYPE)
+        self._starts = np.zeros(len(self._seasons) + 1, dtype=np.intp)
+        self._row_by_name = np.full((len(self._seasons), len(self._names)), -1, dtype=np.int32)
+        self._row_by_abbreviation = np.full((len(self._seasons), len(self._abbreviations)), -1, dtype=np.int32)
+        self._team_rows = [array('i') for _ in self._abbreviations]
+
+        row = 0
+        for slot, season in enumerate(self._seasons):
+            # Stable, so ties keep the order of the file
+            ranked = sorted(seasons[season], key=lambda record: -record.championship_probability)
+            for rank, record in enumerate(ranked, start=1):
+                name = self._name_codes[record.full_name]
+                abbreviation = self._abbreviation_codes[record.abbreviation]
+                self.rows[row] = (
+                    season, rank, name, abbreviation, record.wins, record.win_pct, record.ppg,
+                    record.point_diff, record.championship_probability
+                )
+                self._row_by_name[slot, name] = row
+                self._row_by_abbreviation[slot, abbreviation] = row
+                self._team_rows[abbreviation].append(row)
+                row += 1
+            self._starts[slot + 1] = row
+
+        # Flattened into array.array: still 4 bytes a cell, but indexing returns a plain int
+        # several times faster than reading a NumPy scalar
+        self._row_by_name = array('i', self._row_by_name.ravel().tolist())
+        self._row_by_abbreviation = array('i', self._row_by_abbreviation.ravel().tolist())
+
+    def __len__(self):
+        return len(self.rows)
+
+    def seasons(self) -> List[int]:
+        return list(self._seasons)
+
+    def has_season(self, season) -> bool:
+        return season in self._season_slot
+
+    def latest_season(self) -> Optional[int]:
+        return self._seasons[-1] if self._seasons else None
+
+    def _record(self, values) -> TeamSeason:
+        return TeamSeason(
+            values[0], values[1], self._names[values[2]], self._abbreviations[values[3]],
+            values[4], values[5], values[6], values[7], values[8]
+        )
+
+    def _lookup(self, table, codes, season, key) -> Optional[TeamSeason]:
+        slot = self._season_slot.get(season)
+        code = codes.get(key)
+        if slot is None or code is None:
+            return None
+        row = table[slot * len(codes) + code]
+        return None if row < 0 else self._record(self.rows.item(row))
+
+    def get(self, season, abbreviation) -> Optional[TeamSeason]:
+        return self._lookup(self._row_by_abbreviation, self._abbreviation_codes, season, abbreviation)
+
+    def find(self, season, full_name) -> Optional[TeamSeason]:
+        return self._lookup(self._row_by_name, self._name_codes, season, full_name)
+
+    def top(self, season, n=None) -> List[TeamSeason]:
+        """The season's teams by rank, all of them when n is None; empty for an unknown season"""
+        slot = self._season_slot.get(season)
+        if slot is None:
+            return []
+        start, stop = self._starts[slot], self._starts[slot + 1]
+        if n is not None:
+            stop = min(stop, start + max(n, 0))
+        return [self._record(values) for values in self.rows[start:stop].tolist()]
+
+    def leader(self, season) -> Optional[TeamSeason]:
+        leaders = self.top(season, 1)
+        return leaders[0] if leaders else None
+
+    def history(self, abbreviation) -> List[TeamSeason]:
+        """Every season of one team, oldest first; empty for an unknown abbreviation"""
+        code = self._abbreviation_codes.get(abbreviation)
+        if code is None:
+            return []
+        return [self._record(self.rows.item(row)) for row in self._team_rows[code]]
@@ -0,0 +1,325 @@
+"""
+Walk-forward backtest of the elite ensemble
+
+For every season N, fits the scaler and the three boosters on the seasons
+before N and predicts season N, the way the model would have been used at
+the time. Seasons are independent fits, so they run in a process pool;
+the feature matrix is placed in shared memory once and every worker maps
+it instead of receiving a pickled copy per task.
+
+Writes backend/models/season_predictions/predictions_{year}.csv and the
+per-season summary to all_seasons_predictions.csv. The summary the API
+serves at /historical (all_seasons_predictions_with_playoffs.csv) is only
+replaced with --promote. Its columns the backtest does not compute
+(made_playoffs_prev, playoff_rounds_prev) are carried over for the
+seasons it already lists.
+
+By default XGBoost and LightGBM use the parameters recorded in
+models/model_metadata_elite.json (run train_elite_model.py first). That
+search cross-validated on every season, including the ones backtested
+here, so the hyperparameters have seen each test season and the reported
+accuracy is optimistic. --tune-trials N removes the leak: every fold runs
+its own search on the seasons before it. Folds with fewer than CV_SPLITS
+champions to cross-validate on use the library defaults instead.
+
+Usage:
+    python backend/backtest.py [--jobs N] [--min-train-seasons 1] [--stream] [--tune-trials N] [--promote]
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from pathlib import Path
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend import train_elite_model as training
+from backend.app.db import connect_readonly
+from backend.app.extract_cache import ExtractCache
+from backend.app.model_registry import HISTORICAL_FILE
+
+OUTPUT_DIR = PROJECT_ROOT / "backend" / "models"
+SUMMARY_NAME = "all_seasons_predictions.csv"
+SEASON_COLUMNS = [
+    'full_name', 'abbreviation', 'won', 'win_pct', 'pts', 'point_diff',
+    'tov_diff', 'efficiency_diff', 'championship_probability'
+]
+
+# Set per process by _init_worker
+_arrays = None
+_blocks = None
+_n_threads = None
+
+
+def share_arrays(arrays):
+    """Copy each array into its own shared memory block; returns (blocks, spec) where spec is picklable"""
+    blocks, spec = [], {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        spec[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, spec
+
+
+def attach_arrays(spec):
+    """Read-only views of blocks created by share_arrays; keep the blocks alive while the views are used"""
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        view.flags.writeable = False
+        blocks.append(block)
+        arrays[name] = view
+    return blocks, arrays
+
+
+def _init_worker(spec, n_threads):
+    global _arrays, _blocks, _n_threads
+    if spec is not None:
+        _blocks, _arrays = attach_arrays(spec)
+    _n_threads = n_threads
+
+
+def fit_predict_season(season_id, xgb_params, lgbm_params):
+    """Train on every season before season_id and return (season_id, ensemble, xgb, lgbm, catboost) probabilities"""
+    from sklearn.preprocessing import StandardScaler
+    from xgboost import XGBClassifier
+    from lightgbm import LGBMClassifier
+    from catboost import CatBoostClassifier
+
+    X, y, seasons = _arrays['X'], _arrays['y'], _arrays['seasons']
+    train, test = seasons < season_id, seasons == season_id
+
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train])
+    X_test = scaler.transform(X[test])
+
+    xgb_model = XGBClassifier(**xgb_params, random_state=42, eval_metric='logloss', n_jobs=_n_threads)
+    lgbm_model = LGBMClassifier(**lgbm_params, random_state=42, verbose=-1, n_jobs=_n_threads)
+    catboost_model = CatBoostClassifier(**training.CATBOOST_PARAMS, thread_count=_n_threads or -1)
+
+    probabilities = []
+    for model in (xgb_model, lgbm_model, catboost_model):
+        model.fit(X_train, y[train])
+        probabilities.append(model.predict_proba(X_test)[:, 1])
+    pred_xgb, pred_lgbm, pred_catboost = probabilities
+
+    return season_id, (pred_xgb + pred_lgbm + pred_catboost) / 3, pred_xgb, pred_lgbm, pred_catboost
+
+
+def tune_folds(X, y, seasons, test_seasons, n_trials, storage, n_jobs=None, warm_start=None):
+    """{season_id: (xgb_params, lgbm_params)} searched on the seasons before each test season only"""
+    from sklearn.preprocessing import StandardScaler
+    from backend.tuning import CV_SPLITS, tune
+
+    params = {}
+    for season_id in test_seasons:
+        train = seasons < season_id
+        if y[train].sum() < CV_SPLITS:
+            print(f"  {season_id}: fewer than {CV_SPLITS} champions to cross-validate on, using library defaults")
+            params[season_id] = ({}, {})
+            continue
+        print(f"  {season_id}: tuning on {int(train.sum())} team-seasons")
+        # Scaled like fit_predict_season scales the fold, so the search sees the same inputs
+        studies = tune(
+            StandardScaler().fit_transform(X[train]), y[train], storage,
+            n_trials=n_trials, n_jobs=n_jobs, warm_start=warm_start
+        )
+        params[season_id] = (studies['xgb'].best_params, studies['lgbm'].best_params)
+    return params
+
+
+def run_backtest(X, y, seasons, test_seasons, params, n_jobs=None):
+    """
+    Fit-and-predict every test season, in parallel when n_jobs > 1.
+    params maps each season to its (xgb_params, lgbm_params); returns {season_id: result}.
+    """
+    n_jobs = max(1, min(n_jobs or os.cpu_count() or 1, len(test_seasons)))
+    arrays = {
+        'X': np.asarray(X, dtype=np.float64),
+        'y': np.asarray(y, dtype=np.int64),
+        'seasons': np.asarray(seasons, dtype=np.int64)
+    }
+    results = {}
+
+    if n_jobs == 1:
+        global _arrays
+        _arrays = arrays
+        _init_worker(None, None)
+        for season_id in test_seasons:
+            started = time.perf_counter()
+            results[season_id] = fit_predict_season(season_id, *params[season_id])
+            print(f"  {season_id}: {time.perf_counter() - started:.1f}s")
+        return results
+
+    blocks, spec = share_arrays(arrays)
+    try:
+        n_threads = max(1, (os.cpu_count() or 1) // n_jobs)
+        # spawn rather than fork: the boosters' OpenMP runtimes are not fork-safe
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(spec, n_threads)
+        ) as pool:
+            futures = [
+                pool.submit(fit_predict_season, season_id, *params[season_id])
+                for season_id in test_seasons
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result[0]] = result
+                print(f"  {result[0]} done ({len(results)}/{len(test_seasons)})")
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return results
+
+
+def season_summary(season_df, season_id, training_seasons):
+    """One summary row, or None when the champion is unknown or missing from the data"""
+    actual_champion = training.CHAMPIONS.get(season_id)
+    if actual_champion is None:
+        return None
+    ranked = season_df.reset_index(drop=True)
+    matches = ranked.index[ranked['full_name'] == actual_champion]
+    if not len(matches):
+        print(f"Warning: {actual_champion} not found in season {season_id}, leaving it out of the summary")
+        return None
+    top = ranked.iloc[0]
+    actual = ranked.iloc[matches[0]]
+    return {
+        'season': season_id - 20000,
+        'season_id': season_id,
+        'actual_champion': actual_champion,
+        'predicted_champion': top['full_name'],
+        'predicted_probability': top['championship_probability'],
+        'correct': top['full_name'] == actual_champion,
+        'actual_champion_rank': int(matches[0]) + 1,
+        'actual_champion_probability': actual['championship_probability'],
+        'training_seasons': training_seasons
+    }
+
+
+def promote_summary(summary, served_path):
+    """
+    Replace the summary the API serves with this run's, keeping the served
+    file's extra columns for the seasons it already lists
+    """
+    served_path = Path(served_path)
+    if served_path.exists():
+        served = pd.read_csv(served_path)
+        extra = [column for column in served.columns if column not in summary.columns]
+        if extra:
+            summary = summary.merge(served[['season'] + extra], on='season', how='left')
+    training.write_csv_atomic(summary, served_path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest: train on seasons before N, predict N")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="Worker processes, one season per task (default: CPU count)")
+    parser.add_argument('--min-train-seasons', type=int, default=1,
+                        help="Skip test seasons with fewer earlier seasons than this")
+    parser.add_argument('--out-dir', default=str(OUTPUT_DIR),
+                        help="Directory for season_predictions/ and the summary CSVs")
+    parser.add_argument('--stream', action='store_true', help="Extract one season at a time (see train_elite_model.py)")
+    parser.add_argument('--no-cache', action='store_true', help="Query SQLite directly instead of the extraction cache")
+    parser.add_argument('--db', help="Database to read instead of db_path in data/config.json, "
+                                     "e.g. one from backend/synthetic_db.py")
+    parser.add_argument('--tune-trials', type=int, default=0,
+                        help="Optuna trials per model and fold, searched on that fold's training seasons "
+                             "(default: reuse the tuned parameters from training, which have seen every season)")
+    parser.add_argument('--storage', default=str(training.OPTUNA_STORAGE_PATH),
+                        help="Optuna storage for --tune-trials; each fold's studies resume like training's")
+    parser.add_argument('--promote', action='store_true',
+                        help=f"Also replace {HISTORICAL_FILE} in --out-dir, the summary the API serves")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    with open(training.MODEL_DIR / "model_metadata_elite.json", 'r') as f:
+        metadata = json.load(f)
+    db_path = args.db
+    if db_path is None:
+        with open(training.CONFIG_PATH, 'r') as f:
+            db_path = json.load(f)['db_path']
+
+    print("Building features...")
+    conn = connect_readonly(db_path)
+    if args.stream:
+        stats, _ = training.stream_features(conn)
+    else:
+        cache = None if args.no_cache else ExtractCache(training.EXTRACT_CACHE_DIR, db_path)
+        stats = training.engineer_features(training.load_team_games(conn, cache), conn)
+    conn.close()
+
+    all_seasons = sorted(int(season) for season in stats['season_id'].unique())
+    test_seasons = []
+    for season_id in all_seasons[args.min_train_seasons:]:
+        # The boosters need at least one champion and one non-champion to train on
+        if stats.loc[stats['season_id'] < season_id, 'is_champion'].nunique() < 2:
+            print(f"Skipping {season_id}: no champion among the earlier seasons")
+            continue
+        test_seasons.append(season_id)
+    if not test_seasons:
+        print("Not enough seasons to backtest")
+        return
+
+    X, y, seasons = stats[training.FEATURE_NAMES].values, stats['is_champion'].values, stats['season_id'].values
+    if args.tune_trials:
+        print(f"Tuning each fold ({args.tune_trials} trials per model)...")
+        warm_start = {'xgb': metadata['best_xgb_params'], 'lgbm': metadata['best_lgbm_params']}
+        params = tune_folds(X, y, seasons, test_seasons, args.tune_trials, args.storage, args.jobs, warm_start)
+    else:
+        print("Using the tuned parameters from training; they were searched on every season (see --tune-trials)")
+        params = {season_id: (metadata['best_xgb_params'], metadata['best_lgbm_params'])
+                  for season_id in test_seasons}
+
+    print(f"Backtesting {len(test_seasons)} seasons ({test_seasons[0]}-{test_seasons[-1]})...")
+    started = time.perf_counter()
+    results = run_backtest(X, y, seasons, test_seasons, params, n_jobs=args.jobs)
+    print(f"Backtest finished in {time.perf_counter() - started:.1f}s")
+
+    out_dir = Path(args.out_dir)
+    season_dir = out_dir / "season_predictions"
+    season_dir.mkdir(parents=True, exist_ok=True)
+
+    summary = []
+    for season_id in test_seasons:
+        _, probability, _, _, _ = results[season_id]
+        season_df = stats[stats['season_id'] == season_id].copy()
+        season_df['championship_probability'] = probability
+        season_df = season_df.sort_values('championship_probability', ascending=False)
+        training.write_csv_atomic(season_df[SEASON_COLUMNS], season_dir / f"predictions_{season_id - 20000}.csv")
+
+        row = season_summary(season_df, season_id, all_seasons.index(season_id))
+        if row is not None:
+            summary.append(row)
+
+    summary = pd.DataFrame(summary)
+    training.write_csv_atomic(summary, out_dir / SUMMARY_NAME)
+    correct = int(summary['correct'].sum()) if len(summary) else 0
+    print(f"Champion predicted correctly in {correct}/{len(summary)} seasons")
+    print(f"Wrote {len(test_seasons)} season files to {season_dir} and {out_dir / SUMMARY_NAME}")
+    if args.promote and len(summary):
+        promote_summary(summary, out_dir / HISTORICAL_FILE)
+        print(f"Promoted the summary to {out_dir / HISTORICAL_FILE}")
+    elif args.promote:
+        print(f"No season has a known champion, {HISTORICAL_FILE} left unchanged")
+
+
+if __name__ == "__main__":
+    main()
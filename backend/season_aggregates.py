@@ -0,0 +1,160 @@
+"""
+Incremental per-team-season aggregates for in-season refreshes
+
+Keeps running sums, non-null counts and a last-N-games buffer for every
+(season, team), plus a watermark on the last folded game. A daily refresh
+folds in only the games played since the watermark instead of re-reading
+and re-aggregating every season since 2003; frame() then yields the same
+columns as the full groupby in train_elite_model.aggregate_team_seasons.
+"""
+
+from pathlib import Path
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+RECENT_WINDOW = 20
+
+# Columns aggregated per team-season: 'won' is summed, the rest are averaged
+SUM_COLUMNS = ['won']
+MEAN_COLUMNS = [
+    'pts', 'opp_pts', 'fg_pct', 'ft_pct', 'fg3_pct', 'fg3m', 'opp_fg3_pct',
+    'ast', 'reb', 'oreb', 'dreb', 'opp_dreb', 'stl', 'blk', 'tov', 'pf',
+    'fga', 'fta', 'pts_paint', 'pts_2nd_chance', 'pts_fb', 'pts_off_to',
+    'opp_pts_paint', 'opp_pts_fb'
+]
+AGG_COLUMNS = SUM_COLUMNS + MEAN_COLUMNS
+KEY_COLUMNS = ['season_id', 'team_id']
+
+
+class SeasonAggregates:
+    def __init__(self, window=RECENT_WINDOW):
+        self.window = window
+        self.seasons = np.zeros(0, dtype=np.int64)
+        self.teams = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros((0, len(AGG_COLUMNS)), dtype=np.float64)
+        self.counts = np.zeros((0, len(AGG_COLUMNS)), dtype=np.int64)
+        self.games = np.zeros(0, dtype=np.int64)
+        # Right-aligned buffers of the last `window` results; recent_len says how many are real
+        self.recent_won = np.zeros((0, window), dtype=np.float64)
+        self.recent_diff = np.zeros((0, window), dtype=np.float64)
+        self.recent_len = np.zeros(0, dtype=np.int64)
+        # (game_date, game_id) of the newest folded game
+        self.watermark = None
+        self._rows = {}
+
+    def __len__(self):
+        return len(self.seasons)
+
+    def _rows_for(self, keys):
+        new_keys = [key for key in keys if key not in self._rows]
+        if new_keys:
+            start = len(self)
+            for offset, key in enumerate(new_keys):
+                self._rows[key] = start + offset
+            added = len(new_keys)
+            self.seasons = np.concatenate([self.seasons, [season for season, _ in new_keys]])
+            self.teams = np.concatenate([self.teams, [team for _, team in new_keys]])
+            self.sums = np.vstack([self.sums, np.zeros((added, len(AGG_COLUMNS)))])
+            self.counts = np.vstack([self.counts, np.zeros((added, len(AGG_COLUMNS)), dtype=np.int64)])
+            self.games = np.concatenate([self.games, np.zeros(added, dtype=np.int64)])
+            self.recent_won = np.vstack([self.recent_won, np.zeros((added, self.window))])
+            self.recent_diff = np.vstack([self.recent_diff, np.zeros((added, self.window))])
+            self.recent_len = np.concatenate([self.recent_len, np.zeros(added, dtype=np.int64)])
+        return np.array([self._rows[key] for key in keys], dtype=np.int64)
+
+    def _push_recent(self, row, won, diff):
+        self.recent_won[row] = np.concatenate([self.recent_won[row], won])[-self.window:]
+        self.recent_diff[row] = np.concatenate([self.recent_diff[row], diff])[-self.window:]
+        self.recent_len[row] = min(self.window, self.recent_len[row] + len(won))
+
+    def fold(self, team_games):
+        """
+        Add per-team-game rows (the output of team_game_rows) and return the
+        (season_id, team_id) keys they touched. Rows at or before the
+        watermark are skipped, so overlapping batches are harmless.
+        """
+        if len(team_games) and self.watermark is not None:
+            game_date, game_id = self.watermark
+            dates = team_games['game_date'].astype(str)
+            ids = team_games['game_id'].astype(str)
+            team_games = team_games[(dates > game_date) | ((dates == game_date) & (ids > game_id))]
+        if not len(team_games):
+            return []
+
+        games = team_games.assign(
+            season_id=team_games['season_id'].astype(int),
+            team_id=team_games['team_id'].astype(int),
+            point_diff=team_games['pts'] - team_games['opp_pts']
+        ).sort_values(['game_date', 'game_id'], kind='stable')
+
+        grouped = games.groupby(KEY_COLUMNS)
+        sums = grouped[AGG_COLUMNS].sum()
+        keys = [(int(season), int(team)) for season, team in sums.index]
+        rows = self._rows_for(keys)
+        self.sums[rows] += sums.to_numpy(dtype=np.float64)
+        self.counts[rows] += grouped[AGG_COLUMNS].count().to_numpy()
+        self.games[rows] += grouped.size().to_numpy()
+
+        for (season, team), recent in games.groupby(KEY_COLUMNS).tail(self.window).groupby(KEY_COLUMNS):
+            self._push_recent(
+                self._rows[(int(season), int(team))],
+                recent['won'].to_numpy(dtype=np.float64),
+                recent['point_diff'].to_numpy(dtype=np.float64)
+            )
+
+        last = games.iloc[-1]
+        self.watermark = (str(last['game_date']), str(last['game_id']))
+        return keys
+
+    def frame(self):
+        """Per-team-season aggregates in (season_id, team_id) order, as aggregate_team_seasons builds them"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.sums / self.counts
+        means[:, :len(SUM_COLUMNS)] = self.sums[:, :len(SUM_COLUMNS)]
+
+        stats = pd.DataFrame(means, columns=AGG_COLUMNS)
+        stats.insert(0, 'season_id', self.seasons)
+        stats.insert(1, 'team_id', self.teams)
+        stats['games'] = self.games
+
+        filled = np.arange(self.window) >= (self.window - self.recent_len[:, None])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats['recent_win_pct'] = np.where(filled, self.recent_won, 0).sum(axis=1) / self.recent_len
+            stats['recent_point_diff'] = np.where(filled, self.recent_diff, 0).sum(axis=1) / self.recent_len
+        stats['momentum'] = stats['recent_win_pct'] * stats['recent_point_diff']
+
+        return stats.sort_values(KEY_COLUMNS, kind='stable').reset_index(drop=True)
+
+    def save(self, path):
+        """Write next to the destination and rename into place"""
+        path = Path(path)
+        meta = {'format_version': FORMAT_VERSION, 'window': self.window, 'watermark': self.watermark}
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f, meta=np.array(json.dumps(meta)),
+                seasons=self.seasons, teams=self.teams, sums=self.sums, counts=self.counts,
+                games=self.games, recent_won=self.recent_won, recent_diff=self.recent_diff,
+                recent_len=self.recent_len
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['format_version'] != FORMAT_VERSION:
+                raise ValueError(f"Unsupported aggregate state version {meta['format_version']}")
+            aggregates = cls(window=meta['window'])
+            for name in ('seasons', 'teams', 'sums', 'counts', 'games', 'recent_won', 'recent_diff', 'recent_len'):
+                setattr(aggregates, name, data[name])
+        aggregates.watermark = tuple(meta['watermark']) if meta['watermark'] else None
+        aggregates._rows = {
+            (int(season), int(team)): row
+            for row, (season, team) in enumerate(zip(aggregates.seasons, aggregates.teams))
+        }
+        return aggregates
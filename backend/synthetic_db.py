@@ -0,0 +1,236 @@
+"""
+Synthetic, schema-compatible nba.sqlite
+
+Writes the three tables train_elite_model.py and backtest.py read (game,
+other_stats, team) with the columns they select, so the pipeline can run
+without the Kaggle download and at any data volume. The size is set by
+the number of seasons, teams and regular season games per season; the
+real database is about 20 seasons x 30 teams x 1,230 games.
+
+Box-score stats are drawn around league averages and shifted by a
+per-team-season strength. The team that train_elite_model.CHAMPIONS names
+for a season gets the largest strength, so the labels are learnable;
+seasons after 2021-22 have no champion, as in the real data. The first 30
+teams are the current franchises, and any beyond that get synthetic
+names. Each season also gets playoff games, which the training query
+filters out like the real ones. The same arguments and seed always write
+the same database.
+
+Seasons are generated and inserted one at a time, so memory stays flat
+however large the database gets. The file is written under a temporary
+name and renamed into place when complete.
+
+    python backend/synthetic_db.py data/synthetic.sqlite                      # about the real volume
+    python backend/synthetic_db.py data/synthetic_10x.sqlite --seasons 40 --teams 150
+    python backend/synthetic_db.py data/synthetic_100x.sqlite --seasons 100 --teams 600
+"""
+
+from pathlib import Path
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.train_elite_model import CHAMPIONS
+
+FIRST_SEASON_ID = 22003
+TEAM_ID_BASE = 1610612737
+GAMES_PER_TEAM = 82
+PLAYOFF_GAMES = 85
+
+FRANCHISES = [
+    ('Atlanta Hawks', 'ATL'), ('Boston Celtics', 'BOS'), ('Brooklyn Nets', 'BKN'),
+    ('Charlotte Hornets', 'CHA'), ('Chicago Bulls', 'CHI'), ('Cleveland Cavaliers', 'CLE'),
+    ('Dallas Mavericks', 'DAL'), ('Denver Nuggets', 'DEN'), ('Detroit Pistons', 'DET'),
+    ('Golden State Warriors', 'GSW'), ('Houston Rockets', 'HOU'), ('Indiana Pacers', 'IND'),
+    ('Los Angeles Clippers', 'LAC'), ('Los Angeles Lakers', 'LAL'), ('Memphis Grizzlies', 'MEM'),
+    ('Miami Heat', 'MIA'), ('Milwaukee Bucks', 'MIL'), ('Minnesota Timberwolves', 'MIN'),
+    ('New Orleans Pelicans', 'NOP'), ('New York Knicks', 'NYK'), ('Oklahoma City Thunder', 'OKC'),
+    ('Orlando Magic', 'ORL'), ('Philadelphia 76ers', 'PHI'), ('Phoenix Suns', 'PHX'),
+    ('Portland Trail Blazers', 'POR'), ('Sacramento Kings', 'SAC'), ('San Antonio Spurs', 'SAS'),
+    ('Toronto Raptors', 'TOR'), ('Utah Jazz', 'UTA'), ('Washington Wizards', 'WAS'),
+]
+
+# League-average per-game value and relative spread of each game-table stat
+GAME_STATS = {
+    'pts': (105.0, 0.10), 'fg_pct': (0.46, 0.06), 'ft_pct': (0.77, 0.08), 'fg3_pct': (0.35, 0.15),
+    'fg3m': (10.0, 0.30), 'ast': (23.0, 0.15), 'reb': (44.0, 0.10), 'oreb': (10.0, 0.25),
+    'dreb': (34.0, 0.10), 'stl': (7.5, 0.30), 'blk': (5.0, 0.35), 'tov': (14.0, 0.25),
+    'pf': (20.0, 0.20), 'fga': (86.0, 0.07), 'fta': (22.0, 0.25),
+}
+OTHER_STATS = {
+    'pts_paint': (44.0, 0.20), 'pts_2nd_chance': (13.0, 0.30), 'pts_fb': (13.0, 0.35), 'pts_off_to': (16.0, 0.30),
+}
+# Points per game a unit of strength is worth
+STRENGTH_POINTS = 4.0
+# Share of games with an other_stats row; the real table is missing some
+OTHER_STATS_COVERAGE = 0.9
+
+
+def teams(count):
+    """(full_name, abbreviation) for `count` teams: the real franchises first, then synthetic ones"""
+    synthetic = [(f'Synthetic Team {number}', f'S{number:03d}') for number in range(len(FRANCHISES) + 1, count + 1)]
+    return (FRANCHISES + synthetic)[:count]
+
+
+def _columns(stats):
+    return [f'{stat}_{side}' for stat in stats for side in ('home', 'away')]
+
+
+def _schedule(rng, n_teams, games):
+    """(home, away) team indexes: rounds of random pairings, each team playing at most once a round"""
+    per_round = n_teams // 2
+    rounds = -(-games // per_round)
+    pairs = np.concatenate([
+        rng.permutation(n_teams)[:per_round * 2].reshape(-1, 2) for _ in range(rounds)
+    ])[:games]
+    return pairs[:, 0], pairs[:, 1]
+
+
+def _box_scores(rng, stats, home, away, strength):
+    columns = {}
+    for stat, (mean, spread) in stats.items():
+        for side, team, opponent in (('home', home, away), ('away', away, home)):
+            values = mean * (1.0 + spread * rng.standard_normal(len(team)))
+            if stat == 'pts':
+                values += STRENGTH_POINTS * (strength[team] - strength[opponent])
+            values = np.maximum(values, 0.0)
+            columns[f'{stat}_{side}'] = np.round(values, 3) if stat.endswith('_pct') else np.round(values)
+    return columns
+
+
+def _game_dates(season_id, games, start_month_day, days):
+    """Timestamps spread evenly over `days` days; distinct, so a team's games have a strict order"""
+    start = np.datetime64(f'{season_id - 20001}-{start_month_day}')
+    offsets = np.arange(games) * (days * 86400 // max(games, 1))
+    return [str(date).replace('T', ' ') for date in (start + offsets.astype('timedelta64[s]')).tolist()]
+
+
+def _insert_games(conn, rng, season_id, season_type, first_number, home, away, strength, dates):
+    game_columns, other_columns = _columns(GAME_STATS), _columns(OTHER_STATS)
+    game_stats = _box_scores(rng, GAME_STATS, home, away, strength)
+    other_stats = _box_scores(rng, OTHER_STATS, home, away, np.zeros_like(strength))
+
+    count = len(home)
+    game_ids = [f'00{season_id}{number:06d}' for number in range(first_number, first_number + count)]
+    rows = zip(
+        game_ids, [str(season_id)] * count, dates, [season_type] * count,
+        (str(TEAM_ID_BASE + team) for team in home.tolist()),
+        (str(TEAM_ID_BASE + team) for team in away.tolist()),
+        *(game_stats[column].tolist() for column in game_columns)
+    )
+    conn.executemany(f"INSERT INTO game VALUES ({', '.join('?' * (6 + len(game_columns)))})", rows)
+
+    covered = (rng.random(count) < OTHER_STATS_COVERAGE).tolist()
+    rows = zip(game_ids, *(other_stats[column].tolist() for column in other_columns))
+    conn.executemany(
+        f"INSERT INTO other_stats VALUES ({', '.join('?' * (1 + len(other_columns)))})",
+        (row for row, keep in zip(rows, covered) if keep)
+    )
+
+
+def build_database(path, seasons=20, n_teams=30, games_per_season=None, playoff_games=PLAYOFF_GAMES,
+                   seed=0, progress=False):
+    """
+    Write a synthetic database to path, replacing it if it exists.
+    games_per_season defaults to 82 games for every team. Returns the
+    number of regular season games written.
+    """
+    if n_teams < 2:
+        raise ValueError("A season needs at least two teams")
+    if games_per_season is None:
+        games_per_season = n_teams * GAMES_PER_TEAM // 2
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    rng = np.random.default_rng(seed)
+    team_list = teams(n_teams)
+    names = [name for name, _ in team_list]
+
+    conn = sqlite3.connect(tmp_path)
+    # Nothing to recover if generation is interrupted, so skip the journal and fsyncs
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("CREATE TABLE team (id TEXT, full_name TEXT, abbreviation TEXT)")
+    conn.executemany(
+        "INSERT INTO team VALUES (?, ?, ?)",
+        [(str(TEAM_ID_BASE + i), name, abbreviation) for i, (name, abbreviation) in enumerate(team_list)]
+    )
+    conn.execute(
+        "CREATE TABLE game (game_id TEXT, season_id TEXT, game_date TIMESTAMP, season_type TEXT, "
+        "team_id_home TEXT, team_id_away TEXT, "
+        + ", ".join(f"{column} REAL" for column in _columns(GAME_STATS)) + ")"
+    )
+    conn.execute(
+        "CREATE TABLE other_stats (game_id TEXT, "
+        + ", ".join(f"{column} REAL" for column in _columns(OTHER_STATS)) + ")"
+    )
+
+    started = time.perf_counter()
+    try:
+        for offset in range(seasons):
+            season_id = FIRST_SEASON_ID + offset
+            strength = rng.standard_normal(n_teams)
+            champion = CHAMPIONS.get(season_id)
+            if champion in names:
+                strength[names.index(champion)] = strength.max() + 1.0
+
+            # Regular season from late October to mid April
+            home, away = _schedule(rng, n_teams, games_per_season)
+            dates = _game_dates(season_id, games_per_season, '10-20', 175)
+            _insert_games(conn, rng, season_id, 'Regular Season', 0, home, away, strength, dates)
+
+            if playoff_games:
+                # The 16 strongest teams, so the bracket is plausible; only the row count matters to training
+                contenders = np.argsort(-strength)[:min(16, n_teams)]
+                home, away = _schedule(rng, len(contenders), playoff_games)
+                dates = _game_dates(season_id, playoff_games, '04-20', 55)
+                _insert_games(
+                    conn, rng, season_id, 'Playoffs', games_per_season,
+                    contenders[home], contenders[away], strength, dates
+                )
+            conn.commit()
+
+            if progress:
+                print(f"  season {season_id}: {(offset + 1) * games_per_season:,} regular season games "
+                      f"({time.perf_counter() - started:.1f}s)")
+        conn.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        conn.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return seasons * games_per_season
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic, schema-compatible nba.sqlite")
+    parser.add_argument("out", help="SQLite file to write (replaced if it exists)")
+    parser.add_argument("--seasons", type=int, default=20, help="Seasons, starting with 2002-03")
+    parser.add_argument("--teams", type=int, default=30)
+    parser.add_argument("--games-per-season", type=int, default=None,
+                        help="Regular season games per season (default: 82 per team)")
+    parser.add_argument("--playoff-games", type=int, default=PLAYOFF_GAMES,
+                        help="Playoff games per season (filtered out by training)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    games = build_database(
+        args.out, args.seasons, args.teams, args.games_per_season, args.playoff_games, args.seed, progress=True
+    )
+    size_mb = Path(args.out).stat().st_size / (1024 * 1024)
+    print(f"Wrote {games:,} regular season games ({args.seasons} seasons, {args.teams} teams) to {args.out} "
+          f"in {time.perf_counter() - started:.1f}s, {size_mb:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,23 +4,22 @@ Elite NBA Championship Prediction Model
 Advanced ensemble model with:
 - 45+ engineered features including advanced stats
 - Ensemble of XGBoost, LightGBM, and CatBoost
-- Hyperparameter optimization with Optuna
+- Hyperparameter optimization with Optuna (parallel, resumable, pruned)
 - Proper cross-validation
 """
 
-import sqlite3
+import argparse
 import pandas as pd
-import numpy as np
 import json
 import os
+import sys
+import time
 from datetime import datetime
-from sklearn.model_selection import StratifiedKFold
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import roc_auc_score, accuracy_score, log_loss
+from sklearn.metrics import roc_auc_score
 from xgboost import XGBClassifier
 from lightgbm import LGBMClassifier
 from catboost import CatBoostClassifier
-import optuna
 import joblib
 import warnings
 from pathlib import Path
@@ -28,21 +27,72 @@ from pathlib import Path
 warnings.filterwarnings('ignore')
 
 PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.app.ensemble import Ensemble
+from backend.tuning import DEFAULT_TRIALS, tune
+from backend.app.extract_cache import ExtractCache
+from backend.app.db import connect_readonly
+from backend.season_aggregates import MEAN_COLUMNS, RECENT_WINDOW, SeasonAggregates
+from backend.app.explain import save_season_features
+from backend.app.profiling import DEFAULT_INTERVAL, StageProfiler
+from backend.app.compiled_ensemble import (
+    CompiledEnsemble, compile_ensemble, save_compiled, max_abs_error, DEFAULT_TOLERANCE
+)
+
 CONFIG_PATH = PROJECT_ROOT / "data" / "config.json"
 MODEL_DIR = PROJECT_ROOT / "models"
 MODEL_DIR.mkdir(exist_ok=True)
+OPTUNA_STORAGE_PATH = MODEL_DIR / "optuna_elite.journal"
+EXTRACT_CACHE_DIR = PROJECT_ROOT / "data" / "cache"
+AGGREGATES_PATH = MODEL_DIR / "season_aggregates_elite.npz"
+# Raw feature rows of every team-season, read by the API's /explain endpoint
+SEASON_FEATURES_PATH = MODEL_DIR / "season_features_elite.npz"
+LATEST_PREDICTIONS_PATH = PROJECT_ROOT / "backend" / "models" / "latest_predictions_elite.csv"
+# Bump when team_game_rows changes so cached team-game tables are rebuilt
+TEAM_GAMES_VERSION = "2"
+
+
+FEATURE_NAMES = [
+    'wins', 'win_pct', 'ppg', 'opp_ppg', 'point_diff',
+    'fg_pct', 'ft_pct', 'fg3_pct', 'fg3m', 'opp_fg3_pct', 'fg3_diff',
+    'apg', 'rpg', 'spg', 'bpg',
+    'oreb', 'dreb', 'reb_diff', 'oreb_rate', 'dreb_rate',
+    'tov', 'tov_diff', 'ast_tov_ratio',
+    'defensive_pressure', 'pressure_diff',
+    'off_efficiency', 'def_efficiency', 'efficiency_diff',
+    'ft_rate', 'discipline',
+    'recent_win_pct', 'recent_point_diff', 'momentum',
+    'pts_paint', 'pts_2nd_chance', 'pts_fb', 'pts_off_to',
+    'paint_dominance', '2nd_chance_edge', 'transition_edge',
+    'defensive_points', 'paint_pct'
+]
 
-with open(CONFIG_PATH, 'r') as f:
-    config = json.load(f)
-    db_path = config['db_path']
+# CatBoost is not tuned; these settings are shared with the walk-forward backtest
+CATBOOST_PARAMS = {
+    'iterations': 300,
+    'depth': 8,
+    'learning_rate': 0.05,
+    'random_state': 42,
+    'verbose': False
+}
+
+PREDICTION_COLUMNS = [
+    'full_name', 'abbreviation', 'wins', 'win_pct', 'ppg', 'point_diff',
+    'championship_probability', 'xgboost_probability', 'lightgbm_probability',
+    'catboost_probability', 'season_id'
+]
 
-conn = sqlite3.connect(db_path)
 
-print("=" * 80)
-print("ELITE NBA CHAMPIONSHIP PREDICTOR")
-print("=" * 80)
+def write_csv_atomic(df, path):
+    """Write a CSV next to its destination and rename it into place so readers never see a partial file"""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
 
-champions = {
+
+CHAMPIONS = {
     22003: 'San Antonio Spurs', 22004: 'Detroit Pistons', 22005: 'San Antonio Spurs',
     22006: 'Miami Heat', 22007: 'San Antonio Spurs', 22008: 'Boston Celtics',
     22009: 'Los Angeles Lakers', 22010: 'Los Angeles Lakers', 22011: 'Dallas Mavericks',
@@ -52,9 +102,7 @@ champions = {
     22021: 'Milwaukee Bucks', 22022: 'Golden State Warriors'
 }
 
-print("\n[1/6] Extracting comprehensive game statistics...")
-
-query = """
+GAMES_QUERY = """
 SELECT
     g.game_id,
     g.season_id,
@@ -106,362 +154,512 @@ WHERE g.season_id IS NOT NULL
   AND g.season_id >= 22003
 ORDER BY g.season_id, g.game_date
 """
-
-df = pd.read_sql_query(query, conn)
-print(f"Loaded {len(df):,} regular season games")
-
-print("\n[2/6] Engineering advanced features...")
-
-home_games = df[[
-    'season_id', 'team_id_home', 'game_date', 'pts_home', 'pts_away',
-    'fg_pct_home', 'ft_pct_home', 'fg3_pct_home', 'fg3m_home',
-    'ast_home', 'reb_home', 'oreb_home', 'dreb_home',
-    'stl_home', 'blk_home', 'tov_home', 'pf_home',
-    'fga_home', 'fta_home',
-    'pts_paint_home', 'pts_2nd_chance_home', 'pts_fb_home', 'pts_off_to_home'
-]].copy()
-
-home_games.columns = [
-    'season_id', 'team_id', 'game_date', 'pts', 'opp_pts',
-    'fg_pct', 'ft_pct', 'fg3_pct', 'fg3m',
-    'ast', 'reb', 'oreb', 'dreb',
-    'stl', 'blk', 'tov', 'pf',
-    'fga', 'fta',
-    'pts_paint', 'pts_2nd_chance', 'pts_fb', 'pts_off_to'
-]
-home_games['won'] = (home_games['pts'] > home_games['opp_pts']).astype(int)
-home_games['opp_fg3_pct'] = df['fg3_pct_away']
-home_games['opp_dreb'] = df['dreb_away']
-home_games['opp_pts_paint'] = df['pts_paint_away']
-home_games['opp_pts_fb'] = df['pts_fb_away']
-
-away_games = df[[
-    'season_id', 'team_id_away', 'game_date', 'pts_away', 'pts_home',
-    'fg_pct_away', 'ft_pct_away', 'fg3_pct_away', 'fg3m_away',
-    'ast_away', 'reb_away', 'oreb_away', 'dreb_away',
-    'stl_away', 'blk_away', 'tov_away', 'pf_away',
-    'fga_away', 'fta_away',
-    'pts_paint_away', 'pts_2nd_chance_away', 'pts_fb_away', 'pts_off_to_away'
-]].copy()
-
-away_games.columns = [
-    'season_id', 'team_id', 'game_date', 'pts', 'opp_pts',
-    'fg_pct', 'ft_pct', 'fg3_pct', 'fg3m',
-    'ast', 'reb', 'oreb', 'dreb',
-    'stl', 'blk', 'tov', 'pf',
-    'fga', 'fta',
-    'pts_paint', 'pts_2nd_chance', 'pts_fb', 'pts_off_to'
-]
-away_games['won'] = (away_games['pts'] > away_games['opp_pts']).astype(int)
-away_games['opp_fg3_pct'] = df['fg3_pct_home']
-away_games['opp_dreb'] = df['dreb_home']
-away_games['opp_pts_paint'] = df['pts_paint_home']
-away_games['opp_pts_fb'] = df['pts_fb_home']
-
-all_games = pd.concat([home_games, away_games], ignore_index=True)
-all_games = all_games.sort_values('game_date')
-
-stats = all_games.groupby(['season_id', 'team_id']).agg({
-    'won': 'sum',
-    'pts': 'mean',
-    'opp_pts': 'mean',
-    'fg_pct': 'mean',
-    'ft_pct': 'mean',
-    'fg3_pct': 'mean',
-    'fg3m': 'mean',
-    'opp_fg3_pct': 'mean',
-    'ast': 'mean',
-    'reb': 'mean',
-    'oreb': 'mean',
-    'dreb': 'mean',
-    'opp_dreb': 'mean',
-    'stl': 'mean',
-    'blk': 'mean',
-    'tov': 'mean',
-    'pf': 'mean',
-    'fga': 'mean',
-    'fta': 'mean',
-    'pts_paint': 'mean',
-    'pts_2nd_chance': 'mean',
-    'pts_fb': 'mean',
-    'pts_off_to': 'mean',
-    'opp_pts_paint': 'mean',
-    'opp_pts_fb': 'mean'
-}).reset_index()
-
-stats['season_id'] = stats['season_id'].astype(int)
-stats['team_id'] = stats['team_id'].astype(int)
-stats['games'] = all_games.groupby(['season_id', 'team_id']).size().values
-
-stats['wins'] = stats['won']
-stats['win_pct'] = stats['won'] / stats['games']
-stats['ppg'] = stats['pts']
-stats['opp_ppg'] = stats['opp_pts']
-stats['point_diff'] = stats['pts'] - stats['opp_pts']
-stats['fg3_diff'] = stats['fg3_pct'] - stats['opp_fg3_pct']
-stats['apg'] = stats['ast']
-stats['rpg'] = stats['reb']
-stats['spg'] = stats['stl']
-stats['bpg'] = stats['blk']
-stats['reb_diff'] = stats['reb'] - (stats['opp_dreb'] + stats['oreb'])
-stats['oreb_rate'] = stats['oreb'] / (stats['oreb'] + stats['opp_dreb'])
-stats['dreb_rate'] = stats['dreb'] / (stats['dreb'] + stats['oreb'])
-stats['tov_diff'] = -(stats['tov'] - all_games.groupby(['season_id', 'team_id'])['tov'].mean().values)
-stats['ast_tov_ratio'] = stats['ast'] / (stats['tov'] + 0.1)
-stats['defensive_pressure'] = stats['stl'] + stats['blk']
-stats['pressure_diff'] = stats['defensive_pressure']
-stats['off_efficiency'] = stats['pts'] / (stats['fga'] + 0.44 * stats['fta'] + stats['tov'])
-stats['def_efficiency'] = stats['opp_pts'] / (stats['fga'] + 0.44 * stats['fta'] + stats['tov'])
-stats['efficiency_diff'] = stats['off_efficiency'] - stats['def_efficiency']
-stats['ft_rate'] = stats['fta'] / stats['fga']
-stats['discipline'] = -stats['pf']
-
-stats['pts_paint'] = stats['pts_paint'].fillna(stats['pts_paint'].mean())
-stats['pts_2nd_chance'] = stats['pts_2nd_chance'].fillna(stats['pts_2nd_chance'].mean())
-stats['pts_fb'] = stats['pts_fb'].fillna(stats['pts_fb'].mean())
-stats['pts_off_to'] = stats['pts_off_to'].fillna(stats['pts_off_to'].mean())
-stats['opp_pts_paint'] = stats['opp_pts_paint'].fillna(stats['opp_pts_paint'].mean())
-stats['opp_pts_fb'] = stats['opp_pts_fb'].fillna(stats['opp_pts_fb'].mean())
-
-stats['paint_dominance'] = stats['pts_paint'] - stats['opp_pts_paint']
-stats['2nd_chance_edge'] = stats['pts_2nd_chance']
-stats['transition_edge'] = stats['pts_fb'] - stats['opp_pts_fb']
-stats['defensive_points'] = stats['pts_off_to']
-stats['paint_pct'] = stats['pts_paint'] / stats['pts']
-
-recent_window = 20
-recent_stats = []
-for team_id in stats['team_id'].unique():
-    for season_id in stats['season_id'].unique():
-        team_season_games = all_games[
-            (all_games['team_id'] == team_id) &
-            (all_games['season_id'] == season_id)
-        ].tail(recent_window)
-
-        if len(team_season_games) > 0:
-            recent_win_pct = team_season_games['won'].mean()
-            recent_point_diff = (team_season_games['pts'] - team_season_games['opp_pts']).mean()
-            momentum = recent_win_pct * recent_point_diff
-        else:
-            recent_win_pct = 0
-            recent_point_diff = 0
-            momentum = 0
-
-        recent_stats.append({
-            'team_id': team_id,
-            'season_id': season_id,
-            'recent_win_pct': recent_win_pct,
-            'recent_point_diff': recent_point_diff,
-            'momentum': momentum
-        })
-
-recent_df = pd.DataFrame(recent_stats)
-stats = stats.merge(recent_df, on=['team_id', 'season_id'], how='left')
-
-team_query = "SELECT id, full_name, abbreviation FROM team"
-teams_df = pd.read_sql_query(team_query, conn)
-teams_df['id'] = teams_df['id'].astype(int)
-stats = stats.merge(teams_df, left_on='team_id', right_on='id', how='left')
-
-stats['is_champion'] = stats.apply(
-    lambda row: 1 if champions.get(row['season_id']) == row['full_name'] else 0,
-    axis=1
+GAME_KEY_COLUMNS = ('game_id', 'season_id', 'game_date', 'team_id_home', 'team_id_away')
+# Rows fetched per read when streaming; seasons are reassembled from these chunks
+STREAM_CHUNK_ROWS = 2000
+# Games after the (game_date, game_id) watermark, for in-season refreshes
+NEW_GAMES_QUERY = GAMES_QUERY.replace(
+    "ORDER BY",
+    "  AND (g.game_date > ? OR (g.game_date = ? AND g.game_id > ?))\nORDER BY"
 )
 
-stats = stats.fillna(0)
-
-feature_names = [
-    'wins', 'win_pct', 'ppg', 'opp_ppg', 'point_diff',
-    'fg_pct', 'ft_pct', 'fg3_pct', 'fg3m', 'opp_fg3_pct', 'fg3_diff',
-    'apg', 'rpg', 'spg', 'bpg',
-    'oreb', 'dreb', 'reb_diff', 'oreb_rate', 'dreb_rate',
-    'tov', 'tov_diff', 'ast_tov_ratio',
-    'defensive_pressure', 'pressure_diff',
-    'off_efficiency', 'def_efficiency', 'efficiency_diff',
-    'ft_rate', 'discipline',
-    'recent_win_pct', 'recent_point_diff', 'momentum',
-    'pts_paint', 'pts_2nd_chance', 'pts_fb', 'pts_off_to',
-    'paint_dominance', '2nd_chance_edge', 'transition_edge',
-    'defensive_points', 'paint_pct'
-]
-
-print(f"Total features engineered: {len(feature_names)}")
-print(f"Total teams across all seasons: {len(stats)}")
-print(f"Total champions: {stats['is_champion'].sum()}")
-
-X = stats[feature_names].values
-y = stats['is_champion'].values
-seasons = stats['season_id'].values
-
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-
-print("\n[3/6] Building ensemble model with hyperparameter optimization...")
-
-def objective_xgb(trial):
-    params = {
-        'max_depth': trial.suggest_int('max_depth', 4, 12),
-        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3),
-        'n_estimators': trial.suggest_int('n_estimators', 100, 500),
-        'min_child_weight': trial.suggest_int('min_child_weight', 1, 10),
-        'subsample': trial.suggest_float('subsample', 0.6, 1.0),
-        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0),
-        'gamma': trial.suggest_float('gamma', 0, 5),
-        'random_state': 42,
-        'eval_metric': 'logloss'
-    }
 
-    cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
-    scores = []
-
-    for train_idx, val_idx in cv.split(X_scaled, y):
-        X_train, X_val = X_scaled[train_idx], X_scaled[val_idx]
-        y_train, y_val = y[train_idx], y[val_idx]
-
-        model = XGBClassifier(**params)
-        model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
-        pred_proba = model.predict_proba(X_val)[:, 1]
-        scores.append(roc_auc_score(y_val, pred_proba))
-
-    return np.mean(scores)
-
-print("\nOptimizing XGBoost...")
-study_xgb = optuna.create_study(direction='maximize', study_name='xgb')
-study_xgb.optimize(objective_xgb, n_trials=30, show_progress_bar=True)
-best_xgb_params = study_xgb.best_params
-print(f"Best XGBoost ROC-AUC: {study_xgb.best_value:.4f}")
-
-def objective_lgbm(trial):
-    params = {
-        'max_depth': trial.suggest_int('max_depth', 4, 12),
-        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3),
-        'n_estimators': trial.suggest_int('n_estimators', 100, 500),
-        'num_leaves': trial.suggest_int('num_leaves', 20, 100),
-        'min_child_samples': trial.suggest_int('min_child_samples', 5, 50),
-        'subsample': trial.suggest_float('subsample', 0.6, 1.0),
-        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0),
-        'random_state': 42,
-        'verbose': -1
+def team_game_rows(df):
+    """Unpivot the joined game rows into one row per team per game, in date order"""
+    home_games = df[[
+        'game_id', 'season_id', 'team_id_home', 'game_date', 'pts_home', 'pts_away',
+        'fg_pct_home', 'ft_pct_home', 'fg3_pct_home', 'fg3m_home',
+        'ast_home', 'reb_home', 'oreb_home', 'dreb_home',
+        'stl_home', 'blk_home', 'tov_home', 'pf_home',
+        'fga_home', 'fta_home',
+        'pts_paint_home', 'pts_2nd_chance_home', 'pts_fb_home', 'pts_off_to_home'
+    ]].copy()
+
+    home_games.columns = [
+        'game_id', 'season_id', 'team_id', 'game_date', 'pts', 'opp_pts',
+        'fg_pct', 'ft_pct', 'fg3_pct', 'fg3m',
+        'ast', 'reb', 'oreb', 'dreb',
+        'stl', 'blk', 'tov', 'pf',
+        'fga', 'fta',
+        'pts_paint', 'pts_2nd_chance', 'pts_fb', 'pts_off_to'
+    ]
+    home_games['won'] = (home_games['pts'] > home_games['opp_pts']).astype(int)
+    home_games['opp_fg3_pct'] = df['fg3_pct_away']
+    home_games['opp_dreb'] = df['dreb_away']
+    home_games['opp_pts_paint'] = df['pts_paint_away']
+    home_games['opp_pts_fb'] = df['pts_fb_away']
+
+    away_games = df[[
+        'game_id', 'season_id', 'team_id_away', 'game_date', 'pts_away', 'pts_home',
+        'fg_pct_away', 'ft_pct_away', 'fg3_pct_away', 'fg3m_away',
+        'ast_away', 'reb_away', 'oreb_away', 'dreb_away',
+        'stl_away', 'blk_away', 'tov_away', 'pf_away',
+        'fga_away', 'fta_away',
+        'pts_paint_away', 'pts_2nd_chance_away', 'pts_fb_away', 'pts_off_to_away'
+    ]].copy()
+
+    away_games.columns = [
+        'game_id', 'season_id', 'team_id', 'game_date', 'pts', 'opp_pts',
+        'fg_pct', 'ft_pct', 'fg3_pct', 'fg3m',
+        'ast', 'reb', 'oreb', 'dreb',
+        'stl', 'blk', 'tov', 'pf',
+        'fga', 'fta',
+        'pts_paint', 'pts_2nd_chance', 'pts_fb', 'pts_off_to'
+    ]
+    away_games['won'] = (away_games['pts'] > away_games['opp_pts']).astype(int)
+    away_games['opp_fg3_pct'] = df['fg3_pct_home']
+    away_games['opp_dreb'] = df['dreb_home']
+    away_games['opp_pts_paint'] = df['pts_paint_home']
+    away_games['opp_pts_fb'] = df['pts_fb_home']
+
+    all_games = pd.concat([home_games, away_games], ignore_index=True)
+    all_games = all_games.sort_values('game_date')
+
+    return all_games
+
+
+def load_team_games(conn, cache=None):
+    """Per-team-game table, from the extraction cache when the database is unchanged"""
+    if cache is None:
+        df = pd.read_sql_query(GAMES_QUERY, conn)
+        print(f"Loaded {len(df):,} regular season games")
+        return team_game_rows(df)
+
+    def extract_games():
+        df, hit = cache.get_or_build('games', GAMES_QUERY, lambda: pd.read_sql_query(GAMES_QUERY, conn))
+        print(f"Loaded {len(df):,} regular season games" + (" (cached)" if hit else ""))
+        return team_game_rows(df)
+
+    all_games, hit = cache.get_or_build('team_games', GAMES_QUERY, extract_games, version=TEAM_GAMES_VERSION)
+    if hit:
+        print(f"Loaded {len(all_games) // 2:,} regular season games (cached team-game table)")
+    return all_games
+
+
+def aggregate_team_seasons(all_games):
+    """Per-team-season totals, per-game averages and last-20-game form"""
+    stats = all_games.groupby(['season_id', 'team_id']).agg(
+        {'won': 'sum', **{column: 'mean' for column in MEAN_COLUMNS}}
+    ).reset_index()
+
+    stats['season_id'] = stats['season_id'].astype(int)
+    stats['team_id'] = stats['team_id'].astype(int)
+    stats['games'] = all_games.groupby(['season_id', 'team_id']).size().values
+
+    return stats.merge(recent_form(all_games), on=['team_id', 'season_id'], how='left')
+
+
+def recent_form(all_games):
+    """Win percentage, point differential and momentum over each team-season's last RECENT_WINDOW games"""
+    # One grouped pass: all_games is already in date order and groupby().tail keeps
+    # that order within each group
+    recent_games = all_games.groupby(['season_id', 'team_id']).tail(RECENT_WINDOW)
+    recent_games = recent_games.assign(
+        season_id=recent_games['season_id'].astype(int),
+        team_id=recent_games['team_id'].astype(int),
+        point_diff=recent_games['pts'] - recent_games['opp_pts']
+    )
+    recent_df = recent_games.groupby(['team_id', 'season_id']).agg(
+        recent_win_pct=('won', 'mean'),
+        recent_point_diff=('point_diff', 'mean')
+    ).reset_index()
+    recent_df['momentum'] = recent_df['recent_win_pct'] * recent_df['recent_point_diff']
+    return recent_df
+
+
+def derive_features(stats, conn):
+    """Ratios, differentials, team names and labels on top of the per-team-season aggregates"""
+    stats['wins'] = stats['won']
+    stats['win_pct'] = stats['won'] / stats['games']
+    stats['ppg'] = stats['pts']
+    stats['opp_ppg'] = stats['opp_pts']
+    stats['point_diff'] = stats['pts'] - stats['opp_pts']
+    stats['fg3_diff'] = stats['fg3_pct'] - stats['opp_fg3_pct']
+    stats['apg'] = stats['ast']
+    stats['rpg'] = stats['reb']
+    stats['spg'] = stats['stl']
+    stats['bpg'] = stats['blk']
+    stats['reb_diff'] = stats['reb'] - (stats['opp_dreb'] + stats['oreb'])
+    stats['oreb_rate'] = stats['oreb'] / (stats['oreb'] + stats['opp_dreb'])
+    stats['dreb_rate'] = stats['dreb'] / (stats['dreb'] + stats['oreb'])
+    # The reference is the team's own per-game average, so this is always zero; the models were trained with it
+    stats['tov_diff'] = -(stats['tov'] - stats['tov'])
+    stats['ast_tov_ratio'] = stats['ast'] / (stats['tov'] + 0.1)
+    stats['defensive_pressure'] = stats['stl'] + stats['blk']
+    stats['pressure_diff'] = stats['defensive_pressure']
+    stats['off_efficiency'] = stats['pts'] / (stats['fga'] + 0.44 * stats['fta'] + stats['tov'])
+    stats['def_efficiency'] = stats['opp_pts'] / (stats['fga'] + 0.44 * stats['fta'] + stats['tov'])
+    stats['efficiency_diff'] = stats['off_efficiency'] - stats['def_efficiency']
+    stats['ft_rate'] = stats['fta'] / stats['fga']
+    stats['discipline'] = -stats['pf']
+
+    stats['pts_paint'] = stats['pts_paint'].fillna(stats['pts_paint'].mean())
+    stats['pts_2nd_chance'] = stats['pts_2nd_chance'].fillna(stats['pts_2nd_chance'].mean())
+    stats['pts_fb'] = stats['pts_fb'].fillna(stats['pts_fb'].mean())
+    stats['pts_off_to'] = stats['pts_off_to'].fillna(stats['pts_off_to'].mean())
+    stats['opp_pts_paint'] = stats['opp_pts_paint'].fillna(stats['opp_pts_paint'].mean())
+    stats['opp_pts_fb'] = stats['opp_pts_fb'].fillna(stats['opp_pts_fb'].mean())
+
+    stats['paint_dominance'] = stats['pts_paint'] - stats['opp_pts_paint']
+    stats['2nd_chance_edge'] = stats['pts_2nd_chance']
+    stats['transition_edge'] = stats['pts_fb'] - stats['opp_pts_fb']
+    stats['defensive_points'] = stats['pts_off_to']
+    stats['paint_pct'] = stats['pts_paint'] / stats['pts']
+
+    team_query = "SELECT id, full_name, abbreviation FROM team"
+    teams_df = pd.read_sql_query(team_query, conn)
+    teams_df['id'] = teams_df['id'].astype(int)
+    stats = stats.merge(teams_df, left_on='team_id', right_on='id', how='left')
+
+    stats['is_champion'] = stats.apply(
+        lambda row: 1 if CHAMPIONS.get(row['season_id']) == row['full_name'] else 0,
+        axis=1
+    )
+
+    stats = stats.fillna(0)
+
+    return stats
+
+
+def engineer_features(all_games, conn):
+    """Aggregate per-team-game rows into one feature row per team-season"""
+    return derive_features(aggregate_team_seasons(all_games), conn)
+
+
+def stream_team_games(conn, chunk_rows=STREAM_CHUNK_ROWS):
+    """Yield per-team-game rows one season at a time, so only one season is ever in memory"""
+    # GAMES_QUERY is ordered by season, so a season is complete once the next one starts
+    pending = None
+    for chunk in pd.read_sql_query(GAMES_QUERY, conn, chunksize=chunk_rows):
+        # A stat that is entirely NULL within one chunk would otherwise come back as object
+        chunk = chunk.astype({
+            column: 'float64' for column in chunk.columns if column not in GAME_KEY_COLUMNS
+        })
+        if pending is not None:
+            chunk = pd.concat([pending, chunk], ignore_index=True)
+        open_season = chunk['season_id'] == chunk['season_id'].iloc[-1]
+        for _, season in chunk[~open_season].groupby('season_id', sort=False):
+            yield team_game_rows(season.reset_index(drop=True))
+        pending = chunk[open_season].reset_index(drop=True)
+
+    if pending is not None and len(pending):
+        yield team_game_rows(pending)
+
+
+def stream_features(conn):
+    """
+    engineer_features() plus the --refresh baseline, built season by season.
+
+    Every aggregate is grouped by (season, team), so aggregating each season
+    separately and concatenating gives the same frame as the full groupby.
+    Seasons are folded into the baseline in season order, which assumes
+    their game dates do not overlap (true for NBA regular seasons).
+    """
+    parts = []
+    aggregates = SeasonAggregates()
+    games = 0
+    for season_games in stream_team_games(conn):
+        parts.append(aggregate_team_seasons(season_games))
+        aggregates.fold(season_games)
+        games += len(season_games) // 2
+    print(f"Loaded {games:,} regular season games (streamed by season)")
+
+    stats = pd.concat(parts, ignore_index=True)
+    return derive_features(stats, conn), aggregates
+
+
+def refresh(conn, cache=None):
+    """Fold games played since the saved watermark into the aggregates and rescore only the teams they touched"""
+    started = time.perf_counter()
+
+    aggregates = SeasonAggregates.load(AGGREGATES_PATH) if AGGREGATES_PATH.exists() else None
+    if aggregates is None or aggregates.watermark is None:
+        print("No saved aggregates, building them from every season...")
+        aggregates = SeasonAggregates()
+        touched = aggregates.fold(load_team_games(conn, cache))
+    else:
+        game_date, game_id = aggregates.watermark
+        new_games = pd.read_sql_query(NEW_GAMES_QUERY, conn, params=(game_date, game_date, game_id))
+        print(f"{len(new_games):,} new games since {game_date} (game {game_id})")
+        touched = aggregates.fold(team_game_rows(new_games))
+
+    if not touched:
+        print("Nothing to refresh")
+        return
+
+    # Deriving features from the aggregates is cheap: one row per team-season
+    stats = derive_features(aggregates.frame(), conn)
+    latest_season = stats['season_id'].max()
+    season = stats[stats['season_id'] == latest_season].copy()
+    touched_teams = {team for season_id, team in touched if season_id == latest_season}
+    earlier = stats[stats['season_id'] < latest_season]
+    previous_teams = set(earlier.loc[earlier['season_id'] == earlier['season_id'].max(), 'team_id'])
+    waiting = previous_teams - set(season['team_id'])
+
+    existing = pd.read_csv(LATEST_PREDICTIONS_PATH) if LATEST_PREDICTIONS_PATH.exists() else None
+    if waiting and existing is not None:
+        # A new season whose first games have not reached every team: keep serving the last complete one
+        aggregates.save(AGGREGATES_PATH)
+        print(f"Season {latest_season} has started for {len(season)} teams, {len(waiting)} have not played; "
+              f"keeping the current predictions")
+        return
+
+    # Teams already scored for this season that have not played since (files without season_id are rescored)
+    kept = set()
+    if existing is not None and 'season_id' in existing:
+        kept = set(existing.loc[existing['season_id'] == latest_season, 'abbreviation'])
+    kept &= set(season.loc[~season['team_id'].isin(touched_teams), 'abbreviation'])
+    rescored = season[~season['abbreviation'].isin(kept)]
+
+    if len(rescored):
+        with open(MODEL_DIR / "model_metadata_elite.json", 'r') as f:
+            feature_names = json.load(f)['feature_names']
+        ensemble = CompiledEnsemble.load(MODEL_DIR / "ensemble_compiled_elite.npz")
+        result = ensemble.predict(rescored[feature_names].values)
+        rescored = rescored.assign(
+            championship_probability=result.ensemble,
+            xgboost_probability=result.xgboost,
+            lightgbm_probability=result.lightgbm,
+            catboost_probability=result.catboost
+        )[PREDICTION_COLUMNS]
+
+        predictions = rescored
+        if kept:
+            unchanged = existing[(existing['season_id'] == latest_season) & existing['abbreviation'].isin(kept)]
+            predictions = pd.concat([unchanged[PREDICTION_COLUMNS], rescored], ignore_index=True)
+        predictions = predictions.sort_values('championship_probability', ascending=False)
+        write_csv_atomic(predictions, LATEST_PREDICTIONS_PATH)
+
+    aggregates.save(AGGREGATES_PATH)
+    print(f"Refreshed {len(touched)} team-seasons, rescored {len(rescored)} teams for season {latest_season} "
+          f"in {time.perf_counter() - started:.2f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the elite championship ensemble")
+    parser.add_argument('--trials', type=int, default=DEFAULT_TRIALS,
+                        help="Optuna trials per model (pruned trials count)")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="Worker processes for the search, shared by XGBoost and LightGBM (default: CPU count)")
+    parser.add_argument('--storage', default=str(OPTUNA_STORAGE_PATH),
+                        help="Optuna journal file or storage URL, e.g. sqlite:///models/optuna.db")
+    parser.add_argument('--fresh', action='store_true',
+                        help="Discard stored trials for this training data instead of resuming")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Query SQLite directly instead of using the columnar extraction cache")
+    parser.add_argument('--stream', action='store_true',
+                        help="Extract and aggregate one season at a time to bound peak memory (skips the cache)")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Fold in games since the last run and rescore affected teams instead of retraining")
+    parser.add_argument('--db', help="Database to read instead of db_path in data/config.json, "
+                                     "e.g. one from backend/synthetic_db.py")
+    parser.add_argument('--profile', metavar='DIR',
+                        help="Sample each of the six stages and write collapsed stacks (flamegraph input) to DIR")
+    parser.add_argument('--profile-interval', type=float, default=DEFAULT_INTERVAL * 1000,
+                        help="Milliseconds between profiler samples")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    db_path = args.db
+    if db_path is None:
+        with open(CONFIG_PATH, 'r') as f:
+            db_path = json.load(f)['db_path']
+
+    conn = connect_readonly(db_path)
+    cache = None if args.no_cache else ExtractCache(EXTRACT_CACHE_DIR, db_path)
+
+    if args.refresh:
+        refresh(conn, cache)
+        conn.close()
+        return
+
+    print("=" * 80)
+    print("ELITE NBA CHAMPIONSHIP PREDICTOR")
+    print("=" * 80)
+
+    # Off unless --profile is given; each stage() call then starts a new collapsed-stack file
+    profiler = StageProfiler(args.profile, args.profile_interval / 1000)
+
+    print("\n[1/6] Extracting comprehensive game statistics...")
+    profiler.stage("1-extract")
+
+    if args.stream:
+        # Extraction and aggregation are interleaved, one season at a time
+        print("\n[2/6] Engineering advanced features...")
+        profiler.stage("2-features")
+        stats, aggregates = stream_features(conn)
+    else:
+        all_games = load_team_games(conn, cache)
+
+        print("\n[2/6] Engineering advanced features...")
+        profiler.stage("2-features")
+        stats = engineer_features(all_games, conn)
+        aggregates = SeasonAggregates()
+        aggregates.fold(all_games)
+        del all_games
+
+    feature_names = FEATURE_NAMES
+
+    print(f"Total features engineered: {len(feature_names)}")
+    print(f"Total teams across all seasons: {len(stats)}")
+    print(f"Total champions: {stats['is_champion'].sum()}")
+
+    X = stats[feature_names].values
+    y = stats['is_champion'].values
+    seasons = stats['season_id'].values
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    print("\n[3/6] Building ensemble model with hyperparameter optimization...")
+    profiler.stage("3-tuning")
+
+    warm_start = {}
+    if (MODEL_DIR / "model_metadata_elite.json").exists():
+        with open(MODEL_DIR / "model_metadata_elite.json", 'r') as f:
+            previous = json.load(f)
+        warm_start = {'xgb': previous.get('best_xgb_params'), 'lgbm': previous.get('best_lgbm_params')}
+
+    print(f"\nOptimizing XGBoost and LightGBM ({args.trials} trials each, {args.jobs or os.cpu_count()} workers)...")
+    studies = tune(
+        X_scaled, y, args.storage, n_trials=args.trials, n_jobs=args.jobs,
+        warm_start=warm_start, fresh=args.fresh
+    )
+    study_xgb, study_lgbm = studies['xgb'], studies['lgbm']
+    best_xgb_params = study_xgb.best_params
+    print(f"Best XGBoost ROC-AUC: {study_xgb.best_value:.4f}")
+    best_lgbm_params = study_lgbm.best_params
+    print(f"Best LightGBM ROC-AUC: {study_lgbm.best_value:.4f}")
+
+    print("\n[4/6] Training final ensemble...")
+    profiler.stage("4-fit")
+
+    xgb_model = XGBClassifier(**best_xgb_params, random_state=42, eval_metric='logloss')
+    lgbm_model = LGBMClassifier(**best_lgbm_params, random_state=42, verbose=-1)
+    catboost_model = CatBoostClassifier(**CATBOOST_PARAMS)
+
+    xgb_model.fit(X_scaled, y)
+    lgbm_model.fit(X_scaled, y)
+    catboost_model.fit(X_scaled, y)
+
+    pred_xgb = xgb_model.predict_proba(X_scaled)[:, 1]
+    pred_lgbm = lgbm_model.predict_proba(X_scaled)[:, 1]
+    pred_catboost = catboost_model.predict_proba(X_scaled)[:, 1]
+
+    ensemble_pred = (pred_xgb + pred_lgbm + pred_catboost) / 3
+
+    auc_xgb = roc_auc_score(y, pred_xgb)
+    auc_lgbm = roc_auc_score(y, pred_lgbm)
+    auc_catboost = roc_auc_score(y, pred_catboost)
+    auc_ensemble = roc_auc_score(y, ensemble_pred)
+
+    print(f"\nModel Performance:")
+    print(f"  XGBoost:    ROC-AUC = {auc_xgb:.4f}")
+    print(f"  LightGBM:   ROC-AUC = {auc_lgbm:.4f}")
+    print(f"  CatBoost:   ROC-AUC = {auc_catboost:.4f}")
+    print(f"  Ensemble:   ROC-AUC = {auc_ensemble:.4f}")
+
+    print("\n[5/6] Saving models...")
+    profiler.stage("5-save")
+
+    joblib.dump(xgb_model, MODEL_DIR / "xgboost_elite.joblib")
+    joblib.dump(lgbm_model, MODEL_DIR / "lightgbm_elite.joblib")
+    joblib.dump(catboost_model, MODEL_DIR / "catboost_elite.joblib")
+    joblib.dump(scaler, MODEL_DIR / "scaler_elite.joblib")
+
+    # Array-based export served by the API instead of the three library runtimes
+    compiled_arrays = compile_ensemble(
+        xgb_model, lgbm_model, catboost_model, scaler, feature_names, tmp_dir=MODEL_DIR
+    )
+    compiled_error = max_abs_error(
+        CompiledEnsemble(compiled_arrays),
+        Ensemble(xgb_model, lgbm_model, catboost_model, scaler),
+        X
+    )
+    if compiled_error > DEFAULT_TOLERANCE:
+        raise RuntimeError(f"Compiled ensemble differs from the trained models by {compiled_error:.2e}")
+    save_compiled(compiled_arrays, MODEL_DIR / "ensemble_compiled_elite.npz")
+    print(f"Compiled ensemble exported (max probability error {compiled_error:.2e})")
+
+    metadata = {
+        'model_type': 'Ensemble (XGBoost + LightGBM + CatBoost)',
+        'feature_names': feature_names,
+        'num_features': len(feature_names),
+        'training_date': datetime.now().isoformat(),
+        'roc_auc_xgb': float(auc_xgb),
+        'roc_auc_lgbm': float(auc_lgbm),
+        'roc_auc_catboost': float(auc_catboost),
+        'roc_auc_ensemble': float(auc_ensemble),
+        'best_xgb_params': best_xgb_params,
+        'best_lgbm_params': best_lgbm_params,
+        'compiled_max_abs_error': compiled_error
     }
 
-    cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
-    scores = []
+    with open(MODEL_DIR / "model_metadata_elite.json", 'w') as f:
+        json.dump(metadata, f, indent=2)
 
-    for train_idx, val_idx in cv.split(X_scaled, y):
-        X_train, X_val = X_scaled[train_idx], X_scaled[val_idx]
-        y_train, y_val = y[train_idx], y[val_idx]
+    # Baseline for --refresh
+    aggregates.save(AGGREGATES_PATH)
 
-        model = LGBMClassifier(**params)
-        model.fit(X_train, y_train, eval_set=[(X_val, y_val)])
-        pred_proba = model.predict_proba(X_val)[:, 1]
-        scores.append(roc_auc_score(y_val, pred_proba))
+    save_season_features(
+        SEASON_FEATURES_PATH,
+        seasons=stats['season_id'].astype(int).values - 20000,
+        abbreviations=stats['abbreviation'].astype(str).values,
+        full_names=stats['full_name'].astype(str).values,
+        features=X,
+        feature_names=feature_names
+    )
 
-    return np.mean(scores)
+    print("\n[6/6] Generating 2021-22 predictions...")
+    profiler.stage("6-predict")
 
-print("\nOptimizing LightGBM...")
-study_lgbm = optuna.create_study(direction='maximize', study_name='lgbm')
-study_lgbm.optimize(objective_lgbm, n_trials=30, show_progress_bar=True)
-best_lgbm_params = study_lgbm.best_params
-print(f"Best LightGBM ROC-AUC: {study_lgbm.best_value:.4f}")
+    season_2022 = stats[stats['season_id'] == 22022].copy()
+    X_2022 = season_2022[feature_names].values
+    X_2022_scaled = scaler.transform(X_2022)
 
-print("\n[4/6] Training final ensemble...")
+    pred_xgb_2022 = xgb_model.predict_proba(X_2022_scaled)[:, 1]
+    pred_lgbm_2022 = lgbm_model.predict_proba(X_2022_scaled)[:, 1]
+    pred_catboost_2022 = catboost_model.predict_proba(X_2022_scaled)[:, 1]
+    ensemble_pred_2022 = (pred_xgb_2022 + pred_lgbm_2022 + pred_catboost_2022) / 3
 
-xgb_model = XGBClassifier(**best_xgb_params, random_state=42, eval_metric='logloss')
-lgbm_model = LGBMClassifier(**best_lgbm_params, random_state=42, verbose=-1)
-catboost_model = CatBoostClassifier(
-    iterations=300,
-    depth=8,
-    learning_rate=0.05,
-    random_state=42,
-    verbose=False
-)
-
-xgb_model.fit(X_scaled, y)
-lgbm_model.fit(X_scaled, y)
-catboost_model.fit(X_scaled, y)
-
-pred_xgb = xgb_model.predict_proba(X_scaled)[:, 1]
-pred_lgbm = lgbm_model.predict_proba(X_scaled)[:, 1]
-pred_catboost = catboost_model.predict_proba(X_scaled)[:, 1]
-
-ensemble_pred = (pred_xgb + pred_lgbm + pred_catboost) / 3
-
-auc_xgb = roc_auc_score(y, pred_xgb)
-auc_lgbm = roc_auc_score(y, pred_lgbm)
-auc_catboost = roc_auc_score(y, pred_catboost)
-auc_ensemble = roc_auc_score(y, ensemble_pred)
-
-print(f"\nModel Performance:")
-print(f"  XGBoost:    ROC-AUC = {auc_xgb:.4f}")
-print(f"  LightGBM:   ROC-AUC = {auc_lgbm:.4f}")
-print(f"  CatBoost:   ROC-AUC = {auc_catboost:.4f}")
-print(f"  Ensemble:   ROC-AUC = {auc_ensemble:.4f}")
-
-print("\n[5/6] Saving models...")
-
-joblib.dump(xgb_model, MODEL_DIR / "xgboost_elite.joblib")
-joblib.dump(lgbm_model, MODEL_DIR / "lightgbm_elite.joblib")
-joblib.dump(catboost_model, MODEL_DIR / "catboost_elite.joblib")
-joblib.dump(scaler, MODEL_DIR / "scaler_elite.joblib")
-
-metadata = {
-    'model_type': 'Ensemble (XGBoost + LightGBM + CatBoost)',
-    'feature_names': feature_names,
-    'num_features': len(feature_names),
-    'training_date': datetime.now().isoformat(),
-    'roc_auc_xgb': float(auc_xgb),
-    'roc_auc_lgbm': float(auc_lgbm),
-    'roc_auc_catboost': float(auc_catboost),
-    'roc_auc_ensemble': float(auc_ensemble),
-    'best_xgb_params': best_xgb_params,
-    'best_lgbm_params': best_lgbm_params
-}
+    season_2022['championship_probability'] = ensemble_pred_2022
+    season_2022['xgboost_probability'] = pred_xgb_2022
+    season_2022['lightgbm_probability'] = pred_lgbm_2022
+    season_2022['catboost_probability'] = pred_catboost_2022
+    season_2022 = season_2022.sort_values('championship_probability', ascending=False)
 
-with open(MODEL_DIR / "model_metadata_elite.json", 'w') as f:
-    json.dump(metadata, f, indent=2)
+    write_csv_atomic(season_2022[PREDICTION_COLUMNS], LATEST_PREDICTIONS_PATH)
 
-print("\n[6/6] Generating 2021-22 predictions...")
+    print(f"\nTop 5 Predictions for 2021-22:")
+    for idx, row in season_2022.head(5).iterrows():
+        prob = row['championship_probability'] * 100
+        print(f"  {row['full_name']:<25} {prob:>6.2f}%")
 
-season_2022 = stats[stats['season_id'] == 22022].copy()
-X_2022 = season_2022[feature_names].values
-X_2022_scaled = scaler.transform(X_2022)
+    actual_champ = CHAMPIONS[22022]
+    actual_rank = season_2022[season_2022['full_name'] == actual_champ].index[0]
+    actual_rank_num = list(season_2022.index).index(actual_rank) + 1
+    actual_prob = season_2022.loc[actual_rank, 'championship_probability'] * 100
 
-pred_xgb_2022 = xgb_model.predict_proba(X_2022_scaled)[:, 1]
-pred_lgbm_2022 = lgbm_model.predict_proba(X_2022_scaled)[:, 1]
-pred_catboost_2022 = catboost_model.predict_proba(X_2022_scaled)[:, 1]
-ensemble_pred_2022 = (pred_xgb_2022 + pred_lgbm_2022 + pred_catboost_2022) / 3
-
-season_2022['championship_probability'] = ensemble_pred_2022
-season_2022['xgboost_probability'] = pred_xgb_2022
-season_2022['lightgbm_probability'] = pred_lgbm_2022
-season_2022['catboost_probability'] = pred_catboost_2022
-season_2022 = season_2022.sort_values('championship_probability', ascending=False)
-
-output_cols = ['full_name', 'abbreviation', 'wins', 'win_pct', 'ppg', 'point_diff',
-               'championship_probability', 'xgboost_probability', 'lightgbm_probability',
-               'catboost_probability']
-season_2022[output_cols].to_csv(
-    PROJECT_ROOT / "backend" / "models" / "latest_predictions_elite.csv",
-    index=False
-)
+    print(f"\nActual Champion: {actual_champ}")
+    print(f"Model ranked them: #{actual_rank_num} ({actual_prob:.2f}%)")
 
-print(f"\nTop 5 Predictions for 2021-22:")
-for idx, row in season_2022.head(5).iterrows():
-    prob = row['championship_probability'] * 100
-    print(f"  {row['full_name']:<25} {prob:>6.2f}%")
+    conn.close()
 
-actual_champ = champions[22022]
-actual_rank = season_2022[season_2022['full_name'] == actual_champ].index[0]
-actual_rank_num = list(season_2022.index).index(actual_rank) + 1
-actual_prob = season_2022.loc[actual_rank, 'championship_probability'] * 100
+    timings = profiler.finish()
+    if timings:
+        print(f"\nProfile written to {profiler.out_dir} (all.collapsed has every stage):")
+        for stage, seconds, samples in timings:
+            print(f"  {stage:<12} {seconds:>8.2f}s {samples:>8} samples")
 
-print(f"\nActual Champion: {actual_champ}")
-print(f"Model ranked them: #{actual_rank_num} ({actual_prob:.2f}%)")
+    print("\n" + "=" * 80)
+    print("ELITE MODEL TRAINING COMPLETE!")
+    print(f"Ensemble ROC-AUC: {auc_ensemble:.4f}")
+    print(f"Total Features: {len(feature_names)}")
+    print("=" * 80)
 
-conn.close()
 
-print("\n" + "=" * 80)
-print("ELITE MODEL TRAINING COMPLETE!")
-print(f"Ensemble ROC-AUC: {auc_ensemble:.4f}")
-print(f"Total Features: {len(feature_names)}")
-print("=" * 80)
+if __name__ == "__main__":
+    main()
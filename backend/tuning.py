@@ -0,0 +1,211 @@
+"""
+Hyperparameter search for the elite ensemble
+
+Studies live in persistent Optuna storage (a journal file by default, or
+any Optuna storage URL such as sqlite:///optuna.db), so an interrupted run
+resumes where it stopped. Study names include a fingerprint of the training
+matrix: rerunning on the same data continues the same studies, while new
+data starts fresh studies seeded with the previous best parameters.
+
+Trials run in a process pool. XGBoost and LightGBM workers share the pool,
+so both searches progress at the same time, and each trial reports its
+running CV score after every fold so clearly bad trials are pruned early.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import hashlib
+import multiprocessing
+import os
+
+import numpy as np
+import optuna
+from optuna.study import MaxTrialsCallback
+from optuna.trial import TrialState
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+try:
+    from optuna.storages.journal import JournalFileBackend
+except ImportError:
+    # Optuna < 4.0
+    from optuna.storages import JournalFileStorage as JournalFileBackend
+
+DEFAULT_TRIALS = 30
+CV_SPLITS = 5
+MODEL_KINDS = ('xgb', 'lgbm')
+FINISHED_STATES = (TrialState.COMPLETE, TrialState.PRUNED)
+
+# Set per process by _init_worker so the training matrix is pickled once per worker, not per trial
+_X = None
+_y = None
+_n_threads = None
+
+
+def xgb_params(trial):
+    return {
+        'max_depth': trial.suggest_int('max_depth', 4, 12),
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3),
+        'n_estimators': trial.suggest_int('n_estimators', 100, 500),
+        'min_child_weight': trial.suggest_int('min_child_weight', 1, 10),
+        'subsample': trial.suggest_float('subsample', 0.6, 1.0),
+        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0),
+        'gamma': trial.suggest_float('gamma', 0, 5),
+        'random_state': 42,
+        'eval_metric': 'logloss'
+    }
+
+
+def lgbm_params(trial):
+    return {
+        'max_depth': trial.suggest_int('max_depth', 4, 12),
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3),
+        'n_estimators': trial.suggest_int('n_estimators', 100, 500),
+        'num_leaves': trial.suggest_int('num_leaves', 20, 100),
+        'min_child_samples': trial.suggest_int('min_child_samples', 5, 50),
+        'subsample': trial.suggest_float('subsample', 0.6, 1.0),
+        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0),
+        'random_state': 42,
+        'verbose': -1
+    }
+
+
+SEARCH_SPACES = {'xgb': xgb_params, 'lgbm': lgbm_params}
+
+
+def _fit_and_score(kind, params, X_train, y_train, X_val, y_val, n_threads):
+    if kind == 'xgb':
+        from xgboost import XGBClassifier
+
+        model = XGBClassifier(**params, n_jobs=n_threads)
+        model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+    else:
+        from lightgbm import LGBMClassifier
+
+        model = LGBMClassifier(**params, n_jobs=n_threads)
+        model.fit(X_train, y_train, eval_set=[(X_val, y_val)])
+    pred_proba = model.predict_proba(X_val)[:, 1]
+    return roc_auc_score(y_val, pred_proba)
+
+
+def cross_validate(kind, params, X, y, trial=None, n_threads=None):
+    """Mean stratified 5-fold ROC-AUC; with a trial, prunes once the running mean falls behind"""
+    cv = StratifiedKFold(n_splits=CV_SPLITS, shuffle=True, random_state=42)
+    scores = []
+
+    for fold, (train_idx, val_idx) in enumerate(cv.split(X, y)):
+        X_train, X_val = X[train_idx], X[val_idx]
+        y_train, y_val = y[train_idx], y[val_idx]
+        scores.append(_fit_and_score(kind, params, X_train, y_train, X_val, y_val, n_threads))
+
+        if trial is not None:
+            trial.report(float(np.mean(scores)), fold)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+
+    return float(np.mean(scores))
+
+
+def open_storage(storage):
+    """Optuna storage for a URL (sqlite:///..., postgresql://...) or a journal file path"""
+    storage = str(storage)
+    if '://' in storage:
+        return storage
+    return optuna.storages.JournalStorage(JournalFileBackend(storage))
+
+
+def data_fingerprint(X, y):
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.int64).tobytes())
+    return digest.hexdigest()[:12]
+
+
+def _pruner():
+    # Wait for 5 finished trials and 2 folds before comparing against the median
+    return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=1)
+
+
+def _finished_trials(study):
+    return len(study.get_trials(deepcopy=False, states=FINISHED_STATES))
+
+
+def _init_worker(X, y, n_threads):
+    global _X, _y, _n_threads
+    _X, _y, _n_threads = X, y, n_threads
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+
+def _run_worker(kind, study_name, storage, n_trials):
+    """Pull trials for one study until it has n_trials finished between all workers"""
+    study = optuna.load_study(study_name=study_name, storage=open_storage(storage), pruner=_pruner())
+    if _finished_trials(study) >= n_trials:
+        return
+
+    def objective(trial):
+        return cross_validate(kind, SEARCH_SPACES[kind](trial), _X, _y, trial=trial, n_threads=_n_threads)
+
+    study.optimize(objective, callbacks=[MaxTrialsCallback(n_trials, states=FINISHED_STATES)])
+
+
+def tune(X, y, storage, n_trials=DEFAULT_TRIALS, n_jobs=None, warm_start=None, fresh=False, kinds=MODEL_KINDS):
+    """
+    Run (or resume) one study per model kind and return {kind: study}.
+
+    warm_start maps kind -> params enqueued as the first trial of a new study.
+    n_jobs worker processes are split across the kinds that still need
+    trials; with n_jobs=1 everything runs in this process.
+    """
+    if '://' not in str(storage):
+        Path(storage).parent.mkdir(parents=True, exist_ok=True)
+    storage_obj = open_storage(storage)
+    fingerprint = data_fingerprint(X, y)
+    warm_start = warm_start or {}
+
+    studies = {}
+    for kind in kinds:
+        study_name = f"{kind}-{fingerprint}"
+        if fresh:
+            try:
+                optuna.delete_study(study_name=study_name, storage=storage_obj)
+            except KeyError:
+                pass
+        study = optuna.create_study(
+            direction='maximize', study_name=study_name, storage=storage_obj,
+            load_if_exists=True, pruner=_pruner()
+        )
+        if not study.trials and warm_start.get(kind):
+            study.enqueue_trial(warm_start[kind], skip_if_exists=True)
+        finished = _finished_trials(study)
+        if finished:
+            print(f"Resuming {study_name}: {finished}/{n_trials} trials already finished")
+        studies[kind] = study
+
+    pending = [kind for kind, study in studies.items() if _finished_trials(study) < n_trials]
+    if not pending:
+        return studies
+
+    n_jobs = max(1, n_jobs or os.cpu_count() or 1)
+    if n_jobs == 1:
+        _init_worker(X, y, None)
+        for kind in pending:
+            _run_worker(kind, studies[kind].study_name, storage, n_trials)
+        return studies
+
+    # Round-robin the workers over the pending studies so they tune concurrently
+    assignments = [pending[i % len(pending)] for i in range(max(n_jobs, len(pending)))]
+    n_threads = max(1, (os.cpu_count() or 1) // len(assignments))
+    # spawn rather than fork: the boosters' OpenMP runtimes are not fork-safe
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(
+        max_workers=len(assignments), mp_context=context,
+        initializer=_init_worker, initargs=(X, y, n_threads)
+    ) as pool:
+        futures = [
+            pool.submit(_run_worker, kind, studies[kind].study_name, storage, n_trials)
+            for kind in assignments
+        ]
+        for future in futures:
+            future.result()
+
+    return studies
@@ -0,0 +1,114 @@
+"""
+Peak memory of full vs streaming (per-season) extraction
+
+Each mode runs in a fresh interpreter so its peak RSS is not hidden by the
+other's high-water mark. "full" reads the whole joined game table, unpivots
+it and aggregates it (train_elite_model.py's default path, without the
+extraction cache); "stream" reads and aggregates one season at a time
+(--stream).
+
+Usage:
+    python benchmarks/extraction_memory.py [--db path/to/nba.sqlite] [--json out.json]
+"""
+
+from pathlib import Path
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MODES = ("full", "stream")
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        return _peak_rss_mb()
+
+
+def run_mode(mode, db_path):
+    """Build features in this process and return its measurements"""
+    sys.path.insert(0, str(PROJECT_ROOT))
+    import sqlite3
+    import numpy as np
+    import pandas as pd
+    from backend import train_elite_model as training
+    from backend.season_aggregates import SeasonAggregates
+
+    baseline = _current_rss_mb()
+    conn = sqlite3.connect(db_path)
+    start = time.perf_counter()
+    if mode == "stream":
+        stats, aggregates = training.stream_features(conn)
+    else:
+        all_games = training.load_team_games(conn)
+        stats = training.engineer_features(all_games, conn)
+        aggregates = SeasonAggregates()
+        aggregates.fold(all_games)
+        del all_games
+    elapsed = time.perf_counter() - start
+    conn.close()
+
+    numeric = stats.select_dtypes(include=[np.number])
+    return {
+        "mode": mode,
+        "seconds": round(elapsed, 3),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "peak_over_baseline_mb": round(_peak_rss_mb() - baseline, 1),
+        "team_seasons": len(stats),
+        # Lets the parent confirm both modes produced the same features
+        "checksum": float(pd.util.hash_pandas_object(numeric.round(9), index=False).sum() % (2 ** 52)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", help="SQLite database (default: db_path from data/config.json)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    db_path = args.db
+    if db_path is None:
+        with open(PROJECT_ROOT / "data" / "config.json") as f:
+            db_path = json.load(f)["db_path"]
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, db_path)))
+        return
+
+    results = []
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--db", db_path],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'mode':<8} {'seconds':>8} {'peak RSS':>10} {'over baseline':>14}")
+    for result in results:
+        print(f"{result['mode']:<8} {result['seconds']:>8.2f} {result['peak_rss_mb']:>8.1f}MB "
+              f"{result['peak_over_baseline_mb']:>12.1f}MB")
+    if len({result["checksum"] for result in results}) != 1:
+        # Only expected when a team has two games on one date, which the date sort may order either way
+        print("WARNING: the two modes produced different features")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"database": str(db_path), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
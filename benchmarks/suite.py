@@ -0,0 +1,398 @@
+"""
+Offline benchmark suite: training stages, model inference and API latency
+
+Runs without network access or the Kaggle database. Each section runs in
+a fresh interpreter so its peak RSS is its own:
+
+    training   train_elite_model.py's stages, timed one by one against a
+               synthetic nba.sqlite (backend/synthetic_db.py): SQL extraction,
+               unpivot, aggregation, the recent-form pass, feature
+               derivation, the --refresh baseline, Optuna, each final fit
+               and the compiled export
+    inference  the committed models on random rows at several batch sizes:
+               scaler, each booster, the averaged ensemble and the compiled
+               ensemble
+    api        in-process HTTP requests against the FastAPI app serving the
+               committed models and prediction files: throughput and
+               latency percentiles per endpoint
+
+Everything is seeded, so two runs on the same machine differ only by
+timing noise. Results are written as JSON; --compare prints every metric
+next to an earlier run's, for comparing commits.
+
+Usage:
+    python benchmarks/suite.py [--sections training inference api] [--json out.json]
+    python benchmarks/suite.py --compare base.json --json new.json
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SECTIONS = ("training", "inference", "api")
+BATCH_SIZES = (1, 100, 10000)
+
+# Example payload for POST /predict: a good, not dominant, team
+TEAM_STATS = {
+    'wins': 50, 'win_pct': 0.61, 'ppg': 112.0, 'opp_ppg': 107.5, 'point_diff': 4.5,
+    'fg_pct': 0.47, 'ft_pct': 0.78, 'fg3_pct': 0.36, 'fg3m': 12.5, 'opp_fg3_pct': 0.35, 'fg3_diff': 0.01,
+    'apg': 25.0, 'rpg': 44.5, 'spg': 7.5, 'bpg': 5.0, 'oreb': 10.0, 'dreb': 34.5, 'reb_diff': 2.0,
+    'oreb_rate': 0.24, 'dreb_rate': 0.76, 'tov': 13.5, 'tov_diff': 0.0, 'ast_tov_ratio': 1.85,
+    'defensive_pressure': 12.5, 'pressure_diff': 12.5, 'off_efficiency': 1.12, 'def_efficiency': 1.07,
+    'efficiency_diff': 0.05, 'ft_rate': 0.25, 'discipline': -19.5, 'recent_win_pct': 0.6,
+    'recent_point_diff': 4.0, 'momentum': 2.4,
+}
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentiles(samples):
+    """Latency summary in milliseconds from samples in seconds"""
+    import numpy as np
+
+    ms = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p90_ms": round(float(np.percentile(ms, 90)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "max_ms": round(float(ms.max()), 4),
+    }
+
+
+class _Stages:
+    """Wall-clock seconds per named stage, in the order they ran"""
+
+    def __init__(self):
+        self.seconds = {}
+
+    def run(self, name, function, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        self.seconds[name] = round(time.perf_counter() - start, 4)
+        return result
+
+
+def run_training(db_path, trials):
+    sys.path.insert(0, str(PROJECT_ROOT))
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler
+    from xgboost import XGBClassifier
+    from lightgbm import LGBMClassifier
+    from catboost import CatBoostClassifier
+    from backend import train_elite_model as training
+    from backend.app.compiled_ensemble import compile_ensemble
+    from backend.app.db import connect_readonly
+    from backend.season_aggregates import SeasonAggregates
+    from backend.tuning import tune
+
+    stages = _Stages()
+    conn = connect_readonly(db_path)
+    games = stages.run("sql_extraction", pd.read_sql_query, training.GAMES_QUERY, conn)
+    all_games = stages.run("unpivot", training.team_game_rows, games)
+    stats = stages.run("aggregation", training.aggregate_team_seasons, all_games)
+    # Already part of aggregation; timed again on its own because it is the one per-game window
+    stages.run("recent_form", training.recent_form, all_games)
+    stats = stages.run("feature_derivation", training.derive_features, stats, conn)
+    stages.run("refresh_baseline", SeasonAggregates().fold, all_games)
+    conn.close()
+
+    X = stats[training.FEATURE_NAMES].values
+    y = stats['is_champion'].values
+    scaler = StandardScaler()
+    X_scaled = stages.run("scaling", scaler.fit_transform, X)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        studies = stages.run(
+            "optuna", tune, X_scaled, y, Path(tmp_dir) / "optuna.journal", n_trials=trials, n_jobs=1, fresh=True
+        )
+        models = (
+            XGBClassifier(**studies['xgb'].best_params, random_state=42, eval_metric='logloss'),
+            LGBMClassifier(**studies['lgbm'].best_params, random_state=42, verbose=-1),
+            # train_dir keeps catboost_info/ out of the working directory
+            CatBoostClassifier(**training.CATBOOST_PARAMS, train_dir=tmp_dir),
+        )
+        for name, model in zip(("fit_xgboost", "fit_lightgbm", "fit_catboost"), models):
+            stages.run(name, model.fit, X_scaled, y)
+        stages.run(
+            "compile", compile_ensemble, *models, scaler, training.FEATURE_NAMES, tmp_dir=tmp_dir
+        )
+
+    return {
+        "games": len(games),
+        "team_seasons": len(stats),
+        "optuna_trials": trials,
+        "stages": stages.seconds,
+        "total_seconds": round(sum(stages.seconds.values()) - stages.seconds["recent_form"], 4),
+    }
+
+
+def _time_calls(function, rows, budget=1.0, min_calls=5, max_calls=1000):
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < min_calls or (len(samples) < max_calls and time.perf_counter() - start < budget):
+        call_start = time.perf_counter()
+        function(rows)
+        samples.append(time.perf_counter() - call_start)
+    return samples
+
+
+def run_inference(seed=0):
+    sys.path.insert(0, str(PROJECT_ROOT))
+    import joblib
+    import numpy as np
+    from backend.app.compiled_ensemble import CompiledEnsemble
+    from backend.app.model_registry import UNVERSIONED
+
+    xgb_model, lgbm_model, catboost_model, scaler = (
+        joblib.load(UNVERSIONED.model_path(kind)) for kind in ("xgb", "lgbm", "catboost", "scaler")
+    )
+    compiled = CompiledEnsemble.load(UNVERSIONED.compiled_path)
+
+    def ensemble(rows):
+        scaled = scaler.transform(rows)
+        return sum(model.predict_proba(scaled)[:, 1] for model in (xgb_model, lgbm_model, catboost_model)) / 3
+
+    rng = np.random.default_rng(seed)
+    results = {}
+    for batch_size in BATCH_SIZES:
+        rows = scaler.mean_ + rng.standard_normal((batch_size, len(scaler.mean_))) * scaler.scale_
+        scaled = scaler.transform(rows)
+        operations = {
+            "scaler": (scaler.transform, rows),
+            "xgboost": (xgb_model.predict_proba, scaled),
+            "lightgbm": (lgbm_model.predict_proba, scaled),
+            "catboost": (catboost_model.predict_proba, scaled),
+            "ensemble": (ensemble, rows),
+            "compiled_ensemble": (compiled.predict, rows),
+        }
+        results[str(batch_size)] = {
+            name: _percentiles(_time_calls(function, data)) for name, (function, data) in operations.items()
+        }
+    return {"batch_sizes": results}
+
+
+def _unique_team_stats(counter=itertools.count()):
+    """A /predict payload no earlier request sent, so the result cache cannot answer it"""
+    return dict(TEAM_STATS, wins=TEAM_STATS['wins'] + next(counter) * 1e-6)
+
+
+def _api_requests():
+    """(label, method, path, json body or a function returning one per request) for every endpoint timed"""
+    batch = {"teams": [TEAM_STATS] * 100}
+    return [
+        ("GET /predictions", "GET", "/predictions", None),
+        ("GET /predictions/{season}", "GET", "/predictions/2016", None),
+        ("GET /seasons", "GET", "/seasons", None),
+        ("GET /historical", "GET", "/historical", None),
+        ("GET /features", "GET", "/features", None),
+        ("GET /rankings", "GET", "/rankings?top=10", None),
+        ("GET /teams/{abbr}/history", "GET", "/teams/GSW/history", None),
+        ("GET /actual-champion/{season}", "GET", "/actual-champion/2016", None),
+        ("GET /simulate/{season}", "GET", "/simulate/2022", None),
+        ("POST /predict", "POST", "/predict", _unique_team_stats),
+        ("POST /predict (cache hit)", "POST", "/predict", TEAM_STATS),
+        ("POST /predict/batch (100 rows)", "POST", "/predict/batch", batch),
+    ]
+
+
+async def _drive(client, method, path, body, requests, concurrency):
+    samples, statuses = [], {}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body() if callable(body) else body)
+            samples.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, statuses, time.perf_counter() - start
+
+
+async def _run_api(requests, concurrency):
+    import httpx
+    from backend.app import main as api
+
+    results = {}
+    transport = httpx.ASGITransport(app=api.app)
+    async with api.app.router.lifespan_context(api.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for label, method, path, body in _api_requests():
+                # Untimed first calls fill the lazily built caches, as in a warmed-up server
+                await _drive(client, method, path, body, concurrency, concurrency)
+                samples, statuses, elapsed = await _drive(client, method, path, body, requests, concurrency)
+                results[label] = {
+                    "requests": requests,
+                    "concurrency": concurrency,
+                    "throughput_rps": round(requests / elapsed, 1),
+                    **_percentiles(samples),
+                    "statuses": {str(status): count for status, count in sorted(statuses.items())},
+                }
+    return results
+
+
+def run_api(requests, concurrency):
+    sys.path.insert(0, str(PROJECT_ROOT))
+    # Committed artifacts at the training output paths, loaded before the first request
+    empty_registry = tempfile.mkdtemp()
+    os.environ.update({
+        "API_STARTUP_MODE": "eager",
+        "API_SHARED_ARTIFACTS": "0",
+        "API_MODEL_REGISTRY_DIR": empty_registry,
+    })
+    return {"endpoints": asyncio.run(_run_api(requests, concurrency))}
+
+
+def run_section(section, args):
+    start = time.perf_counter()
+    if section == "training":
+        result = run_training(args.db, args.trials)
+    elif section == "inference":
+        result = run_inference()
+    else:
+        result = run_api(args.requests, args.concurrency)
+    result["wall_seconds"] = round(time.perf_counter() - start, 3)
+    result["peak_rss_mb"] = round(_peak_rss_mb(), 1)
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Run settings and counts rather than measurements
+_NOT_COMPARED = {"requests", "concurrency", "statuses", "optuna_trials", "games", "team_seasons"}
+
+
+def _flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if key in _NOT_COMPARED:
+            continue
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(base, current):
+    """Print every numeric metric present in both runs with its relative change"""
+    base_metrics, current_metrics = _flatten(base["sections"]), _flatten(current["sections"])
+    print(f"\n{base.get('commit')} -> {current.get('commit')}")
+    for name, value in current_metrics.items():
+        if name not in base_metrics:
+            continue
+        before = base_metrics[name]
+        change = f"{(value - before) / before * 100:+7.1f}%" if before else "      -"
+        print(f"  {name:<70} {before:>12.4f} {value:>12.4f} {change}")
+
+
+def _print_summary(results):
+    sections = results["sections"]
+    if "training" in sections:
+        training = sections["training"]
+        print(f"\ntraining: {training['games']:,} games, {training['team_seasons']} team-seasons, "
+              f"peak {training['peak_rss_mb']:.0f}MB")
+        for stage, seconds in training["stages"].items():
+            print(f"  {stage:<20} {seconds:>9.3f}s")
+    if "inference" in sections:
+        print(f"\ninference (p50 / p99 ms), peak {sections['inference']['peak_rss_mb']:.0f}MB")
+        for batch_size, operations in sections["inference"]["batch_sizes"].items():
+            timings = "  ".join(
+                f"{name} {timing['p50_ms']:.3f}/{timing['p99_ms']:.3f}" for name, timing in operations.items()
+            )
+            print(f"  batch {batch_size:>5}: {timings}")
+    if "api" in sections:
+        print(f"\napi, peak {sections['api']['peak_rss_mb']:.0f}MB")
+        print(f"  {'endpoint':<34} {'req/s':>9} {'p50':>9} {'p90':>9} {'p99':>9}")
+        for label, endpoint in sections["api"]["endpoints"].items():
+            print(f"  {label:<34} {endpoint['throughput_rps']:>9.1f} {endpoint['p50_ms']:>7.2f}ms "
+                  f"{endpoint['p90_ms']:>7.2f}ms {endpoint['p99_ms']:>7.2f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument("--db", help="SQLite database for the training section (default: a generated fixture)")
+    parser.add_argument("--seasons", type=int, default=20, help="Fixture seasons")
+    parser.add_argument("--teams", type=int, default=30, help="Fixture teams")
+    parser.add_argument("--games-per-season", type=int, default=None,
+                        help="Fixture regular season games per season (default: 82 per team)")
+    parser.add_argument("--trials", type=int, default=5, help="Optuna trials per model in the training section")
+    parser.add_argument("--requests", type=int, default=300, help="Timed requests per API endpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--section", choices=SECTIONS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.section:
+        print(json.dumps(run_section(args.section, args)))
+        return
+
+    results = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "fixture": None,
+        "sections": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = args.db
+        if "training" in args.sections and db_path is None:
+            sys.path.insert(0, str(PROJECT_ROOT))
+            from backend.synthetic_db import build_database
+            from backend.tuning import CV_SPLITS
+
+            if args.seasons < CV_SPLITS:
+                # One champion per season, and stratified CV needs one in every fold
+                parser.error(f"--seasons must be at least {CV_SPLITS} for the training section")
+            db_path = str(Path(tmp_dir) / "nba.sqlite")
+            games = build_database(db_path, args.seasons, args.teams, args.games_per_season)
+            results["fixture"] = {"seasons": args.seasons, "teams": args.teams, "games": games}
+
+        for section in args.sections:
+            command = [
+                sys.executable, __file__, "--section", section, "--trials", str(args.trials),
+                "--requests", str(args.requests), "--concurrency", str(args.concurrency)
+            ]
+            if db_path is not None:
+                command += ["--db", db_path]
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            results["sections"][section] = json.loads(output.strip().splitlines()[-1])
+
+    _print_summary(results)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
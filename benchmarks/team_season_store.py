@@ -0,0 +1,151 @@
+"""
+Memory and lookup latency: team-season index vs DataFrames vs record lists
+
+Loads every season_predictions/predictions_{year}.csv into three
+structures and times the lookups behind /actual-champion and a
+(season, abbreviation) query:
+
+    dataframe  one pandas DataFrame per season, filtered with a boolean mask
+               (the original per-request path, minus the CSV re-read)
+    records    one list of TeamPrediction dataclasses per season, scanned
+    index      TeamSeasonIndex: parallel arrays and a (season, team) dict
+
+Memory is what tracemalloc attributes to building each structure from the
+already-parsed CSVs. --copies repeats the seasons under new season numbers
+to see how each structure scales past 20 seasons.
+
+Usage:
+    python benchmarks/team_season_store.py [--copies 10] [--json out.json]
+"""
+
+from pathlib import Path
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import pandas as pd
+
+from backend.app.prediction_store import season_records
+from backend.app.team_seasons import TeamSeasonIndex
+
+SEASON_DIR = PROJECT_ROOT / "backend" / "models" / "season_predictions"
+
+
+def _measure(build):
+    tracemalloc.start()
+    value = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current
+
+
+def _time(operation, queries, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in queries:
+            operation(*query)
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries)
+
+
+def build_structures(frames):
+    """{name: (structure, bytes allocated building it)} from already-parsed season frames"""
+    rows = {season: frame.to_dict("records") for season, frame in frames.items()}
+    records = {season: season_records(season_rows) for season, season_rows in rows.items()}
+    return {
+        "dataframe": _measure(lambda: {season: frame.copy(deep=True) for season, frame in frames.items()}),
+        "records": _measure(lambda: {season: season_records(season_rows) for season, season_rows in rows.items()}),
+        "index": _measure(lambda: TeamSeasonIndex(records)),
+    }
+
+
+def champion_rank_dataframe(frames, season, name):
+    df = frames[season]
+    actual_row = df[df["full_name"] == name]
+    return int(actual_row.index[0] + 1), float(actual_row.iloc[0]["championship_probability"])
+
+
+def champion_rank_records(records, season, name):
+    return next(
+        (rank, record.championship_probability)
+        for rank, record in enumerate(records[season], start=1) if record.full_name == name
+    )
+
+
+def champion_rank_index(index, season, name):
+    team_season = index.find(season, name)
+    return team_season.rank, team_season.championship_probability
+
+
+def team_dataframe(frames, season, abbreviation):
+    df = frames[season]
+    return df[df["abbreviation"] == abbreviation].iloc[0]
+
+
+def team_records(records, season, abbreviation):
+    return next(record for record in records[season] if record.abbreviation == abbreviation)
+
+
+def team_index(index, season, abbreviation):
+    return index.get(season, abbreviation)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--season-dir", default=str(SEASON_DIR))
+    parser.add_argument("--copies", type=int, default=1, help="Repeat the seasons this many times")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing rounds; the best is reported")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    base = {
+        int(path.stem.split("_")[1]): pd.read_csv(path)
+        for path in sorted(Path(args.season_dir).glob("predictions_*.csv"))
+    }
+    span = max(base) - min(base) + 1
+    frames = {
+        season + copy * span: frame for copy in range(args.copies) for season, frame in base.items()
+    }
+
+    structures = build_structures(frames)
+    dataframes, records, index = (structures[name][0] for name in ("dataframe", "records", "index"))
+
+    # Every team of every season, looked up by name (as /actual-champion does) and by abbreviation
+    by_name = [(season, name) for season, frame in frames.items() for name in frame["full_name"]]
+    by_abbreviation = [(season, abbr) for season, frame in frames.items() for abbr in frame["abbreviation"]]
+
+    operations = {
+        "dataframe": (dataframes, champion_rank_dataframe, team_dataframe),
+        "records": (records, champion_rank_records, team_records),
+        "index": (index, champion_rank_index, team_index),
+    }
+    results = []
+    for name, (structure, champion_rank, team) in operations.items():
+        results.append({
+            "structure": name,
+            "memory_kb": round(structures[name][1] / 1024, 1),
+            "rank_by_name_us": round(_time(lambda *q: champion_rank(structure, *q), by_name, args.repeat) * 1e6, 2),
+            "team_by_abbreviation_us": round(
+                _time(lambda *q: team(structure, *q), by_abbreviation, args.repeat) * 1e6, 2
+            ),
+        })
+
+    print(f"{len(frames)} seasons, {len(by_name)} team-seasons")
+    print(f"{'structure':<10} {'memory':>10} {'rank by name':>14} {'team lookup':>13}")
+    for result in results:
+        print(f"{result['structure']:<10} {result['memory_kb']:>8.1f}KB {result['rank_by_name_us']:>12.2f}us "
+              f"{result['team_by_abbreviation_us']:>11.2f}us")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"seasons": len(frames), "team_seasons": len(by_name), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
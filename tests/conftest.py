@@ -0,0 +1,63 @@
+"""Shared fixtures: the committed models, the API and a small synthetic nba.sqlite"""
+
+from pathlib import Path
+import warnings
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+MODEL_DIR = PROJECT_ROOT / "models"
+
+
+@pytest.fixture(scope="session")
+def native_ensemble():
+    """The committed XGBoost/LightGBM/CatBoost models behind the original Ensemble"""
+    import joblib
+    from backend.app.ensemble import Ensemble
+
+    with warnings.catch_warnings():
+        # The pickles predate the installed xgboost and scikit-learn
+        warnings.simplefilter("ignore")
+        models = [joblib.load(MODEL_DIR / f"{kind}_elite.joblib")
+                  for kind in ("xgboost", "lightgbm", "catboost", "scaler")]
+    return Ensemble(*models)
+
+
+@pytest.fixture(scope="session")
+def compiled_ensemble():
+    from backend.app.compiled_ensemble import CompiledEnsemble
+
+    return CompiledEnsemble.load(MODEL_DIR / "ensemble_compiled_elite.npz")
+
+
+@pytest.fixture(scope="session")
+def synthetic_db(tmp_path_factory):
+    """A seeded backend/synthetic_db.py database: 3 seasons of 6 teams, 20 games each"""
+    from backend.synthetic_db import build_database
+
+    path = tmp_path_factory.mktemp("db") / "nba.sqlite"
+    build_database(path, seasons=3, n_teams=6, games_per_season=60, playoff_games=5)
+    return path
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+@pytest.fixture(scope="session")
+def api():
+    """backend.app.main serving the committed models, without a stale models/shared/ bundle"""
+    with pytest.MonkeyPatch.context() as env:
+        env.setenv("API_SHARED_ARTIFACTS", "0")
+        env.setenv("API_STARTUP_MODE", "lazy")
+        import backend.app.main as main
+    return main
+
+
+@pytest.fixture(scope="session")
+def api_client(api):
+    from fastapi.testclient import TestClient
+
+    return TestClient(api.app)
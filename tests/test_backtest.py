@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from backend import backtest
+from backend.app.model_registry import HISTORICAL_FILE
+
+
+@pytest.fixture(scope="module")
+def league_db(tmp_path_factory):
+    """3 synthetic seasons of all 30 teams, so the 2003-2005 champions are in the data"""
+    from backend.synthetic_db import build_database
+
+    path = tmp_path_factory.mktemp("league") / "nba.sqlite"
+    build_database(path, seasons=3, n_teams=30, games_per_season=150, playoff_games=5)
+    return path
+
+
+@pytest.fixture(scope="module")
+def backtest_run(league_db, tmp_path_factory):
+    out_dir = tmp_path_factory.mktemp("backtest")
+    served = pd.DataFrame({
+        'season': [2004, 2005], 'actual_champion': ["Detroit Pistons", "San Antonio Spurs"],
+        'made_playoffs_prev': [1, 0], 'playoff_rounds_prev': [3, 0],
+    })
+    served.to_csv(out_dir / HISTORICAL_FILE, index=False)
+    backtest.main(['--db', str(league_db), '--out-dir', str(out_dir), '--jobs', '2', '--no-cache'])
+    return out_dir
+
+
+def test_writes_every_season_and_the_summary(backtest_run):
+    # 2003 has no earlier season to train on
+    season_files = sorted(path.name for path in (backtest_run / "season_predictions").iterdir())
+    assert season_files == ["predictions_2004.csv", "predictions_2005.csv"]
+
+    for name in season_files:
+        season = pd.read_csv(backtest_run / "season_predictions" / name)
+        assert list(season.columns) == backtest.SEASON_COLUMNS
+        assert len(season) == 30
+        assert season['championship_probability'].between(0, 1).all()
+        assert season['championship_probability'].is_monotonic_decreasing
+
+    summary = pd.read_csv(backtest_run / backtest.SUMMARY_NAME)
+    assert summary['season'].tolist() == [2004, 2005]
+    assert summary['actual_champion'].tolist() == ["Detroit Pistons", "San Antonio Spurs"]
+    assert summary['training_seasons'].tolist() == [1, 2]
+    assert summary['actual_champion_rank'].between(1, 30).all()
+
+
+def test_served_summary_is_left_alone_without_promote(backtest_run):
+    served = pd.read_csv(backtest_run / HISTORICAL_FILE)
+    assert list(served.columns) == ['season', 'actual_champion', 'made_playoffs_prev', 'playoff_rounds_prev']
+
+
+def test_promote_keeps_the_served_columns(backtest_run, tmp_path):
+    summary = pd.read_csv(backtest_run / backtest.SUMMARY_NAME)
+    served_path = tmp_path / HISTORICAL_FILE
+    pd.DataFrame({'season': [2005], 'made_playoffs_prev': [1], 'playoff_rounds_prev': [2]}).to_csv(
+        served_path, index=False
+    )
+
+    backtest.promote_summary(summary, served_path)
+
+    promoted = pd.read_csv(served_path)
+    assert list(promoted.columns) == list(summary.columns) + ['made_playoffs_prev', 'playoff_rounds_prev']
+    pd.testing.assert_frame_equal(promoted[summary.columns], summary)
+    assert promoted['playoff_rounds_prev'].tolist()[1] == 2
+    # A season the served file did not list has nothing to carry over
+    assert promoted['made_playoffs_prev'].isna().tolist() == [True, False]
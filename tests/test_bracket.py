@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from backend.app.bracket import ROUNDS, TEAMS_PER_CONFERENCE, seed_conferences, series_probabilities, simulate
+from backend.app.prediction_store import TeamPrediction
+
+# Teams that reach each round: 8 conference semifinalists, 4 conference finalists, 2 finalists, 1 champion
+ROUND_TEAMS = dict(zip(ROUNDS, (8, 4, 2, 1)))
+
+
+def _records(teams_per_conference=10):
+    records, conferences = [], {}
+    for conference in ("East", "West"):
+        for i in range(teams_per_conference):
+            name = f"{conference} {i}"
+            conferences[name] = conference
+            records.append(TeamPrediction(
+                full_name=name, abbreviation=f"{conference[0]}{i:02d}", wins=60 - 3 * i,
+                win_pct=(60 - 3 * i) / 82, ppg=110.0, point_diff=8.0 - 1.5 * i,
+                championship_probability=0.1, efficiency_diff=0.08 - 0.015 * i
+            ))
+    return records, conferences
+
+
+def test_round_odds_sum_to_the_teams_left():
+    records, conferences = _records()
+    teams = simulate(records, conferences, simulations=20_000, seed=1)
+
+    assert len(teams) == 2 * TEAMS_PER_CONFERENCE
+    for name, left in ROUND_TEAMS.items():
+        assert sum(team['rounds'][name] for team in teams) == pytest.approx(left)
+    for team in teams:
+        odds = [team['rounds'][name] for name in ROUNDS]
+        assert odds == sorted(odds, reverse=True)
+
+
+def test_stronger_teams_win_more_often():
+    records, conferences = _records()
+    teams = simulate(records, conferences, simulations=20_000, seed=1)
+
+    assert {teams[0]['team_abbr'], teams[1]['team_abbr']} == {"E00", "W00"}
+    assert teams[0]['seed'] == 1
+    # Seeds 9 and 10 miss the playoffs
+    assert not {team['team_abbr'] for team in teams} & {"E08", "E09", "W08", "W09"}
+
+
+def test_same_seed_gives_the_same_odds():
+    records, conferences = _records()
+    first = simulate(records, conferences, simulations=5_000, seed=7)
+    assert simulate(records, conferences, simulations=5_000, seed=7) == first
+    assert simulate(records, conferences, simulations=5_000, seed=8) != first
+
+
+def test_a_conference_needs_eight_teams():
+    records, conferences = _records(teams_per_conference=7)
+    with pytest.raises(ValueError):
+        seed_conferences(records, conferences)
+
+
+def test_even_teams_split_a_series_by_home_court():
+    p_home, p_away = np.full((2, 2), 0.6), np.full((2, 2), 0.4)
+    series = series_probabilities(p_home, p_away)
+    assert 0.5 < series[0, 1] < 0.6
+    assert series_probabilities(np.full((1, 1), 0.5), np.full((1, 1), 0.5))[0, 0] == pytest.approx(0.5)
+
+
+def test_simulate_endpoint(api_client):
+    params = {"simulations": 2000, "seed": 3}
+    response = api_client.get("/simulate/2022", params=params)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["simulations"] == 2000
+    assert sum(team["rounds"]["champion"] for team in body["teams"]) == pytest.approx(1.0)
+    assert api_client.get("/simulate/2022", params=params).json() == body
+
+    assert api_client.get("/simulate/1990", params=params).status_code == 404
+    assert api_client.get("/simulate/2022", params={"simulations": 10}).status_code == 422
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from backend.app.compiled_ensemble import CHUNK_ROWS, DEFAULT_TOLERANCE, max_abs_error
+from backend.app.ensemble import NUM_MODEL_FEATURES, STAT_FIELDS
+
+
+def _spread_rows(ensemble, rng, n):
+    scaler = ensemble.scaler
+    return scaler.mean_ + rng.normal(size=(n, NUM_MODEL_FEATURES)) * scaler.scale_ * 1.5
+
+
+def test_matches_native_on_spread_rows(native_ensemble, compiled_ensemble, rng):
+    features = _spread_rows(native_ensemble, rng, 3 * CHUNK_ROWS + 7)
+    assert max_abs_error(compiled_ensemble, native_ensemble, features) <= DEFAULT_TOLERANCE
+
+
+def test_matches_native_on_zero_padded_rows(native_ensemble, compiled_ensemble, rng):
+    # What the API scores: the 33 TeamStats fields, the remaining features left at zero
+    features = _spread_rows(native_ensemble, rng, 200)
+    features[:, len(STAT_FIELDS):] = 0.0
+    assert max_abs_error(compiled_ensemble, native_ensemble, features) <= DEFAULT_TOLERANCE
+
+
+def test_matches_native_on_missing_values(native_ensemble, compiled_ensemble, rng):
+    features = _spread_rows(native_ensemble, rng, 300)
+    features[rng.random(features.shape) < 0.1] = np.nan
+    features[0, :] = np.nan
+    features[1, len(STAT_FIELDS):] = 0.0
+    assert max_abs_error(compiled_ensemble, native_ensemble, features) <= DEFAULT_TOLERANCE
+
+
+@pytest.mark.parametrize("value", [np.inf, -np.inf])
+def test_rejects_infinity_like_native(native_ensemble, compiled_ensemble, rng, value):
+    features = _spread_rows(native_ensemble, rng, 3)
+    features[1, 4] = value
+    with pytest.raises(ValueError):
+        native_ensemble.predict(features)
+    with pytest.raises(ValueError):
+        compiled_ensemble.predict(features)
+
+
+def test_chunking_does_not_change_results(compiled_ensemble, native_ensemble, rng):
+    features = _spread_rows(native_ensemble, rng, 2 * CHUNK_ROWS + 1)
+    whole = compiled_ensemble.predict(features).ensemble
+    row_by_row = np.concatenate([compiled_ensemble.predict(row[None, :]).ensemble for row in features])
+    np.testing.assert_array_equal(whole, row_by_row)
@@ -0,0 +1,95 @@
+import sqlite3
+import threading
+
+import pytest
+
+from backend.app.db import ConnectionPool, connect_readonly
+from backend.app.executor import PoolSaturated
+
+
+def test_connections_are_read_only(synthetic_db):
+    conn = connect_readonly(synthetic_db)
+    assert conn.execute("SELECT COUNT(*) FROM team").fetchone()[0] == 6
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM team")
+    conn.close()
+
+
+def test_missing_database_is_reported(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        connect_readonly(tmp_path / "missing.sqlite")
+
+
+def test_pool_reuses_the_most_recent_connection(synthetic_db):
+    pool = ConnectionPool(synthetic_db, size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    pool.close()
+
+
+def test_pool_opens_at_most_size_connections(synthetic_db):
+    pool = ConnectionPool(synthetic_db, size=1, timeout=5.0)
+    seen = []
+
+    def worker():
+        with pool.connection() as conn:
+            seen.append(conn)
+
+    with pool.connection() as held:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join(timeout=0.2)
+        # The second thread waits for the only connection
+        assert thread.is_alive()
+    thread.join(timeout=5.0)
+    assert seen == [held]
+    pool.close()
+
+
+def test_pool_connections_work_across_threads(synthetic_db):
+    pool = ConnectionPool(synthetic_db, size=2)
+    counts = []
+
+    def worker():
+        with pool.connection() as conn:
+            counts.append(conn.execute("SELECT COUNT(*) FROM team").fetchone()[0])
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counts == [6] * 6
+    pool.close()
+
+
+def test_close_closes_idle_and_returned_connections(synthetic_db):
+    pool = ConnectionPool(synthetic_db, size=2)
+    with pool.connection() as idle:
+        pass
+    with pool.connection() as busy:
+        pool.close()
+    for conn in (idle, busy):
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+def test_acquire_after_close_raises(synthetic_db):
+    pool = ConnectionPool(synthetic_db, size=1)
+    pool.close()
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            pass
+
+
+def test_waiting_too_long_raises_pool_saturated(synthetic_db):
+    pool = ConnectionPool(synthetic_db, size=1, timeout=0.05, retry_after=3)
+    with pool.connection():
+        with pytest.raises(PoolSaturated) as excinfo:
+            with pool.connection():
+                pass
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "3"}
+    pool.close()
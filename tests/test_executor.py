@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.app.executor import BoundedExecutor, PoolSaturated
+
+
+def _run(coroutine, release):
+    """Run a scenario, never leaving a worker blocked if it fails"""
+    try:
+        return asyncio.run(coroutine)
+    finally:
+        release.set()
+
+
+async def _settle(pool, in_flight, timeout=5.0):
+    """Wait for the release callbacks to reach the event loop"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while pool.in_flight != in_flight and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+    return pool.in_flight
+
+
+def test_full_pool_answers_503_with_retry_after():
+    pool = BoundedExecutor(1, 0, retry_after=7)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PoolSaturated) as excinfo:
+            await pool.run(lambda: None)
+        release.set()
+        await running
+        return excinfo.value
+
+    error = _run(scenario(), release)
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "7"}
+    assert pool.in_flight == 0
+    pool.shutdown()
+
+
+def test_queued_jobs_count_towards_capacity():
+    pool = BoundedExecutor(1, 1)
+    release = threading.Event()
+
+    async def scenario():
+        jobs = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(PoolSaturated):
+            await pool.run(lambda: None)
+        release.set()
+        return await asyncio.gather(*jobs)
+
+    assert _run(scenario(), release) == [True, True]
+    pool.shutdown()
+
+
+def test_cancelled_caller_keeps_its_slot_until_the_job_finishes():
+    pool = BoundedExecutor(1, 0)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        # A client disconnect cancels the awaiting coroutine; the thread keeps running
+        running.cancel()
+        await asyncio.sleep(0.05)
+        assert pool.in_flight == 1
+        with pytest.raises(PoolSaturated):
+            await pool.run(lambda: None)
+
+        release.set()
+        assert await _settle(pool, 0) == 0
+        return await pool.run(lambda: "admitted")
+
+    assert _run(scenario(), release) == "admitted"
+    pool.shutdown()
+
+
+def test_cancelled_queued_job_never_runs_and_frees_its_slot():
+    pool = BoundedExecutor(1, 1)
+    release = threading.Event()
+    ran = []
+
+    async def scenario():
+        running = asyncio.ensure_future(pool.run(release.wait))
+        queued = asyncio.ensure_future(pool.run(ran.append, "queued"))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        assert await _settle(pool, 1) == 1
+        release.set()
+        await running
+        return await _settle(pool, 0)
+
+    assert _run(scenario(), release) == 0
+    assert ran == []
+    pool.shutdown()
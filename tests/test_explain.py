@@ -0,0 +1,90 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from backend import train_elite_model
+from backend.app.explain import Explainer, ExplanationCache, SeasonFeatures, save_season_features
+
+SEASON = 2005
+
+
+@pytest.fixture(scope="module")
+def season_features(synthetic_db, tmp_path_factory):
+    """The synthetic database's feature rows, exported the way training exports them"""
+    conn = sqlite3.connect(synthetic_db)
+    try:
+        stats = train_elite_model.engineer_features(train_elite_model.load_team_games(conn), conn)
+    finally:
+        conn.close()
+    path = tmp_path_factory.mktemp("explain") / "season_features_elite.npz"
+    save_season_features(
+        path,
+        seasons=stats['season_id'].astype(int).values - 20000,
+        abbreviations=stats['abbreviation'].astype(str).values,
+        full_names=stats['full_name'].astype(str).values,
+        features=stats[train_elite_model.FEATURE_NAMES].values,
+        feature_names=train_elite_model.FEATURE_NAMES
+    )
+    return SeasonFeatures.load(path)
+
+
+def _explainer(native_ensemble, season_features, version):
+    return Explainer(
+        native_ensemble.xgb_model, native_ensemble.lgbm_model, native_ensemble.catboost_model,
+        native_ensemble.scaler, season_features, version
+    )
+
+
+def test_contributions_sum_to_probability_minus_base(native_ensemble, season_features):
+    explanation = _explainer(native_ensemble, season_features, "v1").explain_season(SEASON)
+    assert len(explanation.abbreviations) == 6
+    np.testing.assert_allclose(
+        explanation.contributions.sum(axis=1), explanation.probability - explanation.base_probability,
+        rtol=0, atol=1e-9
+    )
+
+
+def test_probability_matches_the_ensemble(native_ensemble, season_features):
+    explanation = _explainer(native_ensemble, season_features, "v1").explain_season(SEASON)
+    predicted = native_ensemble.predict(explanation.values)
+    np.testing.assert_allclose(explanation.probability, predicted.ensemble, rtol=0, atol=1e-6)
+    for name, column in (('xgboost', predicted.xgboost), ('lightgbm', predicted.lightgbm),
+                         ('catboost', predicted.catboost)):
+        np.testing.assert_allclose(explanation.model_probabilities[name], column, rtol=0, atol=1e-6)
+
+
+def test_unknown_season_is_not_explained(native_ensemble, season_features):
+    assert _explainer(native_ensemble, season_features, "v1").explain_season(1990) is None
+
+
+def test_cache_is_keyed_by_model_version_and_season(native_ensemble, season_features, monkeypatch):
+    computed = []
+    original = Explainer.explain_season
+
+    def counting(self, season):
+        computed.append((self.version, season))
+        return original(self, season)
+
+    monkeypatch.setattr(Explainer, "explain_season", counting)
+    cache = ExplanationCache()
+    first = _explainer(native_ensemble, season_features, "v1")
+
+    explanation = cache.get_or_compute(first, SEASON)
+    assert cache.get_or_compute(first, SEASON) is explanation
+    assert cache.get("v1", SEASON) is explanation
+    assert computed == [("v1", SEASON)]
+
+    # A new model version misses, even for the same season
+    assert cache.get("v2", SEASON) is None
+    cache.get_or_compute(_explainer(native_ensemble, season_features, "v2"), SEASON)
+    cache.get_or_compute(first, SEASON - 1)
+    assert computed == [("v1", SEASON), ("v2", SEASON), ("v1", SEASON - 1)]
+
+
+def test_missing_season_features_name_the_training_step(api, api_client):
+    if api.deployment.version.season_features_path.exists():
+        pytest.skip("season features have been exported in this checkout")
+    response = api_client.get("/explain/2022/GSW")
+    assert response.status_code == 503
+    assert "python backend/train_elite_model.py" in response.json()["detail"]
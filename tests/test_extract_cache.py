@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.app.extract_cache import ExtractCache, load_frame, save_frame
+
+QUERY = "SELECT * FROM game"
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    path = tmp_path / "nba.sqlite"
+    path.write_bytes(b"v1")
+    return path
+
+
+def _frame():
+    return pd.DataFrame({
+        'game_id': ['001', '002', None],
+        'pts': np.array([101.0, 99.5, np.nan]),
+        'won': np.array([1, 0, 1]),
+    }, index=[5, 3, 9])
+
+
+def test_round_trip_keeps_values_nulls_and_index(tmp_path):
+    save_frame(_frame(), tmp_path / "frame")
+    pd.testing.assert_frame_equal(load_frame(tmp_path / "frame"), _frame(), check_index_type=False)
+
+
+def test_second_build_is_a_hit(tmp_path, db_file):
+    cache = ExtractCache(tmp_path / "cache", db_file)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return _frame()
+
+    first, hit = cache.get_or_build('games', QUERY, build)
+    assert not hit
+    second, hit = cache.get_or_build('games', QUERY, build)
+    assert hit
+    assert len(builds) == 1
+    pd.testing.assert_frame_equal(second, first, check_index_type=False)
+
+
+def test_database_change_invalidates(tmp_path, db_file):
+    cache = ExtractCache(tmp_path / "cache", db_file)
+    cache.get_or_build('games', QUERY, _frame)
+
+    db_file.write_bytes(b"v2 with more games")
+    stamp = db_file.stat().st_mtime + 5
+    os.utime(db_file, (stamp, stamp))
+
+    assert cache.load('games', QUERY) is None
+    _, hit = cache.get_or_build('games', QUERY, _frame)
+    assert not hit
+
+
+def test_query_and_version_are_part_of_the_key(tmp_path, db_file):
+    cache = ExtractCache(tmp_path / "cache", db_file)
+    cache.get_or_build('games', QUERY, _frame)
+
+    assert cache.load('games', QUERY + " WHERE 1") is None
+    assert cache.load('games', QUERY, version="2") is None
+
+
+def test_mixed_type_columns_are_rejected(tmp_path):
+    frame = pd.DataFrame({'mixed': ['a', 1]})
+    with pytest.raises(TypeError):
+        save_frame(frame, tmp_path / "frame")
+    assert not (tmp_path / "frame").exists()
+
+
+def test_store_evicts_older_entries_of_the_same_database(tmp_path, db_file):
+    cache = ExtractCache(tmp_path / "cache", db_file)
+    old_path = cache.path('games', QUERY)
+    cache.store('games', QUERY, _frame())
+
+    db_file.write_bytes(b"v2 with more games")
+    stamp = db_file.stat().st_mtime + 5
+    os.utime(db_file, (stamp, stamp))
+    new_path = cache.store('games', QUERY, _frame())
+
+    assert new_path != old_path
+    assert not old_path.exists()
+    assert new_path.exists()
+
+
+def test_store_keeps_other_databases_entries(tmp_path, db_file):
+    other_db = tmp_path / "synthetic.sqlite"
+    other_db.write_bytes(b"synthetic")
+    kaggle = ExtractCache(tmp_path / "cache", db_file)
+    synthetic = ExtractCache(tmp_path / "cache", other_db)
+
+    kaggle.store('games', QUERY, _frame())
+    synthetic.store('games', QUERY, _frame())
+    synthetic.store('team_games', QUERY, _frame())
+
+    _, hit = kaggle.get_or_build('games', QUERY, _frame)
+    assert hit
+    assert synthetic.load('games', QUERY) is not None
+
+
+def test_store_removes_untagged_entries(tmp_path, db_file):
+    cache = ExtractCache(tmp_path / "cache", db_file)
+    legacy = tmp_path / "cache" / "games-0123456789abcdef"
+    save_frame(_frame(), legacy)
+
+    cache.store('games', QUERY, _frame())
+    assert not legacy.exists()
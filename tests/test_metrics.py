@@ -0,0 +1,54 @@
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+import pytest
+
+from backend.app.executor import PoolSaturated
+from backend.app.metrics import LATENCY_BUCKETS, Counter, HistogramFamily, RequestMetrics
+
+
+@pytest.fixture
+def instrumented():
+    app = FastAPI()
+    requests = Counter("requests", "", ("method", "endpoint", "status"))
+    errors = Counter("errors", "", ("method", "endpoint", "reason"))
+    latency = HistogramFamily("latency", "", LATENCY_BUCKETS, ("method", "endpoint"))
+    app.add_middleware(RequestMetrics, requests=requests, errors=errors, latency=latency, probes=("/ready",))
+
+    @app.get("/ready")
+    async def ready():
+        return JSONResponse(content={"ready": False}, status_code=503)
+
+    @app.get("/busy")
+    async def busy():
+        raise PoolSaturated(1)
+
+    @app.get("/broken")
+    async def broken():
+        raise HTTPException(status_code=500, detail="broken")
+
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=503, detail="artifact missing")
+
+    return TestClient(app), requests, errors
+
+
+def test_intended_503s_are_labelled_apart_from_errors(instrumented):
+    client, requests, errors = instrumented
+    for path in ("/ready", "/busy", "/broken", "/missing"):
+        client.get(path)
+
+    assert errors.value("GET", "/ready", "not_ready") == 1
+    assert errors.value("GET", "/busy", "saturated") == 1
+    assert errors.value("GET", "/broken", "error") == 1
+    # A 503 that is neither a probe nor load shedding is still an error
+    assert errors.value("GET", "/missing", "error") == 1
+    assert requests.value("GET", "/busy", "503") == 1
+
+
+def test_successful_requests_are_not_errors(instrumented):
+    client, requests, errors = instrumented
+    client.get("/unknown")
+    assert requests.value("GET", "unmatched", "404") == 1
+    assert errors.expose() == ["# HELP errors ", "# TYPE errors counter"]
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+
+from backend.app.executor import BoundedExecutor
+from backend.app.model_registry import (
+    POINTER, REQUIRED_MODEL_FILES, UNVERSIONED, ModelRegistry, ModelVersion
+)
+
+
+@pytest.fixture
+def source(tmp_path):
+    """A training output with the required model files and one prediction file"""
+    version = ModelVersion("source", tmp_path / "models", tmp_path / "predictions")
+    version.model_dir.mkdir()
+    version.predictions_dir.mkdir()
+    for kind in REQUIRED_MODEL_FILES:
+        version.model_path(kind).write_text(kind)
+    version.metadata_path.write_text(json.dumps({"training_date": "2024-01-01"}))
+    version.predictions_path.write_text("full_name,abbreviation\n")
+    return version
+
+
+def test_publish_copies_a_version_and_activates_it(source, tmp_path):
+    registry = ModelRegistry(tmp_path / "registry")
+    assert registry.current() is None
+
+    first = registry.publish(source, name="v1")
+    assert registry.current() is None
+    assert first.model_path("xgb").read_text() == "xgb"
+    assert first.predictions_path.exists()
+    assert not first.compiled_path.exists()
+
+    registry.publish(source, name="v2", activate=True)
+    assert registry.current() == registry.version("v2")
+    assert registry.versions() == ["v1", "v2"]
+
+    with pytest.raises(FileExistsError):
+        registry.publish(source, name="v1")
+    source.model_path("scaler").unlink()
+    with pytest.raises(FileNotFoundError):
+        registry.publish(source, name="v3")
+    assert registry.versions() == ["v1", "v2"]
+
+
+def test_rollback_reactivates_the_previous_version(source, tmp_path):
+    registry = ModelRegistry(tmp_path / "registry")
+    with pytest.raises(ValueError):
+        registry.rollback()
+
+    registry.publish(source, name="v1", activate=True)
+    registry.publish(source, name="v2", activate=True)
+    assert registry.pointer() == {"version": "v2", "previous": "v1"}
+
+    assert registry.rollback().name == "v1"
+    assert registry.pointer() == {"version": "v1", "previous": "v2"}
+    # Rolling back again undoes the rollback
+    assert registry.rollback().name == "v2"
+
+
+def test_missing_or_torn_pointer(source, tmp_path):
+    registry = ModelRegistry(tmp_path / "registry")
+    registry.publish(source, name="v1", activate=True)
+    pointer = registry.root / POINTER
+
+    pointer.write_text(json.dumps({"version": "gone", "previous": None}))
+    with pytest.raises(FileNotFoundError):
+        registry.current()
+
+    pointer.write_text('{"version": "v')
+    with pytest.raises(ValueError):
+        registry.current()
+    # Activating replaces a damaged pointer
+    assert registry.activate("v1").name == "v1"
+    assert registry.pointer() == {"version": "v1", "previous": None}
+
+    pointer.unlink()
+    assert registry.current() is None
+
+
+@pytest.fixture
+def swappable(api, tmp_path, monkeypatch):
+    """The API with its own registry and worker pool; the deployment in use is restored afterwards"""
+    for name in ("deployment", "previous_deployment", "_failed_version"):
+        monkeypatch.setattr(api, name, getattr(api, name))
+    registry = ModelRegistry(tmp_path / "registry")
+    monkeypatch.setattr(api, "model_registry", registry)
+    monkeypatch.setattr(api, "worker_pool", BoundedExecutor(4, 4))
+    monkeypatch.setattr(api, "MODEL_POLL_INTERVAL", 0.01)
+    # Published from the committed models and predictions
+    registry.publish(UNVERSIONED, name="v1")
+    return registry
+
+
+def test_switch_and_rollback_reuse_the_warm_deployment(api, swappable):
+    original = api.deployment
+    swappable.activate("v1")
+
+    asyncio.run(api.switch_to(api._registry_version()))
+    assert api.deployment.version.name == "v1"
+    assert api.deployment.ready
+    assert api.previous_deployment is original
+
+    asyncio.run(api.switch_to(original.version))
+    assert api.deployment is original
+
+
+def test_watcher_skips_a_torn_pointer_and_follows_a_valid_one(api, swappable):
+    original = api.deployment
+    (swappable.root / POINTER).write_text('{"version": "v')
+
+    async def scenario():
+        watcher = asyncio.ensure_future(api.watch_model_registry())
+        try:
+            await asyncio.sleep(0.1)
+            assert api.deployment is original
+            swappable.activate("v1")
+            for _ in range(500):
+                if api.deployment is not original:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            watcher.cancel()
+
+    asyncio.run(scenario())
+    assert api.deployment.version.name == "v1"
+
+
+def test_in_flight_request_keeps_its_deployment_across_a_swap(api, swappable, monkeypatch):
+    original = api.deployment
+    monkeypatch.setattr(original, "features_response", None)
+    build = api._build_features_response
+    started, release = threading.Event(), threading.Event()
+    built_for = []
+
+    def gated_build(active):
+        built_for.append(active)
+        started.set()
+        release.wait(10)
+        return build(active)
+
+    monkeypatch.setattr(api, "_build_features_response", gated_build)
+    swappable.activate("v1")
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            request = asyncio.ensure_future(client.get("/features"))
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            # The request is inside the worker pool when the new version goes live
+            await api.switch_to(api._registry_version())
+            release.set()
+            return await request
+
+    try:
+        response = asyncio.run(scenario())
+    finally:
+        release.set()
+    assert response.status_code == 200
+    assert api.deployment.version.name == "v1"
+    assert built_for == [original]
+    assert original.features_response is not None
+    assert api.deployment.features_response is None
@@ -0,0 +1,89 @@
+import gzip
+import json
+
+from starlette.requests import Request
+
+from backend.app.precomputed import serialize, serve
+
+
+def _request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/predictions",
+        "headers": [(name.replace('_', '-').encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+BODY = serialize([{"team": "BOS", "probability": 0.25}] * 50)
+
+
+def test_plain_response_carries_a_strong_etag():
+    response = serve(_request(), BODY)
+
+    assert response.status_code == 200
+    assert response.body == BODY.body
+    assert response.headers["etag"] == BODY.etag
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_gzip_is_negotiated_with_its_own_etag():
+    response = serve(_request(accept_encoding="gzip, deflate"), BODY)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.body) == BODY.body
+    assert response.headers["etag"] != BODY.etag
+
+
+def test_gzip_refused_with_q_zero():
+    response = serve(_request(accept_encoding="gzip;q=0"), BODY)
+    assert "content-encoding" not in response.headers
+
+
+def test_matching_etag_gets_304_without_a_body():
+    response = serve(_request(if_none_match=BODY.etag), BODY)
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == BODY.etag
+
+
+def test_weak_and_listed_etags_match():
+    assert serve(_request(if_none_match=f'"other", W/{BODY.etag}'), BODY).status_code == 304
+    assert serve(_request(if_none_match='"other"'), BODY).status_code == 200
+
+
+def test_api_revalidates_predictions(api_client):
+    first = api_client.get("/predictions")
+    assert first.status_code == 200
+
+    second = api_client.get("/predictions", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+def test_304_carries_the_etag_of_the_negotiated_encoding():
+    gzip_etag = serve(_request(accept_encoding="gzip"), BODY).headers["etag"]
+    response = serve(_request(accept_encoding="gzip", if_none_match=gzip_etag), BODY)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == gzip_etag
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in response.headers
+
+
+def test_only_the_negotiated_representation_validates():
+    gzip_etag = serve(_request(accept_encoding="gzip"), BODY).headers["etag"]
+
+    # A cached gzip body does not validate a plain request, and the reverse
+    assert serve(_request(if_none_match=gzip_etag), BODY).status_code == 200
+    response = serve(_request(accept_encoding="gzip", if_none_match=BODY.etag), BODY)
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_seasons_is_served_without_season_files(api):
+    from backend.app.prediction_store import PredictionSnapshot
+
+    responses = api.build_snapshot_responses(PredictionSnapshot(latest=None, historical=None, seasons={}))
+    assert json.loads(responses["seasons"].body) == {"seasons": [], "latest": None}
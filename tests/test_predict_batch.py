@@ -0,0 +1,36 @@
+import numpy as np
+
+from backend.app.compiled_ensemble import DEFAULT_TOLERANCE
+from backend.app.ensemble import STAT_FIELDS, stats_matrix
+
+
+def _payload(rng, rows):
+    values = rng.uniform(0.0, 60.0, size=(rows, len(STAT_FIELDS)))
+    return [dict(zip(STAT_FIELDS, row)) for row in values.tolist()]
+
+
+def _probabilities(response):
+    assert response.status_code == 200, response.text
+    return np.array([p["championship_probability"] for p in response.json()["predictions"]])
+
+
+def test_max_size_batch_is_scored_by_the_native_models(api, api_client, compiled_ensemble, rng):
+    teams = _payload(rng, api.MAX_BATCH_ROWS)
+    probabilities = _probabilities(api_client.post("/predict/batch", json={"teams": teams}))
+
+    assert len(probabilities) == api.MAX_BATCH_ROWS
+    assert api.deployment.native_resource.loaded
+    expected = compiled_ensemble.predict(stats_matrix([api.TeamStats(**team) for team in teams])).ensemble
+    assert np.max(np.abs(probabilities - expected)) <= DEFAULT_TOLERANCE
+
+
+def test_small_batch_matches_single_predictions(api, api_client, rng):
+    teams = _payload(rng, 5)
+    batch = _probabilities(api_client.post("/predict/batch", json={"teams": teams}))
+    single = [api_client.post("/predict", json=team).json()["championship_probability"] for team in teams]
+    np.testing.assert_allclose(batch, single, rtol=0, atol=1e-12)
+
+
+def test_batch_above_the_limit_is_rejected(api, api_client, rng):
+    teams = _payload(rng, 1) * (api.MAX_BATCH_ROWS + 1)
+    assert api_client.post("/predict/batch", json={"teams": teams}).status_code == 422
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from backend.app import prediction_cache
+from backend.app.prediction_cache import PredictionCache, round_significant
+
+
+def _row(value):
+    return np.full(42, value, dtype=np.float64)
+
+
+def test_hit_after_store():
+    cache = PredictionCache(4)
+    key = cache.key(_row(1.0))
+    assert cache.get("v1", key) is None
+    cache.put_many("v1", [key], [0.25])
+
+    assert cache.get("v1", key) == 0.25
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_negative_zero_shares_a_key():
+    cache = PredictionCache(4)
+    assert cache.key(_row(-0.0)) == cache.key(_row(0.0))
+
+
+def test_least_recently_used_is_evicted_first():
+    cache = PredictionCache(2)
+    keys = [cache.key(_row(value)) for value in (1.0, 2.0, 3.0)]
+    cache.get("v1", keys[0])
+    cache.put_many("v1", keys[:2], [0.1, 0.2])
+    # Touch the first entry so the second is the oldest
+    assert cache.get("v1", keys[0]) == 0.1
+    cache.put_many("v1", keys[2:], [0.3])
+
+    assert cache.get("v1", keys[1]) is None
+    assert cache.get("v1", keys[0]) == 0.1
+    assert cache.get("v1", keys[2]) == 0.3
+    assert cache.evictions == 1
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(prediction_cache.time, "monotonic", lambda: now[0])
+    cache = PredictionCache(4, ttl=30)
+    key = cache.key(_row(1.0))
+    cache.get("v1", key)
+    cache.put_many("v1", [key], [0.5])
+
+    now[0] += 29
+    assert cache.get("v1", key) == 0.5
+    now[0] += 2
+    assert cache.get("v1", key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_new_version_clears_the_cache():
+    cache = PredictionCache(4)
+    key = cache.key(_row(1.0))
+    cache.get("v1", key)
+    cache.put_many("v1", [key], [0.5])
+
+    assert cache.get("v2", key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_results_of_a_replaced_version_are_dropped():
+    cache = PredictionCache(4)
+    key = cache.key(_row(1.0))
+    cache.get("v1", key)
+    cache.get("v2", key)
+    # A batch scored by v1 finishes after v2 went live
+    cache.put_many("v1", [key], [0.5])
+
+    assert cache.get("v2", key) is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = PredictionCache(0)
+    key = cache.key(_row(1.0))
+    cache.put_many(None, [key], [0.5])
+    assert cache.get(None, key) is None
+    assert not cache.enabled
+
+
+@pytest.mark.parametrize("value, expected", [(30.000001, 30.0), (0.123456, 0.1235), (-1234567.0, -1235000.0)])
+def test_rounding_to_significant_digits(value, expected):
+    assert round_significant(np.array([value]), 4)[0] == pytest.approx(expected)
+
+
+def test_rounded_keys_bucket_near_duplicates():
+    cache = PredictionCache(4, digits=4)
+    assert cache.key(_row(30.0)) == cache.key(_row(30.000001))
+    assert cache.key(_row(30.0)) != cache.key(_row(30.01))
@@ -0,0 +1,88 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from backend.app.prediction_store import PredictionStore
+
+
+def _team(name, abbreviation, probability):
+    return {
+        'full_name': name, 'abbreviation': abbreviation, 'wins': 50, 'win_pct': 0.61, 'ppg': 110.0,
+        'point_diff': 4.5, 'championship_probability': probability,
+    }
+
+
+def _age(path, seconds):
+    # Older than settle_seconds, so the store treats the write as finished
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def _write_latest(path, probability, age=10.0):
+    pd.DataFrame([_team("Boston Celtics", "BOS", probability)]).to_csv(path, index=False)
+    _age(path, age)
+
+
+@pytest.fixture
+def store(tmp_path):
+    season_dir = tmp_path / "season_predictions"
+    season_dir.mkdir()
+    pd.DataFrame([{
+        'full_name': "Boston Celtics", 'abbreviation': "BOS", 'won': 60, 'win_pct': 0.73, 'pts': 115.0,
+        'point_diff': 9.1, 'championship_probability': 0.4, 'efficiency_diff': 0.05,
+    }]).to_csv(season_dir / "predictions_2023.csv", index=False)
+    _age(season_dir / "predictions_2023.csv", 20.0)
+    _write_latest(tmp_path / "latest.csv", 0.3, age=20.0)
+    return PredictionStore(tmp_path / "latest.csv", tmp_path / "historical.csv", season_dir, check_interval=None)
+
+
+def test_load_reads_every_file(store):
+    snapshot = store.load()
+
+    assert snapshot.latest[0].championship_probability == 0.3
+    assert snapshot.historical is None
+    assert snapshot.seasons[2023][0].wins == 60.0
+    assert snapshot.seasons[2023][0].efficiency_diff == 0.05
+
+
+def test_reload_swaps_in_a_new_snapshot(store):
+    before = store.load()
+    assert store.reload_if_changed() is False
+
+    _write_latest(store.predictions_path, 0.5)
+    assert store.reload_if_changed() is True
+
+    after = store.get()
+    assert after is not before
+    assert after.latest[0].championship_probability == 0.5
+    # Readers holding the old snapshot keep a consistent view
+    assert before.latest[0].championship_probability == 0.3
+
+
+def test_reload_waits_for_files_to_settle(store):
+    store.load()
+    _write_latest(store.predictions_path, 0.5, age=0.0)
+
+    assert store.reload_if_changed() is False
+    assert store.get().latest[0].championship_probability == 0.3
+
+
+def test_failed_reload_keeps_serving_the_previous_snapshot(store):
+    before = store.load()
+    store.predictions_path.write_text("full_name\nBoston Celtics\n")
+    _age(store.predictions_path, 10.0)
+
+    assert store.reload_if_changed() is False
+    assert store.get() is before
+
+
+def test_get_checks_for_changes_at_most_every_interval(store):
+    store.check_interval = 3600
+    store.load()
+    _write_latest(store.predictions_path, 0.5)
+    assert store.get().latest[0].championship_probability == 0.3
+
+    store.check_interval = 0
+    assert store.get().latest[0].championship_probability == 0.5
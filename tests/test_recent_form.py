@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from backend.season_aggregates import MEAN_COLUMNS, RECENT_WINDOW
+from backend.train_elite_model import aggregate_team_seasons, recent_form
+
+RECENT_COLUMNS = ['recent_win_pct', 'recent_point_diff', 'momentum']
+
+
+def _games(rng, seasons=(22003, 22004), teams=(1610612737, 1610612738, 1610612739), games=RECENT_WINDOW + 7):
+    """Per-team-game rows in date order, one short team-season included"""
+    rows = []
+    for season_id in seasons:
+        for team_id in teams:
+            count = RECENT_WINDOW - 5 if (season_id, team_id) == (seasons[-1], teams[-1]) else games
+            for day in range(count):
+                pts, opp_pts = rng.integers(80, 130, size=2)
+                rows.append({
+                    'season_id': season_id, 'team_id': team_id,
+                    # Two games a day, so ties in game_date must keep the original order
+                    'game_date': f"{season_id - 20001}-11-{day // 2 + 1:02d}",
+                    'pts': pts, 'opp_pts': opp_pts, 'won': int(pts > opp_pts),
+                })
+    games_df = pd.DataFrame(rows)
+    for column in MEAN_COLUMNS:
+        if column not in games_df:
+            games_df[column] = rng.random(len(games_df))
+    # Interleave teams the way the unpivoted table does, keeping date order
+    return games_df.sample(frac=1, random_state=0).sort_values('game_date', kind='stable').reset_index(drop=True)
+
+
+def _recent_form_loop(stats, all_games):
+    """The per-team x per-season loop recent_form replaced"""
+    recent_stats = []
+    for team_id in stats['team_id'].unique():
+        for season_id in stats['season_id'].unique():
+            team_season_games = all_games[
+                (all_games['team_id'] == team_id) &
+                (all_games['season_id'] == season_id)
+            ].tail(RECENT_WINDOW)
+
+            if len(team_season_games) > 0:
+                recent_win_pct = team_season_games['won'].mean()
+                recent_point_diff = (team_season_games['pts'] - team_season_games['opp_pts']).mean()
+                momentum = recent_win_pct * recent_point_diff
+            else:
+                recent_win_pct = 0
+                recent_point_diff = 0
+                momentum = 0
+
+            recent_stats.append({
+                'team_id': team_id,
+                'season_id': season_id,
+                'recent_win_pct': recent_win_pct,
+                'recent_point_diff': recent_point_diff,
+                'momentum': momentum
+            })
+
+    return stats.merge(pd.DataFrame(recent_stats), on=['team_id', 'season_id'], how='left')
+
+
+def _keys(stats):
+    return stats[['team_id', 'season_id']].sort_values(['season_id', 'team_id']).reset_index(drop=True)
+
+
+def _recent(stats):
+    return stats.sort_values(['season_id', 'team_id']).reset_index(drop=True)[['team_id', 'season_id'] + RECENT_COLUMNS]
+
+
+def test_matches_the_loop_on_integer_keys():
+    games = _games(np.random.default_rng(0))
+    stats = aggregate_team_seasons(games)
+
+    expected = _recent(_recent_form_loop(_keys(stats), games))
+    pd.testing.assert_frame_equal(_recent(stats), expected, check_dtype=False)
+
+
+def test_uses_only_the_last_games_of_each_team_season():
+    games = _games(np.random.default_rng(1))
+    recent = recent_form(games).set_index(['team_id', 'season_id'])
+
+    for (season_id, team_id), group in games.groupby(['season_id', 'team_id']):
+        last = group.tail(RECENT_WINDOW)
+        assert recent.loc[(team_id, season_id), 'recent_win_pct'] == last['won'].mean()
+
+
+def test_text_keys_now_carry_values():
+    # SQLite returns season_id and team_id as TEXT; the loop compared them to the int
+    # keys of stats, never matched, and left every recent-form feature at zero
+    games = _games(np.random.default_rng(2))
+    text_games = games.astype({'season_id': str, 'team_id': str})
+    stats = aggregate_team_seasons(text_games)
+
+    loop = _recent(_recent_form_loop(_keys(stats), text_games))
+    assert (loop[RECENT_COLUMNS] == 0).all().all()
+
+    expected = _recent(_recent_form_loop(_keys(stats), games))
+    pd.testing.assert_frame_equal(_recent(stats), expected, check_dtype=False)
@@ -0,0 +1,107 @@
+import shutil
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from backend import train_elite_model
+from backend.season_aggregates import SeasonAggregates
+
+# Mid-way through the last synthetic season (2004-10-20 to 2005-04-10)
+CUTOFF = '2005-01-15'
+
+
+@pytest.fixture
+def outputs(tmp_path, monkeypatch):
+    """Point refresh() at temporary aggregate and prediction files"""
+    aggregates_path = tmp_path / "season_aggregates_elite.npz"
+    predictions_path = tmp_path / "latest_predictions_elite.csv"
+    monkeypatch.setattr(train_elite_model, "AGGREGATES_PATH", aggregates_path)
+    monkeypatch.setattr(train_elite_model, "LATEST_PREDICTIONS_PATH", predictions_path)
+    return aggregates_path, predictions_path
+
+
+def _copy_before(db_path, tmp_path, cutoff):
+    """A copy of the database without the regular season games from cutoff on"""
+    path = tmp_path / "partial.sqlite"
+    shutil.copy(db_path, path)
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM game WHERE season_type = 'Regular Season' AND game_date >= ?", (cutoff,))
+    return path
+
+
+def _refresh(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        train_elite_model.refresh(conn)
+    finally:
+        conn.close()
+
+
+def _results(outputs):
+    aggregates_path, predictions_path = outputs
+    frame = SeasonAggregates.load(aggregates_path).frame()
+    frame = frame.sort_values(['season_id', 'team_id']).reset_index(drop=True)
+    predictions = pd.read_csv(predictions_path).sort_values('abbreviation').reset_index(drop=True)
+    return frame, predictions
+
+
+def test_incremental_refresh_equals_a_full_rebuild(synthetic_db, tmp_path, outputs):
+    _refresh(_copy_before(synthetic_db, tmp_path, CUTOFF))
+    partial_predictions = pd.read_csv(outputs[1]).sort_values('abbreviation').reset_index(drop=True)
+    _refresh(synthetic_db)
+    incremental = _results(outputs)
+
+    for path in outputs:
+        path.unlink()
+    _refresh(synthetic_db)
+    rebuilt = _results(outputs)
+
+    pd.testing.assert_frame_equal(incremental[0], rebuilt[0], check_exact=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(incremental[1], rebuilt[1], check_exact=False, rtol=1e-9)
+    # The new games did change the predictions
+    assert (partial_predictions['wins'] < incremental[1]['wins']).all()
+
+
+def test_refresh_without_new_games_changes_nothing(synthetic_db, outputs):
+    _refresh(synthetic_db)
+    before = outputs[1].read_bytes()
+    _refresh(synthetic_db)
+    assert outputs[1].read_bytes() == before
+
+
+def test_new_season_is_served_once_every_team_has_played(synthetic_db, tmp_path, outputs):
+    new_season = 22005
+    with sqlite3.connect(synthetic_db) as conn:
+        first_day = conn.execute(
+            "SELECT MIN(game_date) FROM game WHERE season_type = 'Regular Season' AND season_id = ?",
+            (str(new_season),)
+        ).fetchone()[0]
+
+    # Before the new season: the file holds the previous one
+    _refresh(_copy_before(synthetic_db, tmp_path, first_day))
+    previous = pd.read_csv(outputs[1])
+    assert set(previous['season_id']) == {new_season - 1}
+    assert len(previous) == 6
+
+    # Opening night: only some teams have played, so the previous season keeps being served
+    started = _copy_before(synthetic_db, tmp_path, first_day[:10] + ' 23:59:59')
+    with sqlite3.connect(started) as conn:
+        playing = conn.execute(
+            "SELECT COUNT(DISTINCT team_id_home) + COUNT(DISTINCT team_id_away) FROM game "
+            "WHERE season_type = 'Regular Season' AND season_id = ?", (str(new_season),)
+        ).fetchone()[0]
+    assert 0 < playing < 6
+    _refresh(started)
+    pd.testing.assert_frame_equal(pd.read_csv(outputs[1]), previous)
+
+    # The full season: every team is scored for it, exactly as a rebuild would
+    _refresh(synthetic_db)
+    refreshed = _results(outputs)[1]
+    assert set(refreshed['season_id']) == {new_season}
+    assert len(refreshed) == 6
+
+    for path in outputs:
+        path.unlink()
+    _refresh(synthetic_db)
+    pd.testing.assert_frame_equal(refreshed, _results(outputs)[1], check_exact=False, rtol=1e-9)
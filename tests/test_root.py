@@ -0,0 +1,7 @@
+from fastapi.routing import APIRoute
+
+
+def test_root_lists_every_route(api, api_client):
+    listed = set(api_client.get("/").json()["endpoints"])
+    routes = {route.path for route in api.app.routes if isinstance(route, APIRoute)}
+    assert routes - {"/"} == listed
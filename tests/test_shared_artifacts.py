@@ -0,0 +1,137 @@
+from pathlib import Path
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+from starlette.requests import Request
+
+from backend.app.compiled_ensemble import CompiledEnsemble
+from backend.app.precomputed import serialize, serve
+from backend.app.prediction_store import PredictionStore
+from backend.app.shared_artifacts import MANIFEST, MappedTable, build_bundle, load_bundle
+
+MODEL_DIR = Path(__file__).parent.parent / "models"
+
+
+def _age(path, seconds=20.0):
+    stamp = path.stat().st_mtime - seconds
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture
+def store(tmp_path):
+    season_dir = tmp_path / "season_predictions"
+    season_dir.mkdir()
+    teams = [("Boston Celtics", "BOS", 0.4), ("Miami Heat", "MIA", 0.25), ("Denver Nuggets", "DEN", 0.1)]
+    pd.DataFrame([{
+        'full_name': name, 'abbreviation': abbreviation, 'won': 50 + i, 'win_pct': 0.6, 'pts': 112.0,
+        'point_diff': 3.0 - i, 'championship_probability': probability, 'efficiency_diff': 0.02 * i,
+    } for i, (name, abbreviation, probability) in enumerate(teams)]).to_csv(
+        season_dir / "predictions_2023.csv", index=False
+    )
+    # No per-model columns, so those optional fields are None
+    pd.DataFrame([{
+        'full_name': name, 'abbreviation': abbreviation, 'wins': 50, 'win_pct': 0.6, 'ppg': 112.0,
+        'point_diff': 3.0, 'championship_probability': probability,
+    } for name, abbreviation, probability in teams]).to_csv(tmp_path / "latest.csv", index=False)
+    pd.DataFrame([{
+        'season': 2023, 'actual_champion': "Denver Nuggets", 'predicted_champion': "Boston Celtics",
+        'predicted_probability': 0.4, 'correct': False, 'actual_champion_rank': 3,
+        'actual_champion_probability': 0.1,
+    }]).to_csv(tmp_path / "historical.csv", index=False)
+    for path in (season_dir / "predictions_2023.csv", tmp_path / "latest.csv", tmp_path / "historical.csv"):
+        _age(path)
+
+    store = PredictionStore(tmp_path / "latest.csv", tmp_path / "historical.csv", season_dir, check_interval=None)
+    store.load()
+    return store
+
+
+def _responses(snapshot):
+    return {"predictions": serialize([record.abbreviation for record in snapshot.latest] * 40)}
+
+
+def _request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/predictions",
+        "headers": [(name.replace('_', '-').encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_tables_stay_mapped_and_read_back_unchanged(store, tmp_path):
+    snapshot = store.get()
+    build_bundle(tmp_path / "shared", snapshot, _responses(snapshot))
+
+    bundle = load_bundle(tmp_path / "shared", store.current_mtimes())
+
+    for original, mapped in ((snapshot.latest, bundle.snapshot.latest),
+                             (snapshot.historical, bundle.snapshot.historical),
+                             (snapshot.seasons[2023], bundle.snapshot.seasons[2023])):
+        assert isinstance(mapped, MappedTable)
+        assert list(mapped) == original
+        assert mapped[-1] == original[-1]
+        assert mapped[1:] == original[1:]
+    assert bundle.snapshot.latest[0].xgboost_probability is None
+    assert bundle.snapshot.seasons[2023][2].efficiency_diff == pytest.approx(0.04)
+    assert bundle.snapshot.team_seasons.leader(2023).abbreviation == "BOS"
+    with pytest.raises(IndexError):
+        bundle.snapshot.latest[3]
+
+
+def test_response_bodies_are_served_from_the_mapping(store, tmp_path):
+    snapshot = store.get()
+    responses = _responses(snapshot)
+    build_bundle(tmp_path / "shared", snapshot, responses)
+
+    mapped = load_bundle(tmp_path / "shared", store.current_mtimes()).responses["predictions"]
+
+    assert isinstance(mapped.body, memoryview)
+    assert bytes(mapped.body) == responses["predictions"].body
+    assert bytes(mapped.gzip_body) == responses["predictions"].gzip_body
+    response = serve(_request(accept_encoding="identity"), mapped)
+    assert bytes(response.body) == responses["predictions"].body
+    assert response.headers["content-length"] == str(len(responses["predictions"].body))
+
+
+def test_changed_sources_make_the_predictions_stale(store, tmp_path):
+    snapshot = store.get()
+    build_bundle(tmp_path / "shared", snapshot, _responses(snapshot))
+    os.utime(store.predictions_path)
+
+    # Nothing else in the bundle is usable, so the worker loads the sources itself
+    assert load_bundle(tmp_path / "shared", store.current_mtimes()) is None
+
+
+def test_changed_compiled_ensemble_is_not_used(store, tmp_path, rng):
+    compiled_path = tmp_path / "ensemble_compiled_elite.npz"
+    shutil.copy(MODEL_DIR / "ensemble_compiled_elite.npz", compiled_path)
+    snapshot = store.get()
+    build_bundle(tmp_path / "shared", snapshot, _responses(snapshot), compiled_path)
+
+    bundle = load_bundle(tmp_path / "shared", store.current_mtimes(), compiled_path)
+    features = rng.normal(size=(5, 42))
+    np.testing.assert_array_equal(
+        bundle.ensemble.predict(features).ensemble, CompiledEnsemble.load(compiled_path).predict(features).ensemble
+    )
+
+    os.utime(compiled_path, ns=(0, 0))
+    bundle = load_bundle(tmp_path / "shared", store.current_mtimes(), compiled_path)
+    assert bundle.ensemble is None
+    assert bundle.snapshot is not None
+
+
+def test_missing_or_other_format_bundles_are_ignored(store, tmp_path):
+    assert load_bundle(tmp_path / "shared", store.current_mtimes()) is None
+
+    snapshot = store.get()
+    build_bundle(tmp_path / "shared", snapshot, _responses(snapshot))
+    manifest_path = tmp_path / "shared" / MANIFEST
+    manifest = json.loads(manifest_path.read_text())
+    manifest["format_version"] -= 1
+    manifest_path.write_text(json.dumps(manifest))
+    assert load_bundle(tmp_path / "shared", store.current_mtimes()) is None